@@ -0,0 +1,46 @@
+# src/crawler/crud/async_crud.py
+
+from crawler.crud.basic_crud import BaseCRUD
+from crawler.crud.config_url_log_crud import ConfigUrlLogCRUD
+from crawler.crud.frontier_crud import FrontierCRUD
+from crawler.crud.page_fingerprint_crud import PageFingerprintCRUD
+
+
+class AsyncBaseCRUD:
+    """Awaitable counterpart of a sync CRUD class
+
+    Every public method of `crud_class` becomes a coroutine running in the
+    DB threads of an AsyncDatabaseManager, on a connection checked out for
+    that call only, so concurrent calls never share a connection.
+    """
+
+    crud_class = BaseCRUD
+
+    def __init__(self, async_db):
+        self.async_db = async_db
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not callable(getattr(self.crud_class, name, None)):
+            raise AttributeError(f"{type(self).__name__} has no method {name}")
+
+        async def call(*args, **kwargs):
+            return await self.async_db.run_with_connection(self._call, name, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def _call(self, conn, name, *args, **kwargs):
+        crud = self.crud_class(conn, self.async_db.manager.queries)
+        return getattr(crud, name)(*args, **kwargs)
+
+
+class AsyncFrontierCRUD(AsyncBaseCRUD):
+    crud_class = FrontierCRUD
+
+
+class AsyncConfigUrlLogCRUD(AsyncBaseCRUD):
+    crud_class = ConfigUrlLogCRUD
+
+
+class AsyncPageFingerprintCRUD(AsyncBaseCRUD):
+    crud_class = PageFingerprintCRUD
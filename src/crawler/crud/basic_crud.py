@@ -1,10 +1,152 @@
-from typing import Dict, List, Optional, Any, Tuple, Union
+import itertools
+import os
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple, Union
 from datetime import datetime
 import logfire
-from psycopg2.extras import execute_values, DictCursor
+from psycopg2 import errors as pg_errors
+from psycopg2.extras import execute_values, DictCursor, RealDictCursor
+
+# Generated statements run this many times are prepared server side (on
+# autocommit connections), 0 runs them all as plain SQL
+PREPARE_THRESHOLD = int(os.getenv('POSTGRES_PREPARE_THRESHOLD', 0))
+
+_PLACEHOLDER = re.compile(r'%\((\w+)\)s')
+# Suffixes of the named cursors of iter_rows, unique in the process
+_cursor_ids = itertools.count(1)
+
+
+@dataclass
+class Statement:
+    """SQL text of a generated statement, built once per shape, with its timings"""
+    key: tuple
+    label: str
+    name: str
+    sql: str
+    params: Tuple[str, ...]
+    calls: int = 0
+    prepared_calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    reprepared: int = 0
+    preparable: bool = True
+
+    @cached_property
+    def prepare_sql(self) -> str:
+        positions = {param: i for i, param in enumerate(self.params, 1)}
+        return f"PREPARE {self.name} AS " + _PLACEHOLDER.sub(lambda m: f"${positions[m.group(1)]}", self.sql)
+
+    @cached_property
+    def execute_sql(self) -> str:
+        if not self.params:
+            return f"EXECUTE {self.name}"
+        return f"EXECUTE {self.name} ({', '.join(f'%({param})s' for param in self.params)})"
+
+    def record(self, elapsed: float, prepared: bool):
+        elapsed_ms = elapsed * 1000
+        with _statements_lock:
+            self.calls += 1
+            self.prepared_calls += prepared
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+
+_statements: Dict[tuple, Statement] = {}
+_statements_lock = threading.Lock()
+# Prepared statement names are never reused, not even after clear_statements
+_statement_ids = itertools.count(1)
+# Names prepared on each connection, dropped with the connection
+_prepared: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def get_statement(key: tuple, build: Callable[[], str]) -> Statement:
+    """Statement of a (operation, table, shape...) key, building its SQL on first use"""
+    statement = _statements.get(key)
+    if statement is None:
+        with _statements_lock:
+            statement = _statements.get(key)
+            if statement is None:
+                sql = build()
+                statement = Statement(
+                    key=key,
+                    label=f"{key[0]}:{key[1]}",
+                    name=f"crud_{next(_statement_ids)}",
+                    sql=sql,
+                    # Positional order of the parameters, first use of each name
+                    params=tuple(dict.fromkeys(_PLACEHOLDER.findall(sql)))
+                )
+                _statements[key] = statement
+    return statement
+
+
+def clear_statements():
+    """Forget the cached statements and their counters, they are rebuilt on next use"""
+    with _statements_lock:
+        _statements.clear()
+
+
+def statement_stats() -> List[Dict[str, Any]]:
+    """Calls and latency of every generated statement, slowest in total first"""
+    with _statements_lock:
+        rows = [
+            {
+                'statement': statement.label,
+                'name': statement.name,
+                'calls': statement.calls,
+                'prepared_calls': statement.prepared_calls,
+                'reprepared': statement.reprepared,
+                'total_ms': round(statement.total_ms, 3),
+                'avg_ms': round(statement.total_ms / statement.calls, 3) if statement.calls else 0.0,
+                'max_ms': round(statement.max_ms, 3),
+                'sql': statement.sql
+            }
+            for statement in _statements.values()
+        ]
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def _where_shape(where: Optional[Dict[str, Any]]) -> Tuple[Tuple[Tuple[str, str], ...], Dict[str, Any]]:
+    """Kind of condition of each column of a where dict (its statement key), and the parameters"""
+    conditions = []
+    params = {}
+    for i, (key, value) in enumerate((where or {}).items()):
+        if isinstance(value, (list, tuple)):
+            conditions.append((key, 'any'))
+        elif value is None:
+            conditions.append((key, 'null'))
+        else:
+            conditions.append((key, 'eq'))
+        params[f"where_{i}"] = value
+    return tuple(conditions), params
+
+
+def _where_items(conditions: Tuple[Tuple[str, str], ...]) -> List[str]:
+    where_items = []
+    for i, (key, kind) in enumerate(conditions):
+        if kind == 'any':
+            where_items.append(f"{key} = ANY(%(where_{i})s)")
+        elif kind == 'null':
+            where_items.append(f"{key} IS NULL")
+        else:
+            where_items.append(f"{key} = %(where_{i})s")
+    return where_items
+
 
 class BaseCRUD:
-    """Base CRUD operations for database interactions."""
+    """Base CRUD operations for database interactions.
+
+    The SQL of insert_one, update, select, delete and exists depends only on
+    the table and the column set, so it is built once per shape and cached
+    (see get_statement). Statements called `prepare_threshold` times are then
+    PREPAREd on each autocommit connection and run with EXECUTE.
+    """
+
+    prepare_threshold = PREPARE_THRESHOLD
     
     def __init__(self, conn, queries):
         """Initialize with database connection and queries"""
@@ -12,6 +154,8 @@ class BaseCRUD:
         # Access to the queries loaded in DatabaseManager
         self.queries = queries
 
+    statement_stats = staticmethod(statement_stats)
+
     def execute_query(
         self,
         query: str,
@@ -21,18 +165,7 @@ class BaseCRUD:
         as_dict: bool = True
     ) -> Optional[Union[List[Dict], Dict, List, Any]]:
         try:
-            cursor_factory = DictCursor if as_dict else None
-            with self.conn.cursor(cursor_factory=cursor_factory) as cur:
-                cur.execute(query, params)
-                if fetch:
-                    if fetch_one:
-                        result = cur.fetchone()
-                        return dict(result) if result and as_dict else result
-                    else:
-                        results = cur.fetchall()
-                        return [dict(row) for row in results] if as_dict else results
-                # No need to call self.conn.commit() since autocommit is enabled
-                return None
+            return self._run_query(query, params, fetch=fetch, fetch_one=fetch_one, as_dict=as_dict)
         except Exception as e:
             # No need to call self.conn.rollback() since autocommit is enabled
             logfire.error(
@@ -43,6 +176,83 @@ class BaseCRUD:
             )
             raise
 
+    def _run_query(self, query: str, params: dict, fetch: bool, fetch_one: bool, as_dict: bool = True):
+        """execute_query without the error log, for callers that handle some errors themselves"""
+        cursor_factory = DictCursor if as_dict else None
+        with self.conn.cursor(cursor_factory=cursor_factory) as cur:
+            cur.execute(query, params)
+            if fetch:
+                if fetch_one:
+                    result = cur.fetchone()
+                    return dict(result) if result and as_dict else result
+                else:
+                    results = cur.fetchall()
+                    return [dict(row) for row in results] if as_dict else results
+            # No need to call self.conn.commit() since autocommit is enabled
+            return None
+
+    def execute_statement(
+        self,
+        statement: Statement,
+        params: dict = None,
+        fetch: bool = False,
+        fetch_one: bool = False
+    ) -> Optional[Union[List[Dict], Dict]]:
+        """Run a cached statement, prepared once it is hot, and record its latency"""
+        started = time.perf_counter()
+        prepared = self._prepare(statement)
+        try:
+            if prepared:
+                try:
+                    return self._run_query(statement.execute_sql, params, fetch=fetch, fetch_one=fetch_one)
+                except pg_errors.InvalidSqlStatementName:
+                    # Deallocated behind our back (DISCARD ALL, DEALLOCATE, a replaced
+                    # connection): not an error, run it plainly and prepare again next time
+                    _prepared.get(self.conn, set()).discard(statement.name)
+                    prepared = False
+                    with _statements_lock:
+                        statement.reprepared += 1
+                    logfire.debug("Prepared statement lost, preparing it again", statement=statement.label)
+                except Exception as e:
+                    logfire.error(
+                        "Database query execution failed",
+                        query=statement.execute_sql,
+                        params=params,
+                        error=str(e)
+                    )
+                    raise
+            return self.execute_query(statement.sql, params, fetch=fetch, fetch_one=fetch_one)
+        finally:
+            statement.record(time.perf_counter() - started, prepared)
+
+    def _prepare(self, statement: Statement) -> bool:
+        """Prepare a hot statement on this connection, True when it can be EXECUTEd"""
+        threshold = self.prepare_threshold
+        # A failed PREPARE would abort an open transaction, only autocommit connections get them
+        if not threshold or not statement.preparable or statement.calls < threshold or not self.conn.autocommit:
+            return False
+
+        with _statements_lock:
+            prepared = _prepared.setdefault(self.conn, set())
+        if statement.name in prepared:
+            return True
+
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(statement.prepare_sql)
+        except pg_errors.DuplicatePreparedStatement:
+            pass
+        except Exception as e:
+            statement.preparable = False
+            logfire.warning(
+                "Statement cannot be prepared, running it as plain SQL",
+                statement=statement.label,
+                error=str(e)
+            )
+            return False
+        prepared.add(statement.name)
+        return True
+
     def insert_one(
         self, 
         table: str, 
@@ -69,18 +279,21 @@ class BaseCRUD:
                 if not exclude_none or v is not None
             }
             
-            columns = list(filtered_data.keys())
-            placeholders = [f'%({col})s' for col in columns]
-            
-            query = f"""
-                INSERT INTO {table} 
-                ({', '.join(columns)}) 
-                VALUES ({', '.join(placeholders)})
-                {' RETURNING id' if return_id else ''}
-            """
-            
-            result = self.execute_query(
-                query, 
+            columns = tuple(filtered_data.keys())
+
+            def build():
+                placeholders = [f'%({col})s' for col in columns]
+                return f"""
+                    INSERT INTO {table}
+                    ({', '.join(columns)})
+                    VALUES ({', '.join(placeholders)})
+                    {' RETURNING id' if return_id else ''}
+                """
+
+            statement = get_statement(('insert', table, columns, return_id), build)
+
+            result = self.execute_statement(
+                statement,
                 filtered_data,
                 fetch=return_id,
                 fetch_one=True
@@ -185,20 +398,25 @@ class BaseCRUD:
             Optional list of updated records
         """
         try:
-            set_items = [f"{k} = %({k})s" for k in values.keys()]
-            where_items = [f"{k} = %({k})s" for k in where.keys()]
-            
-            query = f"""
-                UPDATE {table} 
-                SET {', '.join(set_items)}
-                WHERE {' AND '.join(where_items)}
-                {' RETURNING *' if return_updated else ''}
-            """
-            
+            set_columns = tuple(values.keys())
+            where_columns = tuple(where.keys())
+
+            def build():
+                set_items = [f"{k} = %({k})s" for k in set_columns]
+                where_items = [f"{k} = %({k})s" for k in where_columns]
+                return f"""
+                    UPDATE {table}
+                    SET {', '.join(set_items)}
+                    WHERE {' AND '.join(where_items)}
+                    {' RETURNING *' if return_updated else ''}
+                """
+
+            statement = get_statement(('update', table, set_columns, where_columns, return_updated), build)
+
             params = {**values, **where}
-            
-            result = self.execute_query(
-                query,
+
+            result = self.execute_statement(
+                statement,
                 params,
                 fetch=return_updated
             )
@@ -241,44 +459,49 @@ class BaseCRUD:
             List of matching records
         """
         try:
-            # Build query parts
-            select_cols = ', '.join(columns) if columns else '*'
-            query_parts = [f"SELECT {select_cols}", f"FROM {table}"]
-            params = {}
-            
-            # Add WHERE clause
-            if where:
-                conditions = []
-                for i, (key, value) in enumerate(where.items()):
-                    param_name = f"where_{i}"
-                    if isinstance(value, (list, tuple)):
-                        conditions.append(f"{key} = ANY(%({param_name})s)")
-                    elif value is None:
-                        conditions.append(f"{key} IS NULL")
-                    else:
-                        conditions.append(f"{key} = %({param_name})s")
-                    params[param_name] = value
-                    
-                if conditions:
-                    query_parts.append("WHERE " + " AND ".join(conditions))
-            
-            # Add GROUP BY
-            if group_by:
-                query_parts.append(f"GROUP BY {', '.join(group_by)}")
-            
-            # Add ORDER BY
-            if order_by:
-                query_parts.append(f"ORDER BY {order_by}")
-            
-            # Add LIMIT and OFFSET
+            conditions, params = _where_shape(where)
+
+            # LIMIT and OFFSET are parameters, so every page shares a statement
             if limit is not None:
-                query_parts.append(f"LIMIT {limit}")
+                params['limit'] = limit
             if offset is not None:
-                query_parts.append(f"OFFSET {offset}")
-            
+                params['offset'] = offset
+
+            def build():
+                # Build query parts
+                select_cols = ', '.join(columns) if columns else '*'
+                query_parts = [f"SELECT {select_cols}", f"FROM {table}"]
+
+                # Add WHERE clause
+                if conditions:
+                    query_parts.append("WHERE " + " AND ".join(_where_items(conditions)))
+
+                # Add GROUP BY
+                if group_by:
+                    query_parts.append(f"GROUP BY {', '.join(group_by)}")
+
+                # Add ORDER BY
+                if order_by:
+                    query_parts.append(f"ORDER BY {order_by}")
+
+                # Add LIMIT and OFFSET
+                if limit is not None:
+                    query_parts.append("LIMIT %(limit)s")
+                if offset is not None:
+                    query_parts.append("OFFSET %(offset)s")
+
+                return " ".join(query_parts)
+
+            statement = get_statement(
+                (
+                    'select', table, tuple(columns) if columns else None, conditions,
+                    tuple(group_by) if group_by else None, order_by, limit is not None, offset is not None
+                ),
+                build
+            )
+
             # Execute query
-            query = " ".join(query_parts)
-            result = self.execute_query(query, params, fetch=True)
+            result = self.execute_statement(statement, params, fetch=True)
             
             logfire.debug(
                 "Select query executed",
@@ -296,6 +519,97 @@ class BaseCRUD:
             )
             raise
 
+    def iter_rows(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        as_dict: bool = True,
+        page_size: int = 50000,
+        itersize: int = 2000,
+        after_id: int = 0
+    ) -> Iterator[Union[Dict[str, Any], tuple]]:
+        """
+        Stream records in id order, in constant memory.
+
+        Records are read in keyset pages (`id > last id seen`, `page_size`
+        rows each), every page through a named server-side cursor fetching
+        `itersize` rows per round trip. A deep page costs as much as the first
+        one, and a walk can be resumed from the last id it yielded.
+
+        Args:
+            table: Table name, with an `id` primary key
+            columns: Columns to select, `id` is added first when missing
+            where: Where conditions, as in select
+            as_dict: Yield dicts, or plain tuples in column order
+            page_size: Rows per keyset page
+            itersize: Rows per fetch from the server-side cursor
+            after_id: Start after this id
+
+        Yields:
+            Matching records
+        """
+        columns = list(columns) if columns else None
+        if columns and 'id' not in columns:
+            columns.insert(0, 'id')
+        conditions, params = _where_shape(where)
+
+        def build():
+            where_items = _where_items(conditions) + ["id > %(after_id)s"]
+            return (
+                f"SELECT {', '.join(columns) if columns else '*'} FROM {table} "
+                f"WHERE {' AND '.join(where_items)} ORDER BY id LIMIT %(page_size)s"
+            )
+
+        statement = get_statement(('iter', table, tuple(columns) if columns else None, conditions), build)
+        params['page_size'] = page_size
+        id_index = columns.index('id') if columns else None
+        last_id = after_id
+        total = 0
+
+        try:
+            while True:
+                params['after_id'] = last_id
+                rows = 0
+                started = time.perf_counter()
+                # Outside a transaction the cursor must be WITH HOLD, which keeps its page on the server
+                with self.conn.cursor(
+                    name=f"iter_{table}_{next(_cursor_ids)}",
+                    cursor_factory=RealDictCursor if as_dict else None,
+                    withhold=self.conn.autocommit
+                ) as cur:
+                    cur.itersize = itersize
+                    cur.execute(statement.sql, params)
+                    statement.record(time.perf_counter() - started, False)
+                    for row in cur:
+                        if as_dict:
+                            last_id = row['id']
+                        else:
+                            if id_index is None:
+                                id_index = [column.name for column in cur.description].index('id')
+                            last_id = row[id_index]
+                        rows += 1
+                        yield row
+
+                total += rows
+                if rows < page_size:
+                    break
+
+            logfire.debug(
+                "Streamed records",
+                table=table,
+                rows=total
+            )
+
+        except Exception as e:
+            logfire.error(
+                "Error streaming records",
+                table=table,
+                after_id=last_id,
+                error=str(e)
+            )
+            raise
+
     def delete(
         self,
         table: str,
@@ -314,16 +628,20 @@ class BaseCRUD:
             Optional list of deleted records
         """
         try:
-            where_items = [f"{k} = %({k})s" for k in where.keys()]
-            
-            query = f"""
-                DELETE FROM {table}
-                WHERE {' AND '.join(where_items)}
-                {' RETURNING *' if return_deleted else ''}
-            """
-            
-            result = self.execute_query(
-                query,
+            where_columns = tuple(where.keys())
+
+            def build():
+                where_items = [f"{k} = %({k})s" for k in where_columns]
+                return f"""
+                    DELETE FROM {table}
+                    WHERE {' AND '.join(where_items)}
+                    {' RETURNING *' if return_deleted else ''}
+                """
+
+            statement = get_statement(('delete', table, where_columns, return_deleted), build)
+
+            result = self.execute_statement(
+                statement,
                 where,
                 fetch=return_deleted
             )
@@ -362,17 +680,21 @@ class BaseCRUD:
             Whether matching records exist
         """
         try:
-            where_items = [f"{k} = %({k})s" for k in where.keys()]
-            
-            query = f"""
-                SELECT EXISTS (
-                    SELECT 1 FROM {table}
-                    WHERE {' AND '.join(where_items)}
-                ) AS exists
-            """
-            
-            result = self.execute_query(
-                query,
+            where_columns = tuple(where.keys())
+
+            def build():
+                where_items = [f"{k} = %({k})s" for k in where_columns]
+                return f"""
+                    SELECT EXISTS (
+                        SELECT 1 FROM {table}
+                        WHERE {' AND '.join(where_items)}
+                    ) AS exists
+                """
+
+            statement = get_statement(('exists', table, where_columns), build)
+
+            result = self.execute_statement(
+                statement,
                 where,
                 fetch=True,
                 fetch_one=True
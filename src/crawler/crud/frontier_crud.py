@@ -1,11 +1,12 @@
 # 1. Update src/crawler/crud/frontier_crud.py
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Union
 from datetime import datetime
 from urllib.parse import urlparse
 import logfire
+from psycopg2.extras import execute_values
 
-from crawler.crud.basic_crud import BaseCRUD
+from crawler.crud.basic_crud import BaseCRUD, get_statement
 from crawler.models.frontier_model import (
     FrontierUrl, 
     FrontierStatistics, 
@@ -13,6 +14,49 @@ from crawler.models.frontier_model import (
     UrlState
 )
 
+# Columns streamed by FrontierCRUD.bulk_load, url_state is always pending
+COPY_COLUMNS = (
+    'url', 'category', 'url_type', 'depth', 'max_depth', 'main_domain',
+    'target_patterns', 'seed_pattern', 'is_target', 'parent_url'
+)
+
+
+def _csv_field(value) -> str:
+    """COPY CSV field: NULL unquoted, everything else quoted"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (list, tuple)):
+        # Array literal, each element quoted and escaped
+        value = '{' + ','.join(
+            'NULL' if element is None else '"' + str(element).replace('\\', '\\\\').replace('"', '\\"') + '"'
+            for element in value
+        ) + '}'
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class _CopyStream:
+    """Read-only file over the CSV lines of an iterator of rows, built as COPY reads them"""
+
+    def __init__(self, rows: Iterator[tuple]):
+        self._rows = rows
+        self._buffer = ''
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += ','.join(_csv_field(value) for value in row) + '\n'
+            self.count += 1
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
 class FrontierCRUD(BaseCRUD):
     """CRUD operations for frontier_url table using aiosql queries"""
     
@@ -64,6 +108,153 @@ class FrontierCRUD(BaseCRUD):
             )
             raise
 
+    def bulk_insert_urls(self, frontier_urls: List[FrontierUrl], page_size: int = 1000) -> int:
+        """Insert URLs with multi-row INSERTs, skipping the ones already in the frontier
+
+        Returns the number of rows actually inserted; the others conflicted on
+        (url, category).
+        """
+        if not frontier_urls:
+            return 0
+
+        rows = [
+            (
+                str(frontier_url.url),
+                frontier_url.category,
+                frontier_url.url_type.value,
+                frontier_url.depth,
+                frontier_url.max_depth,
+                urlparse(str(frontier_url.url)).netloc,
+                frontier_url.target_patterns,
+                frontier_url.seed_pattern,
+                frontier_url.is_target,
+                str(frontier_url.parent_url) if frontier_url.parent_url else None,
+                UrlState.PENDING.value
+            )
+            for frontier_url in frontier_urls
+        ]
+
+        try:
+            with self.conn.cursor() as cur:
+                inserted = execute_values(
+                    cur,
+                    """
+                    INSERT INTO frontier_url (
+                        url, category, url_type, depth, max_depth, main_domain,
+                        target_patterns, seed_pattern, is_target, parent_url, url_state
+                    )
+                    VALUES %s
+                    ON CONFLICT (url, category) DO NOTHING
+                    RETURNING id
+                    """,
+                    rows,
+                    page_size=page_size,
+                    fetch=True
+                )
+            self.conn.commit()
+            return len(inserted)
+
+        except Exception as e:
+            self.conn.rollback()
+            logfire.error(
+                "Error bulk inserting frontier URLs",
+                rows=len(rows),
+                error=str(e)
+            )
+            raise
+
+    @staticmethod
+    def _copy_row(row: Union[FrontierUrl, Dict[str, Any]]) -> tuple:
+        if isinstance(row, FrontierUrl):
+            row = {
+                'url': str(row.url),
+                'category': row.category,
+                'url_type': row.url_type.value,
+                'depth': row.depth,
+                'max_depth': row.max_depth,
+                'target_patterns': row.target_patterns,
+                'seed_pattern': row.seed_pattern,
+                'is_target': row.is_target,
+                'parent_url': str(row.parent_url) if row.parent_url else None
+            }
+        url = str(row['url'])
+        url_type = row['url_type']
+        return (
+            url,
+            row['category'],
+            url_type.value if isinstance(url_type, UrlType) else int(url_type),
+            row.get('depth', 0),
+            row.get('max_depth', 0),
+            row.get('main_domain') or urlparse(url).netloc,
+            row.get('target_patterns'),
+            row.get('seed_pattern'),
+            bool(row.get('is_target', False)),
+            row.get('parent_url')
+        )
+
+    def bulk_load(self, rows: Iterable[Union[FrontierUrl, Dict[str, Any]]], chunk_size: int = 65536) -> Dict[str, int]:
+        """Load URLs with COPY through a staging table, skipping the ones already in the frontier
+
+        Rows are FrontierUrl models or dicts with their fields (dicts are not
+        validated). They are encoded while COPY reads them, so a generator is
+        never held in memory. The staging table is merged into frontier_url
+        with ON CONFLICT DO NOTHING in the same transaction; within the load the
+        first row of a (url, category) wins.
+
+        Returns the number of rows read, inserted and skipped as duplicates.
+        """
+        stream = _CopyStream(self._copy_row(row) for row in rows)
+        columns = ', '.join(COPY_COLUMNS)
+        autocommit = self.conn.autocommit
+
+        try:
+            self.conn.autocommit = False
+            with self.conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TEMP TABLE frontier_url_staging (
+                        ord BIGSERIAL,
+                        url TEXT NOT NULL,
+                        category TEXT NOT NULL,
+                        url_type INTEGER NOT NULL,
+                        depth INTEGER NOT NULL DEFAULT 0,
+                        max_depth INTEGER NOT NULL DEFAULT 0,
+                        main_domain TEXT,
+                        target_patterns TEXT [],
+                        seed_pattern TEXT,
+                        is_target BOOLEAN NOT NULL DEFAULT false,
+                        parent_url TEXT
+                    ) ON COMMIT DROP
+                """)
+                cur.copy_expert(
+                    f"COPY frontier_url_staging ({columns}) FROM STDIN WITH (FORMAT csv)",
+                    stream,
+                    size=chunk_size
+                )
+                cur.execute(f"""
+                    INSERT INTO frontier_url ({columns}, url_state)
+                    SELECT DISTINCT ON (url, category) {columns}, 'pending'
+                    FROM frontier_url_staging
+                    ORDER BY url, category, ord
+                    ON CONFLICT (url, category) DO NOTHING
+                """)
+                inserted = cur.rowcount
+            self.conn.commit()
+
+        except Exception as e:
+            self.conn.rollback()
+            logfire.error(
+                "Error bulk loading frontier URLs",
+                rows=stream.count,
+                error=str(e)
+            )
+            raise
+        finally:
+            self.conn.autocommit = autocommit
+
+        result = {'rows': stream.count, 'inserted': inserted, 'duplicates': stream.count - inserted}
+        logfire.info("Bulk loaded frontier URLs", **result)
+        return result
+
     def get_unprocessed_urls(self, limit: int = 100) -> List[FrontierUrl]:
         """Get batch of unprocessed URLs"""
         try:
@@ -119,11 +310,115 @@ class FrontierCRUD(BaseCRUD):
             raise
         
 
+    def get_url_validators(self, urls: List[str], category: str) -> List[Dict[str, Any]]:
+        """Get stored ETag, Last-Modified and Content-Length of URLs in a category"""
+        try:
+            results = self.queries.get_url_validators(
+                self.conn,
+                urls=list(urls),
+                category=category
+            )
+            return [
+                dict(zip(('url', 'etag', 'last_modified', 'content_length'), row))
+                if isinstance(row, tuple) else dict(row)
+                for row in results
+            ]
+
+        except Exception as e:
+            logfire.error(
+                "Error getting URL validators",
+                category=category,
+                error=str(e)
+            )
+            return []
+
+    def update_url_validators(
+        self,
+        url: str,
+        category: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_length: Optional[int] = None,
+        changed: bool = True
+    ) -> None:
+        """Store validators of a target, setting it back to pending if it changed"""
+        try:
+            self.queries.update_url_validators(
+                self.conn,
+                url=url,
+                category=category,
+                etag=etag,
+                last_modified=last_modified,
+                content_length=content_length,
+                changed=changed
+            )
+
+        except Exception as e:
+            logfire.error(
+                "Error updating URL validators",
+                url=url,
+                error=str(e)
+            )
+            raise
+
+    def iter_urls(
+        self,
+        category: Optional[Union[str, List[str]]] = None,
+        url_state: Optional[Union[str, List[str]]] = None,
+        columns: Optional[List[str]] = None,
+        as_dict: bool = True,
+        page_size: int = 50000,
+        itersize: int = 2000,
+        after_id: int = 0
+    ) -> Iterator[Union[Dict[str, Any], tuple]]:
+        """Stream frontier rows in id order, as dicts or tuples, without validating them
+
+        See BaseCRUD.iter_rows, a list of categories or states matches any of them.
+        """
+        where = {}
+        if category is not None:
+            where['category'] = category
+        if url_state is not None:
+            where['url_state'] = url_state
+        return self.iter_rows(
+            self.table,
+            columns=columns,
+            where=where,
+            as_dict=as_dict,
+            page_size=page_size,
+            itersize=itersize,
+            after_id=after_id
+        )
+
+    def iter_unprocessed_urls(
+        self,
+        category: Optional[Union[str, List[str]]] = None,
+        **kwargs
+    ) -> Iterator[Union[Dict[str, Any], tuple]]:
+        """Stream the pending frontier rows, the streaming counterpart of get_unprocessed_urls"""
+        return self.iter_urls(category=category, url_state=UrlState.PENDING.value, **kwargs)
+
+    def iter_url_keys(self, categories: List[str], itersize: int = 20000) -> Iterator[tuple]:
+        """Stream the (url, category) pairs of the given categories"""
+        rows = self.iter_urls(
+            category=list(categories),
+            columns=['id', 'url', 'category'],
+            as_dict=False,
+            page_size=10 * itersize,
+            itersize=itersize
+        )
+        for _, url, category in rows:
+            yield url, category
+
     def exists_in_frontier(self, url: str) -> bool:
         """Check if URL exists in frontier"""
         try:
-            result = self.execute_query(
-                "SELECT EXISTS(SELECT 1 FROM frontier_url WHERE url = %(url)s) AS exists",
+            statement = get_statement(
+                ('exists_in_frontier', 'frontier_url'),
+                lambda: "SELECT EXISTS(SELECT 1 FROM frontier_url WHERE url = %(url)s) AS exists"
+            )
+            result = self.execute_statement(
+                statement,
                 {'url': url},
                 fetch=True,
                 fetch_one=True
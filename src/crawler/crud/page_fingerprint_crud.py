@@ -0,0 +1,60 @@
+# src/crawler/crud/page_fingerprint_crud.py
+
+from typing import List
+import logfire
+
+from crawler.crud.basic_crud import BaseCRUD
+from crawler.models.page_fingerprint_model import PageFingerprint
+
+FINGERPRINT_COLUMNS = ('url', 'category', 'fingerprint', 'depth', 'link_count', 'target_urls', 'seed_urls')
+
+class PageFingerprintCRUD(BaseCRUD):
+    """CRUD operations for page_fingerprint table using aiosql queries"""
+
+    def __init__(self, conn, queries):
+        super().__init__(conn, queries)
+        self.table = "page_fingerprint"
+
+    def upsert_fingerprint(self, page: PageFingerprint) -> None:
+        """Create or update the fingerprint of a page"""
+        try:
+            self.queries.upsert_page_fingerprint(
+                self.conn,
+                url=page.url,
+                category=page.category,
+                fingerprint=page.fingerprint,
+                depth=page.depth,
+                link_count=page.link_count,
+                target_urls=page.target_urls,
+                seed_urls=page.seed_urls
+            )
+
+        except Exception as e:
+            logfire.error(
+                "Error storing page fingerprint",
+                url=page.url,
+                error=str(e)
+            )
+            raise
+
+    def get_fingerprints(self, categories: List[str]) -> List[PageFingerprint]:
+        """Get the fingerprints of all pages of the given categories"""
+        try:
+            results = self.queries.get_page_fingerprints(
+                self.conn,
+                categories=list(categories)
+            )
+            return [
+                PageFingerprint.model_validate(
+                    dict(zip(FINGERPRINT_COLUMNS, row)) if isinstance(row, tuple) else dict(row)
+                )
+                for row in results
+            ]
+
+        except Exception as e:
+            logfire.error(
+                "Error getting page fingerprints",
+                categories=categories,
+                error=str(e)
+            )
+            return []
@@ -1,12 +1,237 @@
 import os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import psycopg2
-from psycopg2 import pool, Error as PsycopgError
+from psycopg2 import extensions, pool, Error as PsycopgError
 from psycopg2.extras import execute_values
 import aiosql
 import logfire
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Union
 from dotenv import load_dotenv
+from crawler.utils.migration_utils import MigrationRunner, load_migrations
+
+
+class PoolTimeout(pool.PoolError):
+    """No connection became free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with health checks and metrics
+
+    Connections are opened on demand up to `maxconn`, in autocommit with the
+    `session_settings` applied, and a checkout waits up to `timeout` seconds
+    for a free one before raising PoolTimeout. A connection idle for more than
+    `health_check_interval` seconds is pinged before it is handed out, and
+    broken ones are replaced. Connections returned inside a transaction are
+    rolled back and put back in autocommit.
+
+    With `stats` set (the crawler stats) the metrics are published as
+    `db_pool/*` values after every checkout and return.
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        connection_params: Dict[str, Any],
+        session_settings: Optional[Dict[str, Any]] = None,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+        stats=None
+    ):
+        self.minconn = minconn
+        self.maxconn = max(1, maxconn)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.stats = stats
+        self._connection_params = connection_params
+        self._session_settings = session_settings or {}
+        self._idle = []  # (connection, returned at), most recently returned last
+        self._in_use = {}
+        self._opening = 0
+        self._closed = False
+        self._lock = threading.Condition()
+        self._metrics = {
+            'checkouts': 0,
+            'wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'timeouts': 0,
+            'max_in_use': 0,
+            'created': 0,
+            'closed': 0,
+            'health_check_failures': 0
+        }
+
+        for _ in range(min(minconn, self.maxconn)):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    @property
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connection_params)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                for name, value in self._session_settings.items():
+                    cur.execute("SELECT set_config(%s, %s, false)", (name, str(value)))
+        except Exception:
+            conn.close()
+            raise
+        with self._lock:
+            self._metrics['created'] += 1
+        return conn
+
+    def getconn(self, key=None, timeout: Optional[float] = None):
+        """Check out a healthy connection, waiting up to `timeout` seconds (the pool's by default)"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout if timeout else None
+
+        while True:
+            conn = None
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise pool.PoolError("connection pool is closed")
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        self._in_use[id(conn)] = conn
+                        break
+                    if self._size < self.maxconn:
+                        self._opening += 1
+                        break
+                    remaining = deadline - time.monotonic() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeout(f"no connection available within {timeout}s, {len(self._in_use)} in use")
+                    self._lock.wait(remaining)
+
+            if conn is None:
+                # Open the new connection outside the lock, its slot is reserved
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opening -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._opening -= 1
+                    self._in_use[id(conn)] = conn
+            elif not self._is_healthy(conn, returned_at):
+                with self._lock:
+                    self._metrics['health_check_failures'] += 1
+                self._discard(conn)
+                continue
+
+            self._record_checkout(time.monotonic() - started)
+            return conn
+
+    def _is_healthy(self, conn, returned_at: float) -> bool:
+        if conn.closed or conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except Exception as e:
+            logfire.warning("Discarding broken database connection", error=str(e))
+            return False
+
+    def putconn(self, conn, key=None, close: bool = False):
+        """Return a connection, closing it when asked to or when it cannot be reset"""
+        with self._lock:
+            if id(conn) not in self._in_use:
+                raise pool.PoolError("trying to put unkeyed connection")
+
+        if not close and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not conn.autocommit:
+                    conn.autocommit = True
+            except Exception:
+                close = True
+
+        if close or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            del self._in_use[id(conn)]
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+        self._publish()
+
+    def _discard(self, conn):
+        with self._lock:
+            self._in_use.pop(id(conn), None)
+            self._metrics['closed'] += 1
+            self._lock.notify()
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._publish()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """A connection checked out for the with block"""
+        conn = self.getconn(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def _record_checkout(self, waited: float):
+        waited_ms = waited * 1000
+        with self._lock:
+            self._metrics['checkouts'] += 1
+            self._metrics['wait_ms'] += waited_ms
+            self._metrics['max_wait_ms'] = max(self._metrics['max_wait_ms'], waited_ms)
+            self._metrics['max_in_use'] = max(self._metrics['max_in_use'], len(self._in_use))
+        self._publish()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Checkouts, wait time, connections in use and churn so far"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['in_use'] = len(self._in_use)
+            metrics['idle'] = len(self._idle)
+            metrics['size'] = self._size
+        metrics['wait_ms'] = round(metrics['wait_ms'], 2)
+        metrics['max_wait_ms'] = round(metrics['max_wait_ms'], 2)
+        metrics['avg_wait_ms'] = round(metrics['wait_ms'] / metrics['checkouts'], 3) if metrics['checkouts'] else 0.0
+        return metrics
+
+    def _publish(self):
+        if self.stats:
+            for name, value in self.metrics().items():
+                self.stats.set_value(f'db_pool/{name}', value)
+
+    def closeall(self):
+        """Close every connection, in use or idle, and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            conns = [conn for conn, _ in self._idle] + list(self._in_use.values())
+            self._idle = []
+            self._in_use = {}
+            self._lock.notify_all()
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        logfire.info("Closed database connection pool", **self.metrics())
+
 
 class DatabaseManager:
     def __init__(self):
@@ -21,6 +246,22 @@ class DatabaseManager:
             'database': os.getenv('POSTGRES_DATABASE', 'postgres'),
             'sslmode': os.getenv('POSTGRES_SSLMODE', 'prefer')
         }
+
+        self._pool_params = {
+            'minconn': int(os.getenv('POSTGRES_POOL_MIN', 1)),
+            'maxconn': int(os.getenv('POSTGRES_POOL_MAX', 10)),
+            'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT', 30)),
+            'health_check_interval': float(os.getenv('POSTGRES_HEALTH_CHECK_INTERVAL', 30))
+        }
+
+        # Applied to every new connection, timeouts in milliseconds (0 keeps the server default)
+        self._session_settings = {'application_name': os.getenv('POSTGRES_APPLICATION_NAME', 'crawler')}
+        for name, variable in (
+            ('statement_timeout', 'POSTGRES_STATEMENT_TIMEOUT'),
+            ('idle_in_transaction_session_timeout', 'POSTGRES_IDLE_IN_TRANSACTION_TIMEOUT')
+        ):
+            if int(os.getenv(variable, 0)):
+                self._session_settings[name] = int(os.getenv(variable))
         
         # Load SQL files
         self._load_sql_files()
@@ -37,6 +278,9 @@ class DatabaseManager:
             
             with open(schema_file) as f:
                 self.schema_sql = f.read()
+
+            # schema.sql is version 1, later changes are numbered migrations
+            self.migrations = load_migrations(self.schema_sql, sql_dir / 'migrations')
             
             # Load queries
             queries_file = sql_dir / 'queries.sql'
@@ -51,22 +295,25 @@ class DatabaseManager:
             logfire.error(f"Failed to load SQL files: {e}")
             raise
 
-    def initialize(self):
-        """Initialize database connection pool and schema"""
+    def initialize(self, create_schema: bool = True):
+        """Initialize database connection pool and schema
+
+        Args:
+            create_schema: Apply the pending schema migrations, workers skip
+                it when the supervisor already did
+        """
         try:
-            # Create connection pool
-            self.pool = psycopg2.pool.SimpleConnectionPool(
-                minconn=1,
-                maxconn=10,
-                **self._connection_params
+            # Create connection pool, thread-safe for the async DB threads,
+            # every connection it opens is in autocommit
+            self.pool = ConnectionPool(
+                connection_params=self._connection_params,
+                session_settings=self._session_settings,
+                **self._pool_params
             )
 
-            # **Set autocommit mode on all connections in the pool**
-            for conn in self.pool._pool:
-                conn.autocommit = True
-
-            # Create schema
-            self._execute_schema_creation()
+            # Create or migrate the schema
+            if create_schema:
+                self.migrate()
          
         except PsycopgError as e:
             logfire.error(
@@ -82,34 +329,25 @@ class DatabaseManager:
             logfire.error(f"Failed to initialize database: {e}")
             raise
         
-    def _execute_schema_creation(self):
-        """Execute schema creation SQL with proper error handling"""
+    def migrate(self, target: Optional[int] = None) -> int:
+        """Apply the pending schema migrations, returning the schema version
+
+        A current schema costs one read of schema_version and no DDL locks.
+        """
         if not self.pool:
             raise RuntimeError("Database pool not initialized")
-            
-        conn = self.pool.getconn()
+
         try:
-            with conn.cursor() as cur:
-                # First drop existing types if they exist
-                cur.execute("""
-                    DROP TYPE IF EXISTS url_state_type CASCADE;
-                    DROP TYPE IF EXISTS config_state_type CASCADE;
-                """)
-                
-                # Create ENUMs and tables
-                cur.execute(self.schema_sql)
-                conn.commit()
-            
+            with self.pool.connection() as conn:
+                return MigrationRunner(self.migrations).migrate(conn, target=target)
+
         except PsycopgError as e:
-            conn.rollback()
             logfire.error(
-                "Schema creation failed",
+                "Schema migration failed",
                 error=str(e),
                 error_type=type(e).__name__
             )
             raise
-        finally:
-            self.pool.putconn(conn)
             
     # Rest of the code remains the same
             
@@ -194,6 +432,12 @@ class DatabaseManager:
             if conn:
                 self.pool.putconn(conn)
             
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager checking out a pooled connection for the with block"""
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+        return self.pool.connection(timeout=timeout)
+
     def close(self):
         """Close database connections"""
         if self.pool:
@@ -203,5 +447,60 @@ class DatabaseManager:
             except Exception as e:
                 logfire.error(f"Error closing database connections: {e}")
 
+class AsyncDatabaseManager:
+    """Awaitable access to a DatabaseManager through a dedicated DB thread pool
+
+    psycopg2 calls block, so each call runs in one of `max_workers` threads
+    with its own pooled connection, and the event loop (Scrapy's reactor)
+    only awaits the result. The sync DatabaseManager keeps working next to it.
+    """
+
+    def __init__(self, manager: DatabaseManager, max_workers: int = 4):
+        self.manager = manager
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            if not self.manager.pool:
+                self.manager.initialize()
+            # One connection per thread, leave one for the sync callers
+            max_workers = max(1, min(self.max_workers, self.manager.pool.maxconn - 1))
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+        return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking callable in the DB threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), lambda: fn(*args, **kwargs))
+
+    async def run_with_connection(self, fn, *args, **kwargs):
+        """Run fn(conn, *args, **kwargs) in the DB threads with a connection checked out for the call"""
+        return await self.run(self._call_with_connection, fn, *args, **kwargs)
+
+    def _call_with_connection(self, fn, *args, **kwargs):
+        with self.manager.connection() as conn:
+            return fn(conn, *args, **kwargs)
+
+    async def execute_query(
+        self,
+        query: str,
+        params: Optional[Union[tuple, dict]] = None,
+        fetch: bool = False,
+        fetch_one: bool = False
+    ) -> Optional[List[tuple]]:
+        return await self.run(self.manager.execute_query, query, params, fetch=fetch, fetch_one=fetch_one)
+
+    async def execute_batch(self, query: str, params_list: List[Union[tuple, dict]], page_size: int = 1000) -> None:
+        await self.run(self.manager.execute_batch, query, params_list, page_size=page_size)
+
+    def close(self):
+        """Wait for running calls and stop the DB threads, the connections stay with the manager"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
 # Singleton instance
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = DatabaseManager()
+async_db_manager = AsyncDatabaseManager(db_manager)
\ No newline at end of file
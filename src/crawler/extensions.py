@@ -0,0 +1,121 @@
+# src/crawler/extensions.py
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Deque
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+import logfire
+
+
+@dataclass
+class DomainThrottleState:
+    """Observed behaviour of one download slot (one host)"""
+    latency: float = 0.0
+    outcomes: Deque[bool] = field(default_factory=deque)
+    successes_since_change: int = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class AdaptiveDomainThrottle:
+    """Tune concurrency and delay of every download slot from its latency and errors
+
+    Each host has its own Scrapy download slot, so independent sites are
+    crawled in parallel while each one is throttled on its own:
+      - failure with error rate above ADAPTIVE_THROTTLE_ERROR_RATE: concurrency halved, delay doubled
+      - latency above ADAPTIVE_THROTTLE_TARGET_LATENCY: one slot less, delay increased
+      - otherwise, after a few successes: one slot more, delay decreased
+    Current slot state is published in the adaptive_throttle/<host>/* stats.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool('ADAPTIVE_THROTTLE_ENABLED'):
+            raise NotConfigured
+
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.max_concurrency = settings.getint('ADAPTIVE_THROTTLE_MAX_CONCURRENCY', 4)
+        self.min_delay = settings.getfloat('ADAPTIVE_THROTTLE_MIN_DELAY', 0.5)
+        self.max_delay = settings.getfloat('ADAPTIVE_THROTTLE_MAX_DELAY', 30.0)
+        self.target_latency = settings.getfloat('ADAPTIVE_THROTTLE_TARGET_LATENCY', 10.0)
+        self.max_error_rate = settings.getfloat('ADAPTIVE_THROTTLE_ERROR_RATE', 0.2)
+        self.window = settings.getint('ADAPTIVE_THROTTLE_WINDOW', 20)
+        self.increase_after = settings.getint('ADAPTIVE_THROTTLE_INCREASE_AFTER', 3)
+
+        self._states: Dict[str, DomainThrottleState] = {}
+        self._downloaded = set()
+
+        crawler.signals.connect(self._response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(self._request_left_downloader, signal=signals.request_left_downloader)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def _response_downloaded(self, response, request, spider):
+        self._downloaded.add(id(request))
+        failed = response.status == 429 or response.status >= 500
+        self._observe(request, failed=failed, latency=request.meta.get('download_latency'))
+
+    def _request_left_downloader(self, request, spider):
+        # Leaving the downloader without a downloaded response means a download error
+        if id(request) in self._downloaded:
+            self._downloaded.discard(id(request))
+            return
+        self._observe(request, failed=True, latency=None)
+
+    def _observe(self, request, failed: bool, latency):
+        key = request.meta.get('download_slot')
+        slot = self.crawler.engine.downloader.slots.get(key) if key else None
+        if slot is None:
+            return
+
+        state = self._states.setdefault(key, DomainThrottleState())
+        state.outcomes.append(not failed)
+        while len(state.outcomes) > self.window:
+            state.outcomes.popleft()
+        if latency is not None:
+            # Exponentially weighted, a single slow page does not halve throughput
+            state.latency = latency if not state.latency else 0.7 * state.latency + 0.3 * latency
+
+        self._adjust(key, slot, state, failed)
+
+    def _adjust(self, key: str, slot, state: DomainThrottleState, failed: bool):
+        old_concurrency, old_delay = slot.concurrency, slot.delay
+
+        if failed:
+            state.successes_since_change = 0
+            if state.error_rate > self.max_error_rate:
+                slot.concurrency = max(1, slot.concurrency // 2)
+                slot.delay = min(self.max_delay, max(slot.delay, self.min_delay) * 2)
+        elif state.latency > self.target_latency:
+            slot.concurrency = max(1, slot.concurrency - 1)
+            slot.delay = min(self.max_delay, max(slot.delay, self.min_delay) * 1.25)
+            state.successes_since_change = 0
+        elif state.error_rate <= self.max_error_rate:
+            state.successes_since_change += 1
+            if state.successes_since_change >= self.increase_after:
+                slot.concurrency = min(self.max_concurrency, slot.concurrency + 1)
+                slot.delay = max(self.min_delay, slot.delay * 0.75)
+                state.successes_since_change = 0
+
+        if (slot.concurrency, slot.delay) != (old_concurrency, old_delay):
+            logfire.debug(
+                "Adjusted download slot",
+                slot=key,
+                concurrency=slot.concurrency,
+                delay=round(slot.delay, 2),
+                latency=round(state.latency, 2),
+                error_rate=round(state.error_rate, 2)
+            )
+
+        self.stats.set_value(f'adaptive_throttle/{key}/concurrency', slot.concurrency)
+        self.stats.set_value(f'adaptive_throttle/{key}/delay', round(slot.delay, 2))
+        self.stats.set_value(f'adaptive_throttle/{key}/latency', round(state.latency, 2))
+        self.stats.set_value(f'adaptive_throttle/{key}/error_rate', round(state.error_rate, 2))
@@ -14,8 +14,22 @@ class UrlItem(scrapy.Item):
     seed_pattern = scrapy.Field()
     max_depth = scrapy.Field()
     error = scrapy.Field()
+    etag = scrapy.Field()
+    last_modified = scrapy.Field()
+    content_length = scrapy.Field()
+    content_changed = scrapy.Field()
     
 
+class PageFingerprintItem(scrapy.Item):
+    url = scrapy.Field()
+    category = scrapy.Field()
+    fingerprint = scrapy.Field()
+    depth = scrapy.Field()
+    link_count = scrapy.Field()
+    target_urls = scrapy.Field()
+    seed_urls = scrapy.Field()
+
+
 class ConfigUrlLogItem(scrapy.Item):
     url = scrapy.Field()
     category = scrapy.Field()
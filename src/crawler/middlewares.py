@@ -3,11 +3,16 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
-from scrapy import signals
+from scrapy import signals, Request
+from scrapy.exceptions import NotConfigured
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from crawler.items import UrlItem
+from crawler.utils.page_pool_utils import get_main_domain
+from crawler.utils.dedup_utils import DedupFilter, canonicalize_url
+
 
 class CrawlerSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -56,6 +61,80 @@ class CrawlerSpiderMiddleware:
         spider.logger.info("Spider opened: %s" % spider.name)
 
 
+class DedupSpiderMiddleware:
+    """Drop duplicate seed requests and UrlItems before they are scheduled
+
+    Keys are canonical URLs per category, so the same seed linked from
+    several listing pages (or twice on one page) is requested once. Only
+    requests flagged with meta['dedup'] are filtered: start requests,
+    pagination and Playwright escalations of a page are never dropped.
+    Items of revalidated targets always pass. The request filter lives for
+    one run; the item filter can be persisted with DEDUP_PERSIST so URLs
+    already sent to the frontier in earlier runs are not written again.
+    """
+
+    def __init__(self, request_filter: DedupFilter, item_filter: DedupFilter):
+        self.request_filter = request_filter
+        self.item_filter = item_filter
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('DEDUP_ENABLED', True):
+            raise NotConfigured
+
+        kind = settings.get('DEDUP_FILTER', 'bloom')
+        capacity = settings.getint('DEDUP_CAPACITY', 1_000_000)
+        error_rate = settings.getfloat('DEDUP_ERROR_RATE', 1e-6)
+        request_filter = DedupFilter(
+            DedupFilter.create_backend(kind, capacity, error_rate),
+            stats=crawler.stats,
+            stats_prefix='dedup/requests'
+        )
+        item_filter = DedupFilter(
+            DedupFilter.create_backend(kind, capacity, error_rate),
+            path=settings.get('DEDUP_PATH') if settings.getbool('DEDUP_PERSIST') else None,
+            stats=crawler.stats,
+            stats_prefix='dedup/items'
+        )
+        middleware = cls(request_filter, item_filter)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.request_filter.load()
+        self.item_filter.load()
+
+    def spider_closed(self, spider):
+        self.item_filter.save()
+
+    def process_spider_output(self, response, result, spider):
+        for output in result:
+            if not self._is_duplicate(output):
+                yield output
+
+    async def process_spider_output_async(self, response, result, spider):
+        async for output in result:
+            if not self._is_duplicate(output):
+                yield output
+
+    def _is_duplicate(self, output) -> bool:
+        if isinstance(output, Request):
+            if not output.meta.get('dedup'):
+                return False
+            key = f"{output.meta.get('category')}\n{canonicalize_url(output.url)}"
+            return self.request_filter.seen(key)
+
+        if isinstance(output, UrlItem):
+            if output.get('content_changed') is not None:
+                return False
+            key = f"{output.get('category')}\n{output.get('is_target')}\n{canonicalize_url(str(output['url']))}"
+            return self.item_filter.seen(key)
+
+        return False
+
+
 class CrawlerDownloaderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
     # scrapy acts as if the downloader middleware does not modify the
@@ -101,3 +180,68 @@ class CrawlerDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class PagePoolDownloaderMiddleware:
+    """Give every domain its own browser context and reuse pooled pages.
+
+    New contexts start from the domain's cached storage state when cookie
+    consent was already accepted in a previous run. Requests that need a new
+    page wait for a permit of the spider's open page limiter, closing an idle
+    pooled page if that is what keeps the limit reached.
+
+    process_request runs when the request enters the downloader, before it
+    waits in its domain slot queue and download delay. A pooled page taken
+    here, or a permit acquired here, is therefore held for that whole wait,
+    so with a download delay fewer pages than the limit are actually
+    rendering. Its priority must stay above RetryMiddleware so that unused
+    permits are released before a failed request is retried.
+    """
+
+    async def process_request(self, request, spider):
+        if not request.meta.get('playwright'):
+            return None
+
+        domain = get_main_domain(request.url)
+        request.meta.setdefault('playwright_context', domain)
+        request.meta['page_pool_domain'] = domain
+
+        # Only used by scrapy-playwright when the domain context is created
+        consent_cache = getattr(spider, 'consent_cache', None)
+        storage_state = consent_cache.get(domain) if consent_cache else None
+        if storage_state and 'playwright_context_kwargs' not in request.meta:
+            request.meta['playwright_context_kwargs'] = {'storage_state': storage_state}
+
+        pool = getattr(spider, 'page_pool', None)
+        current_page = request.meta.get('playwright_page')
+        if current_page is not None and not current_page.is_closed():
+            return None
+        if pool:
+            page = pool.acquire(domain)
+            if page:
+                request.meta['playwright_page'] = page
+                return None
+
+        limiter = getattr(spider, 'page_limiter', None)
+        if limiter and not request.meta.get('page_permit'):
+            if limiter.locked() and pool:
+                await pool.evict_idle()
+            await limiter.acquire()
+            request.meta['page_permit'] = True
+        return None
+
+    def process_response(self, request, response, spider):
+        self._release_unused_permit(request, spider)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self._release_unused_permit(request, spider)
+        return None
+
+    @staticmethod
+    def _release_unused_permit(request, spider):
+        """Release a permit whose page was never created"""
+        if request.meta.pop('page_permit', False):
+            limiter = getattr(spider, 'page_limiter', None)
+            if limiter:
+                limiter.release()
@@ -1,5 +1,6 @@
 from .config_url_log_model import ConfigUrlLog, ConfigState
 from .frontier_model import FrontierUrl, FrontierStatistics, UrlType, UrlState, FrontierBatch
+from .page_fingerprint_model import PageFingerprint
 
 __all__ = [
     'ConfigUrlLog',
@@ -8,5 +9,6 @@ __all__ = [
     'FrontierStatistics',
     'UrlType',
     'UrlState',
-    'FrontierBatch'
+    'FrontierBatch',
+    'PageFingerprint'
 ]
\ No newline at end of file
@@ -50,6 +50,12 @@ class FrontierUrl(BaseModel):
     insert_date: Optional[datetime] = None
     last_update: Optional[datetime] = None
 
+    # Validators of target documents
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+    last_validated: Optional[datetime] = None
+
     @field_validator('main_domain', mode='before')
     def set_main_domain(cls, v, info):
         """Extract and validate main domain from URL if not provided."""
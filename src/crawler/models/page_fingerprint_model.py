@@ -0,0 +1,22 @@
+# src/crawler/models/page_fingerprint_model.py
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class PageFingerprint(BaseModel):
+    """Model representing the link set fingerprint of a crawled listing or seed page."""
+
+    url: str = Field(..., min_length=1)
+    category: str = Field(..., min_length=1, max_length=255)
+    fingerprint: str = Field(..., min_length=1)
+    depth: int = Field(default=0, ge=0)
+    link_count: int = Field(default=0, ge=0)
+    target_urls: List[str] = Field(default_factory=list)
+    seed_urls: List[str] = Field(default_factory=list)
+
+    id: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
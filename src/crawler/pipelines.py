@@ -1,56 +1,214 @@
 # src/crawler/pipelines.py
 
+import asyncio
+import time
+from contextlib import contextmanager
 import logfire
-from crawler.items import UrlItem, ConfigUrlLogItem
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import task
+from crawler.items import UrlItem, ConfigUrlLogItem, PageFingerprintItem
 from crawler.models.frontier_model import FrontierUrl, UrlState, UrlType
 from crawler.models.config_url_log_model import ConfigUrlLog, ConfigState
+from crawler.models.page_fingerprint_model import PageFingerprint
 from crawler.crud.config_url_log_crud import ConfigUrlLogCRUD
 from crawler.crud.frontier_crud import FrontierCRUD
-from crawler.database import db_manager
+from crawler.crud.page_fingerprint_crud import PageFingerprintCRUD
+from crawler.crud.basic_crud import statement_stats
+from crawler.crud.async_crud import AsyncConfigUrlLogCRUD, AsyncFrontierCRUD, AsyncPageFingerprintCRUD
+from crawler.database import db_manager, AsyncDatabaseManager
+from crawler.utils.known_url_utils import KnownUrlCache
 
 class DatabasePipeline:
-    def __init__(self):
-        # Initialize database manager
+    """Store crawl items, buffering UrlItems into multi-row frontier inserts
+
+    UrlItems are flushed with one INSERT ... ON CONFLICT DO NOTHING when the
+    buffer holds `buffer_size` URLs, when it is older than `flush_interval`
+    seconds and when the spider closes. Config logs and fingerprints are
+    written as they come.
+
+    With an AsyncDatabaseManager every write runs in its DB threads and
+    process_item returns a Deferred, so a slow database never blocks the
+    reactor. Without one (scripts, reprocessing) items are written inline.
+    """
+
+    def __init__(
+        self,
+        stats=None,
+        buffer_size: int = 500,
+        flush_interval: float = 5.0,
+        flush_retries: int = 3,
+        async_db: AsyncDatabaseManager = None,
+        known_urls: KnownUrlCache = None
+    ):
+        # Initialize database manager, connections are checked out per write
         if not db_manager.pool:
             db_manager.initialize()
-        self.conn = db_manager.pool.getconn()
         self.queries = db_manager.queries
-        self.config_crud = ConfigUrlLogCRUD(self.conn, self.queries)
-        self.frontier_crud = FrontierCRUD(self.conn, self.queries)
         self.stats_cache = {}
 
+        self.stats = stats
+        if stats is not None:
+            db_manager.pool.stats = stats
+        self.buffer_size = max(1, buffer_size)
+        self.flush_interval = flush_interval
+        self.flush_retries = max(0, flush_retries)
+        self._buffer = {}
+        self._validator_updates = []
+        self._buffer_started = None
+        # Failed flushes in a row, and when a full buffer may be flushed again
+        self._flush_failures = 0
+        self._retry_after = 0.0
+        self._flush_loop = None
+
+        # URLs already in the frontier never reach the database again
+        self.known_urls = known_urls
+
+        self.async_db = async_db
+        self._pending_flushes = set()
+        if async_db is not None:
+            self.async_config_crud = AsyncConfigUrlLogCRUD(async_db)
+            self.async_frontier_crud = AsyncFrontierCRUD(async_db)
+            self.async_fingerprint_crud = AsyncPageFingerprintCRUD(async_db)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        async_db = None
+        if crawler.settings.getbool('DB_ASYNC', False):
+            async_db = AsyncDatabaseManager(db_manager, max_workers=crawler.settings.getint('DB_THREADS', 4))
+        return cls(
+            stats=crawler.stats,
+            buffer_size=crawler.settings.getint('DB_BUFFER_SIZE', 500),
+            flush_interval=crawler.settings.getfloat('DB_FLUSH_INTERVAL', 5.0),
+            flush_retries=crawler.settings.getint('DB_FLUSH_RETRIES', 3),
+            async_db=async_db,
+            known_urls=KnownUrlCache.from_settings(crawler.settings, stats=crawler.stats)
+        )
+
+    def open_spider(self, spider):
+        if self.known_urls is not None and hasattr(spider, 'selected_url_configs'):
+            with db_manager.connection() as conn:
+                self.known_urls.load(
+                    conn,
+                    self.queries,
+                    (category for category, _ in spider.selected_url_configs())
+                )
+
+        # Flush URLs of pages that trickle in, not only full buffers
+        if self.flush_interval and self.flush_interval > 0:
+            self._flush_loop = task.LoopingCall(self._flush_if_due)
+            self._flush_loop.start(self.flush_interval, now=False)
+
     def close_spider(self, spider):
-        # Release database connection
-        db_manager.pool.putconn(self.conn)
+        if self._flush_loop and self._flush_loop.running:
+            self._flush_loop.stop()
+        if self.async_db is not None:
+            return deferred_from_coro(self._close_async())
+        try:
+            # Failed rows go back to the buffer until the retries run out
+            while self._buffer or self._validator_updates:
+                try:
+                    self.flush()
+                except Exception:
+                    pass
+        finally:
+            self._record_statement_stats()
+
+    async def _close_async(self):
+        try:
+            if self._pending_flushes:
+                await asyncio.gather(*self._pending_flushes, return_exceptions=True)
+            while self._buffer or self._validator_updates:
+                try:
+                    await self.flush_async()
+                except Exception:
+                    pass
+        finally:
+            self.async_db.close()
+            self._record_statement_stats()
 
     def process_item(self, item, spider):
+        if self.async_db is not None:
+            return deferred_from_coro(self.process_item_async(item))
+
         if isinstance(item, UrlItem):
             self._process_url_item(item)
         elif isinstance(item, ConfigUrlLogItem):
             self._process_config_log_item(item)
+        elif isinstance(item, PageFingerprintItem):
+            self._process_fingerprint_item(item)
         return item
 
+    async def process_item_async(self, item):
+        """process_item with the writes awaited in the DB threads"""
+        if isinstance(item, UrlItem):
+            if self._buffer_url_item(item):
+                try:
+                    await self.flush_async()
+                except Exception:
+                    # Logged, the rows stay buffered and the item itself was stored fine
+                    pass
+        elif isinstance(item, ConfigUrlLogItem):
+            try:
+                log_id = await self.async_config_crud.create_log(self._config_log_entry(item))
+            except Exception as e:
+                logfire.error(f"Error processing ConfigUrlLogItem: {e}", item=item)
+                raise
+            if not log_id:
+                logfire.error("Failed to create/update log entry", url=item['url'], category=item['category'])
+        elif isinstance(item, PageFingerprintItem):
+            try:
+                await self.async_fingerprint_crud.upsert_fingerprint(self._page_fingerprint(item))
+            except Exception as e:
+                logfire.error(f"Error processing PageFingerprintItem: {e}", url=item.get('url'))
+                raise
+        return item
+
+    @staticmethod
+    def _page_fingerprint(item: PageFingerprintItem) -> PageFingerprint:
+        return PageFingerprint(
+            url=item['url'],
+            category=item['category'],
+            fingerprint=item['fingerprint'],
+            depth=item.get('depth', 0),
+            link_count=item.get('link_count', 0),
+            target_urls=item.get('target_urls', []),
+            seed_urls=item.get('seed_urls', [])
+        )
+
+    @staticmethod
+    def _config_log_entry(item: ConfigUrlLogItem) -> ConfigUrlLog:
+        return ConfigUrlLog(
+            url=item['url'],
+            category=item['category'],
+            url_type=item['type'],
+            config_state=ConfigState(item['status']),
+            max_depth=item.get('max_depth', 0),
+            target_patterns=item.get('target_patterns'),
+            seed_pattern=item.get('seed_pattern'),
+            error_message=item.get('error_message'),
+            target_urls_found=item.get('target_count', 0),
+            seed_urls_found=item.get('seed_count', 0)
+        )
+
+    def _process_fingerprint_item(self, item: PageFingerprintItem):
+        try:
+            with self._crud(PageFingerprintCRUD) as crud:
+                crud.upsert_fingerprint(self._page_fingerprint(item))
+
+        except Exception as e:
+            logfire.error(f"Error processing PageFingerprintItem: {e}", url=item.get('url'))
+            raise
+
     def _process_config_log_item(self, item: ConfigUrlLogItem):
         try:
             category = item['category']
             url = item['url']
-            status = item['status']
-            
-            log_entry = ConfigUrlLog(
-                url=url,
-                category=category,
-                url_type=item['type'],
-                config_state=ConfigState(status),
-                max_depth=item.get('max_depth', 0),
-                target_patterns=item.get('target_patterns'),
-                seed_pattern=item.get('seed_pattern'),
-                error_message=item.get('error_message'),
-                target_urls_found=item.get('target_count', 0),
-                seed_urls_found=item.get('seed_count', 0)
-            )
+
+            log_entry = self._config_log_entry(item)
 
             # CHANGED: Always create/update log entry
-            log_id = self.config_crud.create_log(log_entry)
+            with self._crud(ConfigUrlLogCRUD) as crud:
+                log_id = crud.create_log(log_entry)
             if not log_id:
                 logfire.error("Failed to create/update log entry", url=url, category=category)
                 return
@@ -70,37 +228,28 @@ class DatabasePipeline:
             raise
 
     def _process_url_item(self, item: UrlItem):
+        if self._buffer_url_item(item):
+            try:
+                self.flush()
+            except Exception:
+                # Logged, the rows stay buffered and the item itself was stored fine
+                pass
+
+    def _buffer_url_item(self, item: UrlItem) -> bool:
+        """Add a UrlItem to the buffer, True when the buffer is full and may be flushed"""
         try:
-            # Check if URL exists
-            if not self.frontier_crud.exists_in_frontier(str(item['url'])):
-                # Convert item to FrontierUrl model
-                frontier_url = FrontierUrl(
-                    url=item['url'],
-                    category=item['category'],
-                    url_type=UrlType(item['type']),
-                    depth=item['depth'],
-                    is_target=item['is_target'],
-                    parent_url=item.get('parent_url'),
-                    target_patterns=item.get('target_patterns'),
-                    seed_pattern=item.get('seed_pattern'),
-                    max_depth=item['max_depth'],
-                    url_state=UrlState.PENDING
-                )
-                
-                # Create URL in frontier
-                url_id = self.frontier_crud.create_url(frontier_url)
-                if url_id:
-                    logfire.debug(
-                        "Created new frontier URL",
-                        url=str(frontier_url.url),
-                        category=frontier_url.category,
-                        is_target=frontier_url.is_target
-                    )
-                else:
-                    logfire.error(
-                        "Failed to create frontier URL",
-                        url=str(frontier_url.url)
-                    )
+            frontier_url = FrontierUrl(
+                url=item['url'],
+                category=item['category'],
+                url_type=UrlType(item['type']),
+                depth=item['depth'],
+                is_target=item['is_target'],
+                parent_url=item.get('parent_url'),
+                target_patterns=item.get('target_patterns'),
+                seed_pattern=item.get('seed_pattern'),
+                max_depth=item['max_depth'],
+                url_state=UrlState.PENDING
+            )
 
         except Exception as e:
             logfire.error(
@@ -109,3 +258,162 @@ class DatabasePipeline:
                 error=str(e)
             )
             raise
+
+        # The first item of a URL wins, as the conflict clause would decide
+        key = (str(frontier_url.url), frontier_url.category)
+        if key not in self._buffer and not (self.known_urls is not None and self.known_urls.is_known(*key)):
+            self._buffer[key] = frontier_url
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+
+        # Revalidated targets carry their validators, stored once the row exists
+        if item.get('content_changed') is not None:
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+            self._validator_updates.append({
+                'url': str(item['url']),
+                'category': item['category'],
+                'etag': item.get('etag'),
+                'last_modified': item.get('last_modified'),
+                'content_length': item.get('content_length'),
+                'changed': item['content_changed']
+            })
+
+        return len(self._buffer) >= self.buffer_size and time.monotonic() >= self._retry_after
+
+    def _flush_if_due(self):
+        if self._buffer_started is None or time.monotonic() - self._buffer_started < self.flush_interval:
+            return
+        if self.async_db is not None:
+            flush = asyncio.ensure_future(self.flush_async())
+            self._pending_flushes.add(flush)
+            flush.add_done_callback(self._pending_flushes.discard)
+            # Already logged, keep the timer running for the next rows
+            flush.add_done_callback(lambda done: done.cancelled() or done.exception())
+            return
+        try:
+            self.flush()
+        except Exception:
+            # Already logged, keep the timer running for the next rows
+            pass
+
+    def _take_buffer(self):
+        frontier_urls = list(self._buffer.values())
+        validator_updates = self._validator_updates
+        self._buffer = {}
+        self._validator_updates = []
+        self._buffer_started = None
+        return frontier_urls, validator_updates
+
+    def flush(self):
+        """Insert the buffered URLs and apply the pending validator updates"""
+        if not self._buffer and not self._validator_updates:
+            return
+
+        frontier_urls, validator_updates = self._take_buffer()
+        started = time.perf_counter()
+        try:
+            with self._crud(FrontierCRUD) as crud:
+                inserted = crud.bulk_insert_urls(frontier_urls, page_size=self.buffer_size)
+                for update in validator_updates:
+                    crud.update_url_validators(**update)
+        except Exception as e:
+            self._flush_failed(frontier_urls, validator_updates, e)
+            raise
+        self._record_flush(frontier_urls, validator_updates, inserted, started)
+
+    async def flush_async(self):
+        """flush() with the writes awaited in the DB threads"""
+        if not self._buffer and not self._validator_updates:
+            return
+
+        frontier_urls, validator_updates = self._take_buffer()
+        started = time.perf_counter()
+        try:
+            inserted = await self.async_frontier_crud.bulk_insert_urls(frontier_urls, page_size=self.buffer_size)
+            for update in validator_updates:
+                await self.async_frontier_crud.update_url_validators(**update)
+        except Exception as e:
+            self._flush_failed(frontier_urls, validator_updates, e)
+            raise
+        self._record_flush(frontier_urls, validator_updates, inserted, started)
+
+    def _flush_failed(self, frontier_urls, validator_updates, e: Exception):
+        """Put the rows of a failed flush back in the buffer, or drop them once the retries ran out"""
+        self._inc_stat('db/flush_errors')
+        self._flush_failures += 1
+        retry = self._flush_failures <= self.flush_retries
+        logfire.error(
+            "Error flushing frontier URLs",
+            rows=len(frontier_urls),
+            validator_updates=len(validator_updates),
+            attempt=self._flush_failures,
+            retry=retry,
+            error=str(e)
+        )
+
+        if not retry:
+            self._flush_failures = 0
+            self._inc_stat('db/dropped_urls', len(frontier_urls))
+            self._inc_stat('db/dropped_validator_updates', len(validator_updates))
+            return
+
+        # Rows buffered meanwhile came later, the failed ones still win on conflict
+        buffer = {(str(frontier_url.url), frontier_url.category): frontier_url for frontier_url in frontier_urls}
+        for key, frontier_url in self._buffer.items():
+            buffer.setdefault(key, frontier_url)
+        self._buffer = buffer
+        self._validator_updates = validator_updates + self._validator_updates
+        # Retried by the timer, or by a full buffer, after one flush interval
+        self._buffer_started = time.monotonic()
+        self._retry_after = self._buffer_started + (self.flush_interval or 0)
+
+    def _record_flush(self, frontier_urls, validator_updates, inserted: int, started: float):
+        self._flush_failures = 0
+        self._retry_after = 0.0
+        if self.known_urls is not None:
+            for frontier_url in frontier_urls:
+                self.known_urls.add(str(frontier_url.url), frontier_url.category)
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._inc_stat('db/flushes')
+        self._inc_stat('db/flush_rows', len(frontier_urls))
+        self._inc_stat('db/inserted_urls', inserted)
+        self._inc_stat('db/duplicate_urls', len(frontier_urls) - inserted)
+        self._inc_stat('db/flush_ms', elapsed_ms)
+        if self.stats:
+            self.stats.max_value('db/max_flush_ms', elapsed_ms)
+            self.stats.max_value('db/max_flush_rows', len(frontier_urls))
+            flushes = self.stats.get_value('db/flushes')
+            self.stats.set_value('db/avg_flush_ms', round(self.stats.get_value('db/flush_ms') / flushes, 2))
+            self.stats.set_value('db/avg_rows_per_flush', round(self.stats.get_value('db/flush_rows') / flushes, 1))
+
+        logfire.debug(
+            "Flushed frontier URLs",
+            rows=len(frontier_urls),
+            inserted=inserted,
+            validator_updates=len(validator_updates),
+            flush_ms=elapsed_ms
+        )
+
+    @contextmanager
+    def _crud(self, crud_class):
+        """A sync CRUD on a pooled connection checked out for one write"""
+        with db_manager.connection() as conn:
+            yield crud_class(conn, self.queries)
+
+    def _record_statement_stats(self):
+        """Calls and cumulative latency of the generated CRUD statements, per operation and table"""
+        if not self.stats:
+            return
+        for row in statement_stats():
+            if row['calls']:
+                self._inc_stat(f"db/statements/{row['statement']}/calls", row['calls'])
+                self._inc_stat(f"db/statements/{row['statement']}/prepared_calls", row['prepared_calls'])
+                if row['reprepared']:
+                    self._inc_stat(f"db/statements/{row['statement']}/reprepared", row['reprepared'])
+                self._inc_stat(f"db/statements/{row['statement']}/total_ms", row['total_ms'])
+
+    def _inc_stat(self, key: str, count=1):
+        if self.stats:
+            self.stats.inc_value(key, count)
@@ -21,6 +21,19 @@ ITEM_PIPELINES = {
     "crawler.pipelines.DatabasePipeline": 300,
 }
 
+SPIDER_MIDDLEWARES = {
+    "crawler.middlewares.DedupSpiderMiddleware": 600,
+}
+
+DOWNLOADER_MIDDLEWARES = {
+    # Above RetryMiddleware (550) so unused page permits are released before retries
+    "crawler.middlewares.PagePoolDownloaderMiddleware": 560,
+}
+
+EXTENSIONS = {
+    "crawler.extensions.AdaptiveDomainThrottle": 500,
+}
+
 # Playwright Settings
 PLAYWRIGHT_LAUNCH_OPTIONS = {
     "headless": False,
@@ -31,9 +44,89 @@ PLAYWRIGHT_LAUNCH_OPTIONS = {
 }
 
 # Performance Settings
-CONCURRENT_REQUESTS = 1
+# Hosts are crawled in parallel, each starting with one slot;
+# AdaptiveDomainThrottle then tunes concurrency and delay per host
+CONCURRENT_REQUESTS = 8
 CONCURRENT_REQUESTS_PER_DOMAIN = 1
 
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 4
+ADAPTIVE_THROTTLE_MIN_DELAY = 0.5
+ADAPTIVE_THROTTLE_MAX_DELAY = 30.0
+ADAPTIVE_THROTTLE_TARGET_LATENCY = 10.0  # Seconds, Playwright pages included
+ADAPTIVE_THROTTLE_ERROR_RATE = 0.2
+ADAPTIVE_THROTTLE_WINDOW = 20
+
+# Maximum number of browser pages open at the same time, idle pooled pages included
+PLAYWRIGHT_MAX_OPEN_PAGES = 4
+
+# Link extraction: "evaluate" collects all anchors in one in-page evaluation,
+# "per_anchor" reads each href with its own round trip (fallback)
+LINK_EXTRACTION_MODE = "evaluate"
+LINK_EXTRACTION_FRAMES = False  # Also collect anchors of iframes, in both modes
+
+# Page pool: one browser context per domain, pages are reused across requests
+PAGE_POOL_ENABLED = True
+PAGE_POOL_MAX_IDLE_PER_DOMAIN = 2
+PAGE_POOL_MAX_IDLE = 8
+PAGE_POOL_MAX_NAVIGATIONS = 25  # Recycle a page after this many uses
+
+# Hybrid fetch: "auto" fetches listing pages over plain HTTP first and renders
+# them with Playwright only when needed, "always" / "never" force one path
+RENDER_MODE = "auto"
+RENDER_DOMAIN_ESCALATIONS = 3  # Escalated pages before a whole domain is rendered
+
+# Cookie consent: storage state saved once per domain and reused by new contexts
+CONSENT_STATE_ENABLED = True
+CONSENT_STATE_DIR = ".cache/storage_state"
+CONSENT_STATE_TTL = 86400  # Seconds
+
+# Snapshots: final HTML of every crawled listing page, compressed and
+# content-addressed, replayed offline by src/tools/reprocess.py
+SNAPSHOT_ENABLED = True
+SNAPSHOT_DIR = ".cache/snapshots"
+SNAPSHOT_COMPRESS_LEVEL = 6
+
+# Type 0 targets: "head" compares stored ETag / Last-Modified / Content-Length
+# with a HEAD response, "conditional" sends a conditional GET, "off" always GETs
+REVALIDATION_MODE = "head"
+
+# Incremental recrawl: seed pages whose link set fingerprints the same as in the
+# previous run are not expanded again, their known targets are re-emitted
+INCREMENTAL_CRAWL_ENABLED = True
+
+# Dedup of seed requests and UrlItems on canonical URLs before scheduling:
+# "bloom" (bounded memory, DEDUP_ERROR_RATE false positives) or "exact"
+DEDUP_ENABLED = True
+DEDUP_FILTER = "bloom"
+DEDUP_CAPACITY = 1_000_000
+DEDUP_ERROR_RATE = 1e-6
+# Keep the item filter between runs; delete the file after cleaning the database
+DEDUP_PERSIST = False
+DEDUP_PATH = ".cache/dedup/items.filter.gz"
+
+# Link joining, classification and the found-links log of Playwright pages run
+# off the event loop: "thread", "process" (spawned workers, hrefs split in
+# chunks of LINK_EXECUTOR_CHUNK_SIZE) or "off" to run them inline
+LINK_EXECUTOR = "thread"
+LINK_EXECUTOR_WORKERS = 2
+LINK_EXECUTOR_CHUNK_SIZE = 2000
+
+# Frontier URLs are buffered and inserted with one multi-row INSERT when the
+# buffer holds DB_BUFFER_SIZE URLs, every DB_FLUSH_INTERVAL seconds and on close
+DB_BUFFER_SIZE = 500
+DB_FLUSH_INTERVAL = 5.0
+# Failed flushes keep their rows buffered and are retried this many times
+DB_FLUSH_RETRIES = 3
+# Pipeline writes run in DB_THREADS database threads and are awaited by the
+# reactor; False writes inline on the reactor thread
+DB_ASYNC = True
+DB_THREADS = 4
+
+# (url, category) keys of the crawled categories loaded from frontier_url at
+# startup, so URLs already stored are not sent to the database again
+KNOWN_URL_CACHE_ENABLED = True
+
 # Retry Settings 
 RETRY_ENABLED = True
 RETRY_TIMES = 1
@@ -74,7 +167,7 @@ LOG_STDOUT = True  # Capture standard output
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
 FEED_EXPORT_ENCODING = "utf-8"
 
-DOWNLOAD_DELAY = 2
+DOWNLOAD_DELAY = 2  # Start delay of every host, adapted by AdaptiveDomainThrottle
 RANDOMIZE_DOWNLOAD_DELAY = True
 DOWNLOAD_TIMEOUT = 30
 PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT = 30000
@@ -1,15 +1,26 @@
 from datetime import datetime
+import asyncio
 import os
-from urllib.parse import quote, unquote, urljoin
+import time
+from urllib.parse import quote, unquote
 import glob 
 from crawler.utils.url_utils import is_valid_url
 import scrapy
 import traceback
 import logfire
-from crawler.utils.config_utils import load_crawler_config
+from crawler.utils.config_utils import load_crawler_config, resolve_url_config
 from crawler.utils.crawl_manager_utils import CrawlManager
-from crawler.items import ConfigUrlLogItem, UrlItem
+from crawler.items import ConfigUrlLogItem, UrlItem, PageFingerprintItem
 from crawler.utils.playwright_utils import PlaywrightPageManager
+from crawler.utils.page_pool_utils import PlaywrightPagePool, OpenPageLimiter, get_main_domain
+from crawler.utils.storage_state_utils import StorageStateCache
+from crawler.utils.resource_blocking_utils import ResourceBlocker
+from crawler.utils.render_utils import RenderDecider
+from crawler.utils.snapshot_utils import SnapshotStore
+from crawler.utils.revalidation_utils import TargetRevalidator
+from crawler.utils.fingerprint_utils import PageFingerprintIndex, link_set_fingerprint
+from crawler.utils.pagination_utils import PaginationTracker
+from crawler.utils.link_executor_utils import LinkProcessingExecutor
 from crawler.utils.logging_utils import setup_logging, write_to_log
 
 setup_logging()
@@ -37,60 +48,96 @@ class FrontierSpider(scrapy.Spider):
         "PLAYWRIGHT_BROWSER_TYPE": "chromium",
     }
 
-    def __init__(self, url_seed_root_id=None, *args, **kwargs):
+    def __init__(self, url_seed_root_id=None, url_seed_root_ids=None, run_id=None, worker=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.config = load_crawler_config()
         self.url_seed_root_id = int(url_seed_root_id) if url_seed_root_id is not None else None
+
+        # Set of roots to crawl, None for all; url_seed_root_ids is a comma-separated shard
+        self.url_seed_root_ids = None
+        if url_seed_root_ids is not None:
+            if isinstance(url_seed_root_ids, str):
+                url_seed_root_ids = url_seed_root_ids.split(',')
+            self.url_seed_root_ids = {int(root_id) for root_id in url_seed_root_ids if str(root_id).strip()}
+        if self.url_seed_root_id is not None:
+            self.url_seed_root_ids = (self.url_seed_root_ids or set()) | {self.url_seed_root_id}
         
-        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')  # Identificatore univoco per l'esecuzione
-        logfire.info(f"Initialized spider", url_seed_root_id=self.url_seed_root_id)
+        # Identificatore univoco per l'esecuzione, condiviso dai worker di run_spider.py --workers
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Each worker writes its own snapshot manifest and found links log
+        self.worker_part = f"worker{int(worker)}" if worker is not None else None
+        self.page_pool = None
+        self.page_limiter = None
+        self.consent_cache = None
+        self.render_decider = None
+        self.snapshot_store = None
+        self.revalidator = None
+        self.fingerprint_index = None
+        self.pagination = None
+        self.link_executor = None
+        logfire.info(
+            f"Initialized spider",
+            url_seed_root_ids=sorted(self.url_seed_root_ids) if self.url_seed_root_ids is not None else "all",
+            run_id=self.run_id,
+            worker=self.worker_part
+        )
      
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.page_pool = PlaywrightPagePool.from_settings(crawler.settings, stats=crawler.stats)
+        spider.page_limiter = OpenPageLimiter.from_settings(crawler.settings, stats=crawler.stats)
+        spider.consent_cache = StorageStateCache.from_settings(crawler.settings, stats=crawler.stats)
+        spider.render_decider = RenderDecider(
+            crawler.settings.get('RENDER_MODE', 'auto'),
+            stats=crawler.stats,
+            domain_escalations=crawler.settings.getint('RENDER_DOMAIN_ESCALATIONS', 3)
+        )
+        spider.snapshot_store = SnapshotStore.from_settings(crawler.settings, stats=crawler.stats)
+        spider.revalidator = TargetRevalidator.from_settings(crawler.settings, stats=crawler.stats)
+        spider.fingerprint_index = PageFingerprintIndex.from_settings(crawler.settings, stats=crawler.stats)
+        spider.pagination = PaginationTracker(stats=crawler.stats)
+        spider.link_executor = LinkProcessingExecutor.from_settings(crawler.settings, stats=crawler.stats)
+        return spider
+
     def start_requests(self):
         """Generate initial requests from config"""
         try:
-            for category in self.config.get('categories', []):
-             
-                category_name = category['name']
-              
-
-                for url_config in category.get('urls', []):
-
-                    if self.url_seed_root_id is not None and url_config.get('url_seed_root_id') != self.url_seed_root_id:
-                        continue
-                     
-                    url = url_config['url']
-                    url_type = url_config['type']
-                    
-                    if url_type == 0:
-                        yield scrapy.Request(
-                            url=url,
-                            callback=self.parse_direct,
-                            errback=self.errback_direct,
-                            meta={
-                                'category': category_name,
-                                'url_config': url_config,
-                                'depth': 0
-                            },
-                            dont_filter=True
-                        )
-                    
-                    elif url_type in (1, 2):
-                        yield scrapy.Request(
-                            url=url,
-                            callback=self.parse_with_playwright,
-                            errback=self.errback_playwright,
-                            meta={
-                                'playwright': True,
-                                'playwright_include_page': True,
-                                'full_page': True,
-                                'category': category_name,
-                                'url_config': url_config,
-                                'depth': 0
-                            },
-                            dont_filter=True
-                        )
-                    else:
-                        logfire.warning(f"Unsupported URL type: {url_type}", url=url)
+            url_configs = self.selected_url_configs()
+
+            if self.revalidator:
+                # One query for the validators of all direct targets
+                self.revalidator.load(
+                    (url_config['url'], category_name)
+                    for category_name, url_config in url_configs
+                    if url_config['type'] == 0
+                )
+
+            if self.fingerprint_index:
+                self.fingerprint_index.load(
+                    category_name
+                    for category_name, url_config in url_configs
+                    if url_config['type'] in (1, 2)
+                )
+
+            for category_name, url_config in url_configs:
+                url = url_config['url']
+                url_type = url_config['type']
+
+                if url_type == 0:
+                    revalidation = self.revalidator.request_kwargs(url, url_config) if self.revalidator else {}
+                    yield self._direct_request(url, category_name, url_config, revalidation)
+
+                elif url_type in (1, 2):
+                    yield self._page_request(url, category_name, url_config, depth=0, pagination=(url, 0))
+                    # Further listing pages requested together with the first one
+                    if self.pagination:
+                        for page_number, page_url in self.pagination.start(url, url_config):
+                            yield self._page_request(
+                                page_url, category_name, url_config, depth=0, pagination=(url, page_number)
+                            )
+                else:
+                    logfire.warning(f"Unsupported URL type: {url_type}", url=url)
            
         except Exception as e:
             logfire.error(
@@ -99,12 +146,109 @@ class FrontierSpider(scrapy.Spider):
                 traceback=traceback.format_exc()
             )
 
+    def selected_url_configs(self) -> list:
+        """(category name, resolved url config) of the roots this spider crawls"""
+        url_configs = []
+        for category in self.config.get('categories', []):
+            category_name = category['name']
+            for url_config in category.get('urls', []):
+                if self.url_seed_root_ids is not None and url_config.get('url_seed_root_id') not in self.url_seed_root_ids:
+                    continue
+                url_configs.append((category_name, resolve_url_config(category, url_config)))
+        return url_configs
+
+    def _direct_request(self, url: str, category: str, url_config: dict, revalidation: dict = None):
+        """Build the request of a type 0 target, a HEAD or conditional GET when revalidating"""
+        revalidation = dict(revalidation or {})
+        meta = {
+            'category': category,
+            'url_config': url_config,
+            'depth': 0,
+            **revalidation.pop('meta', {})
+        }
+        if revalidation:
+            meta['revalidate'] = True
+
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_direct,
+            errback=self.errback_direct,
+            meta=meta,
+            dont_filter=True,
+            **revalidation
+        )
+
+    def _page_request(self, url: str, category: str, url_config: dict, depth: int, parent_url: str = None, pagination: tuple = None):
+        """Build the request of a listing or seed page, rendered or plain HTTP
+
+        pagination is the (root url, page number) of a listing page.
+        """
+        meta = {
+            'category': category,
+            'url_config': url_config,
+            'depth': depth
+        }
+        if parent_url:
+            meta['parent_url'] = parent_url
+            # Child seed pages are deduplicated by DedupSpiderMiddleware
+            meta['dedup'] = True
+        if pagination and url_config.get('pagination'):
+            meta['pagination_root'], meta['page_number'] = pagination
+
+        if self.render_decider is None or self.render_decider.use_playwright(url_config, get_main_domain(url)):
+            return self._playwright_request(url, meta)
+
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_http,
+            errback=self.errback_http,
+            meta=meta,
+            dont_filter=True
+        )
+
+    def _playwright_request(self, url: str, meta: dict):
+        """Build a Playwright-rendered request"""
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_with_playwright,
+            errback=self.errback_playwright,
+            meta={**self._playwright_meta(), **meta},
+            dont_filter=True
+        )
+
+    def _playwright_meta(self) -> dict:
+        """Common request meta for Playwright-rendered pages"""
+        return {
+            'playwright': True,
+            'playwright_include_page': True,
+            'playwright_page_init_callback': self.init_playwright_page,
+        }
+
+    async def init_playwright_page(self, page, request):
+        """Prepare a page before navigation: bind its open page permit, install resource blocking"""
+        if request.meta.pop('page_permit', False) and self.page_limiter:
+            self.page_limiter.bind(page)
+
+        url_config = request.meta.get('url_config') or {}
+        blocker = ResourceBlocker(url_config.get('block_resources'), stats=self.crawler.stats)
+        await blocker.attach(page)
+
     def parse_direct(self, response):
         """Parse direct requests (Type 0)"""
         category = response.meta.get('category')
         url_config = response.meta.get('url_config')
         url = response.url
 
+        revalidation = None
+        if response.meta.get('revalidate'):
+            if self.revalidator.needs_get_fallback(response):
+                yield self._direct_request(
+                    response.request.url, category, url_config,
+                    self.revalidator.conditional_kwargs(response.request.url)
+                )
+                return
+            revalidation = self.revalidator.classify(url, response)
+
         yield ConfigUrlLogItem(
             url=url,
             category=category,
@@ -112,7 +256,7 @@ class FrontierSpider(scrapy.Spider):
             status='running'
         )
 
-        yield UrlItem(
+        item = UrlItem(
             url=url,
             category=category,
             type=url_config['type'],
@@ -122,6 +266,14 @@ class FrontierSpider(scrapy.Spider):
             target_patterns=url_config.get('target_patterns'),
             seed_pattern=url_config.get('seed_pattern')
         )
+        if revalidation:
+            result, validators = revalidation
+            item.update(validators)
+            item['content_changed'] = result != 'unchanged'
+
+        # Unchanged documents are not stored again
+        if not revalidation or item['content_changed']:
+            yield item
 
         yield ConfigUrlLogItem(
             url=url,
@@ -161,128 +313,86 @@ class FrontierSpider(scrapy.Spider):
         category = response.meta.get('category')
         url_config = response.meta.get('url_config')
         current_depth = response.meta.get('depth', 0)
-        parent_url = response.meta.get('parent_url')
+        page_manager = None
     
-        target_count = 0
-        seed_count = 0
-        target_urls = []
-        seed_urls = []
-        
         try:
             if current_depth == 0:
-                yield ConfigUrlLogItem(
-                    url=response.url,
-                    category=category,
-                    type=url_config['type'],
-                    status='running',
-                    max_depth=url_config.get('max_depth', 0),
-                    target_patterns=url_config.get('target_patterns'),
-                    seed_pattern=url_config.get('seed_pattern')
-                )
+                yield self._running_log_item(response.url, category, url_config)
 
-            page_manager = PlaywrightPageManager(page)
+            page_manager = PlaywrightPageManager(
+                page,
+                stats=self.crawler.stats,
+                readiness=url_config.get('readiness'),
+                consent_cache=self.consent_cache,
+                domain=response.meta.get('page_pool_domain') or get_main_domain(response.url),
+                include_frames=url_config.get(
+                    'link_extraction_frames',
+                    self.settings.getbool('LINK_EXTRACTION_FRAMES', False)
+                )
+            )
             await page_manager.initialize_page()
-            
-            base_url = page.url
 
-            # Extract links from main page
-            anchors = await page.query_selector_all('a')
-            urls = [await anchor.get_attribute('href') for anchor in anchors]
-            found_links = [urljoin(base_url, u) for u in urls if u]
+            extraction_mode = url_config.get(
+                'link_extraction',
+                self.settings.get('LINK_EXTRACTION_MODE', 'evaluate')
+            )
+            extraction_time = 0.0
 
-            # Handle modal dialogs
-            buttons = await page.query_selector_all('button[data-bs-toggle="modal"]')
-            
-            for button in buttons:
-                try:
-                    await button.scroll_into_view_if_needed()
-                    await button.click(timeout=5000)
-                    await page.wait_for_selector('.modal.show', timeout=5000)
-                    
-                    modal_anchors = await page.query_selector_all('.modal.show a')
-                    modal_urls = [await anchor.get_attribute('href') for anchor in modal_anchors]
-                    found_links.extend([urljoin(base_url, u) for u in modal_urls if u])
-                    
-                    close_button = await page.query_selector('.modal.show button[data-bs-dismiss="modal"]')
-                    if close_button:
-                        await close_button.click()
-                    await page.wait_for_selector('.modal.show', state='hidden', timeout=5000)
-                except Exception as e:
-                    logfire.warning(f"Error processing modal: {e}")
-                    continue
+            # Extract links from main page
+            started = time.perf_counter()
+            links = await page_manager.extract_links(mode=extraction_mode)
+            extraction_time += time.perf_counter() - started
+            found_links = [link['url'] for link in links]
 
-            # Modifica la sezione che crea la directory dei log e il nome del file
-            # Importa glob per contare i file esistenti
+            # Handle modal dialogs, anchors already found in hidden modals are not repeated
+            started = time.perf_counter()
+            modal_links = await page_manager.harvest_modal_links(mode=extraction_mode)
+            extraction_time += time.perf_counter() - started
+            seen_links = set(found_links)
+            for link in modal_links:
+                if link['url'] not in seen_links:
+                    seen_links.add(link['url'])
+                    found_links.append(link['url'])
 
-            # Crea la directory dei log per la categoria
-            logs_dir = os.path.join('logs', category)
-            os.makedirs(logs_dir, exist_ok=True)
+            self._record_link_extraction(response.url, extraction_mode, extraction_time, len(found_links))
 
-            # Trova tutti i file di log esistenti per la data odierna
-            filename = os.path.join(logs_dir, f'found_links_{self.run_id}.txt')
+            next_selector = (url_config.get('pagination') or {}).get('next_selector')
+            if next_selector and 'pagination_root' in response.meta:
+                response.meta['next_page_url'] = await page.evaluate(
+                    "selector => { const link = document.querySelector(selector); return link ? link.href : null; }",
+                    next_selector
+                )
 
+            if self.snapshot_store:
+                # Final DOM, modals included
+                html = await page.content()
+                await asyncio.to_thread(self._save_snapshot, response, html, 'playwright')
 
-            # Process links
-            crawl_manager = CrawlManager(category, url_config)
-            items = crawl_manager.process_url(response.url, found_links, current_depth)
-            
-            for item in items:
-                if isinstance(item, UrlItem):
-                    item['parent_url'] = parent_url
-                    item['max_depth'] = url_config.get('max_depth', 0)
-                    item['target_patterns'] = url_config.get('target_patterns')
-                    item['seed_pattern'] = url_config.get('seed_pattern')
-                    
-                    yield item
-                    
-                    if item['is_target']:
-                        target_count += 1
-                        target_urls.append(item['url'])
-                    else:
-                        seed_count += 1
-                        seed_urls.append(item['url'])
-                        
-                        # Genera nuove richieste solo se la profondità corrente è minore della profondità massima
-                        if current_depth < url_config.get('max_depth', 0):
-                            yield scrapy.Request(
-                                url=item['url'],
-                                callback=self.parse_with_playwright,
-                                errback=self.errback_playwright,
-                                meta={
-                                    'playwright': True,
-                                    'playwright_include_page': True,
-                                    'category': category,
-                                    'url_config': url_config,
-                                    'depth': current_depth + 1,
-                                    'parent_url': response.url
-                                },
-                                dont_filter=True
-                            )
-            
-            # Write results to log file
-            content = {
-                'found_links': found_links,
-                'target_urls': target_urls,
-                'seed_urls': seed_urls
-            }
-            write_to_log(filename, content, current_depth, response.url)
-    
-            if current_depth == 0:
-                logfire.info(
-                    "Completing config log",
-                    url=response.url,
-                    category=category,
-                    target_count=target_count,
-                    seed_count=seed_count
+            if self.link_executor:
+                # Join, classify and log in the pool, other pages keep being serviced meanwhile
+                result = await self.link_executor.process(
+                    response.url,
+                    None,
+                    found_links,
+                    category,
+                    url_config,
+                    current_depth,
+                    fingerprint=self.fingerprint_index is not None
                 )
-                yield ConfigUrlLogItem(
-                    url=response.url,
-                    category=category,
-                    type=url_config['type'],
-                    status='completed',
-                    target_count=target_count,
-                    seed_count=seed_count
+                await self.link_executor.write_log(
+                    self._found_links_log(category),
+                    self._found_links_content(result.found_links, result.items),
+                    current_depth,
+                    response.url
                 )
+                started = time.perf_counter()
+                outputs = list(self._link_outputs(response, result.found_links, result.items, result.fingerprint))
+                self.link_executor.record_on_loop(time.perf_counter() - started)
+                for output in outputs:
+                    yield output
+            else:
+                for output in self._process_found_links(response, found_links):
+                    yield output
 
         except Exception as e:
             logfire.error(
@@ -291,6 +401,10 @@ class FrontierSpider(scrapy.Spider):
                 error=str(e),
                 traceback=traceback.format_exc()
             )
+
+            # Return the listing's permit, otherwise the chain waits for this page forever
+            if 'pagination_root' in response.meta:
+                self.pagination.page_failed(response.meta['pagination_root'], response.meta['page_number'])
             
             if current_depth == 0:
                 yield ConfigUrlLogItem(
@@ -302,11 +416,290 @@ class FrontierSpider(scrapy.Spider):
                 )
                 
         finally:
+            # The page goes back to the pool or is closed (returning its open page
+            # permit) even if the manager was never created
+            domain = response.meta.get('page_pool_domain')
             try:
-                await page_manager.cleanup()
+                if page_manager is not None:
+                    await page_manager.cleanup(pool=self.page_pool, domain=domain)
+                elif self.page_pool and domain:
+                    await self.page_pool.release(domain, page)
+                else:
+                    await page.close()
             except Exception as e:
                 logfire.error(f"Error during cleanup: {e}")
 
+    def parse_http(self, response):
+        """Parse a page fetched without a browser, escalating to Playwright when needed"""
+        category = response.meta.get('category')
+        url_config = response.meta.get('url_config')
+        current_depth = response.meta.get('depth', 0)
+
+        found_links = []
+        if hasattr(response, 'css'):
+            hrefs = response.css('a::attr(href)').getall()
+            found_links = [response.urljoin(href.strip()) for href in hrefs if href and href.strip()]
+
+        reason = self.render_decider.escalation_reason(response, found_links, url_config, current_depth)
+        # Deep seeds and listing pages can have no matches, that says nothing about the domain
+        page_only = reason == 'too_few_matches' and (current_depth > 0 or 'pagination_root' in response.meta)
+        self.render_decider.record(get_main_domain(response.url), reason, page_only=page_only)
+        if reason:
+            yield self._playwright_request(response.request.url, self._page_meta(response.meta))
+            return
+
+        try:
+            if current_depth == 0:
+                yield self._running_log_item(response.url, category, url_config)
+
+            if self.snapshot_store:
+                self._save_snapshot(response, response.text, 'http')
+
+            next_selector = (url_config.get('pagination') or {}).get('next_selector')
+            if next_selector and 'pagination_root' in response.meta:
+                next_href = response.css(next_selector).attrib.get('href')
+                response.meta['next_page_url'] = response.urljoin(next_href) if next_href else None
+
+            for output in self._process_found_links(response, found_links):
+                yield output
+
+        except Exception as e:
+            logfire.error(
+                "Error processing page",
+                url=response.url,
+                error=str(e),
+                traceback=traceback.format_exc()
+            )
+
+            if 'pagination_root' in response.meta:
+                self.pagination.page_failed(response.meta['pagination_root'], response.meta['page_number'])
+
+            if current_depth == 0:
+                yield ConfigUrlLogItem(
+                    url=response.url,
+                    category=category,
+                    type=url_config['type'],
+                    status='failed',
+                    error_message=str(e)
+                )
+
+    def errback_http(self, failure):
+        """Retry a failed plain HTTP fetch with Playwright"""
+        request = failure.request
+        logfire.warning(
+            "HTTP fetch failed, retrying with Playwright",
+            url=request.url,
+            error=str(failure.value)
+        )
+        self.render_decider.record(get_main_domain(request.url), 'http_error')
+        yield self._playwright_request(request.url, self._page_meta(request.meta))
+
+    @staticmethod
+    def _page_meta(meta: dict) -> dict:
+        """Crawl state of a page request, without downloader-specific keys"""
+        return {
+            key: meta[key]
+            for key in ('category', 'url_config', 'depth', 'parent_url', 'pagination_root', 'page_number')
+            if key in meta
+        }
+
+    def _save_snapshot(self, response, html: str, source: str):
+        """Store the document of a page with the crawl state needed to reprocess it"""
+        url_config = response.meta.get('url_config') or {}
+        self.snapshot_store.save(
+            self.run_id,
+            response.url,
+            html,
+            {
+                'category': response.meta.get('category'),
+                'url_seed_root_id': url_config.get('url_seed_root_id'),
+                'config_url': url_config.get('url'),
+                'depth': response.meta.get('depth', 0),
+                'parent_url': response.meta.get('parent_url'),
+                'source': source
+            },
+            part=self.worker_part
+        )
+
+    def _running_log_item(self, url: str, category: str, url_config: dict) -> ConfigUrlLogItem:
+        return ConfigUrlLogItem(
+            url=url,
+            category=category,
+            type=url_config['type'],
+            status='running',
+            max_depth=url_config.get('max_depth', 0),
+            target_patterns=url_config.get('target_patterns'),
+            seed_pattern=url_config.get('seed_pattern')
+        )
+
+    def _process_found_links(self, response, found_links: list):
+        """Yield items, child requests and the completed log for the links found on a page"""
+        category = response.meta.get('category')
+        url_config = response.meta.get('url_config')
+        current_depth = response.meta.get('depth', 0)
+
+        fingerprint = None
+        if self.fingerprint_index:
+            fingerprint = link_set_fingerprint(found_links, url_config)
+
+        # Process links
+        crawl_manager = CrawlManager(category, url_config)
+        items = crawl_manager.process_url(response.url, found_links, current_depth)
+
+        # Write results to log file
+        write_to_log(
+            self._found_links_log(category),
+            self._found_links_content(found_links, items),
+            current_depth,
+            response.url
+        )
+
+        for output in self._link_outputs(response, found_links, items, fingerprint):
+            yield output
+
+    @staticmethod
+    def _found_links_content(found_links: list, items: list) -> dict:
+        url_items = [item for item in items if isinstance(item, UrlItem)]
+        return {
+            'found_links': found_links,
+            'target_urls': [item['url'] for item in url_items if item['is_target']],
+            'seed_urls': [item['url'] for item in url_items if not item['is_target']]
+        }
+
+    def _found_links_log(self, category: str) -> str:
+        # Crea la directory dei log per la categoria
+        logs_dir = os.path.join('logs', category)
+        os.makedirs(logs_dir, exist_ok=True)
+        suffix = f"{self.run_id}.{self.worker_part}" if self.worker_part else self.run_id
+        return os.path.join(logs_dir, f'found_links_{suffix}.txt')
+
+    def _link_outputs(self, response, found_links: list, items: list, fingerprint: str = None):
+        """Yield the items and child requests of classified links, then the page bookkeeping"""
+        category = response.meta.get('category')
+        url_config = response.meta.get('url_config')
+        current_depth = response.meta.get('depth', 0)
+        parent_url = response.meta.get('parent_url')
+
+        target_urls = []
+        seed_urls = []
+
+        # Same links and config as last run: child seed pages are not fetched again
+        unchanged = False
+        if fingerprint and self.fingerprint_index:
+            unchanged = self.fingerprint_index.is_unchanged(response.url, category, fingerprint)
+
+        for item in items:
+            if isinstance(item, UrlItem):
+                item['parent_url'] = parent_url
+                item['max_depth'] = url_config.get('max_depth', 0)
+                item['target_patterns'] = url_config.get('target_patterns')
+                item['seed_pattern'] = url_config.get('seed_pattern')
+
+                yield item
+
+                if item['is_target']:
+                    target_urls.append(item['url'])
+                else:
+                    seed_urls.append(item['url'])
+
+                    # Genera nuove richieste solo se la profondità corrente è minore della profondità massima
+                    if current_depth < url_config.get('max_depth', 0):
+                        if unchanged and self.fingerprint_index.get(item['url'], category):
+                            for known_item in self._known_target_items(item['url'], category, url_config, current_depth + 1, response.url):
+                                yield known_item
+                            continue
+
+                        yield self._page_request(
+                            item['url'],
+                            category,
+                            url_config,
+                            depth=current_depth + 1,
+                            parent_url=response.url
+                        )
+
+        if 'pagination_root' in response.meta:
+            next_pages = self.pagination.page_done(
+                response.meta['pagination_root'],
+                response.meta['page_number'],
+                target_urls + seed_urls,
+                next_url=response.meta.get('next_page_url')
+            )
+            for page_number, page_url in next_pages:
+                yield self._page_request(
+                    page_url,
+                    category,
+                    url_config,
+                    depth=0,
+                    pagination=(response.meta['pagination_root'], page_number)
+                )
+
+        if fingerprint and not unchanged:
+            yield PageFingerprintItem(
+                url=response.url,
+                category=category,
+                fingerprint=fingerprint,
+                depth=current_depth,
+                link_count=len(set(found_links)),
+                target_urls=target_urls,
+                seed_urls=seed_urls
+            )
+
+        if current_depth == 0:
+            logfire.info(
+                "Completing config log",
+                url=response.url,
+                category=category,
+                target_count=len(target_urls),
+                seed_count=len(seed_urls)
+            )
+            yield ConfigUrlLogItem(
+                url=response.url,
+                category=category,
+                type=url_config['type'],
+                status='completed',
+                target_count=len(target_urls),
+                seed_count=len(seed_urls)
+            )
+
+    def _known_target_items(self, seed_url: str, category: str, url_config: dict, depth: int, parent_url: str):
+        """Re-emit the stored targets below an unchanged seed page instead of crawling it"""
+        known_targets = self.fingerprint_index.known_targets(
+            seed_url, category, depth, url_config.get('max_depth', 0), parent_url
+        )
+        self.crawler.stats.inc_value('incremental/skipped_seed_pages')
+        self.crawler.stats.inc_value('incremental/reemitted_targets', len(known_targets))
+
+        for target_url, target_depth, target_parent in known_targets:
+            yield UrlItem(
+                url=target_url,
+                category=category,
+                type=url_config['type'],
+                depth=target_depth,
+                is_target=True,
+                parent_url=target_parent,
+                max_depth=url_config.get('max_depth', 0),
+                target_patterns=url_config.get('target_patterns'),
+                seed_pattern=url_config.get('seed_pattern')
+            )
+
+    def _record_link_extraction(self, url: str, mode: str, elapsed: float, link_count: int):
+        """Record per-page link extraction time in the crawler stats"""
+        elapsed_ms = round(elapsed * 1000, 2)
+        stats = self.crawler.stats
+        stats.inc_value('link_extraction/pages')
+        stats.inc_value('link_extraction/links', link_count)
+        stats.inc_value('link_extraction/time_ms', elapsed_ms)
+        stats.max_value('link_extraction/max_time_ms', elapsed_ms)
+        stats.inc_value(f'link_extraction/mode/{mode}')
+
+        logfire.info(
+            "Links extracted",
+            url=url,
+            mode=mode,
+            link_count=link_count,
+            extraction_ms=elapsed_ms
+        )
+
     async def errback_playwright(self, failure):
         """Handle Playwright failures"""
         logfire.error(
@@ -326,6 +719,9 @@ class FrontierSpider(scrapy.Spider):
         except Exception as e:
             logfire.error(f"Error closing page in errback: {str(e)}")
         
+        if 'pagination_root' in failure.request.meta:
+            self.pagination.page_failed(failure.request.meta['pagination_root'], failure.request.meta['page_number'])
+
         if failure.request.meta.get('depth', 0) == 0:
             category = failure.request.meta.get('category')
             url_config = failure.request.meta.get('url_config')
@@ -339,4 +735,8 @@ class FrontierSpider(scrapy.Spider):
 
     def closed(self, reason):
         """Called when the spider is closed"""
-        logfire.info("Spider closing", reason=reason)
\ No newline at end of file
+        logfire.info("Spider closing", reason=reason)
+        if self.page_pool:
+            self.page_pool.clear()
+        if self.link_executor:
+            self.link_executor.close()
\ No newline at end of file
@@ -0,0 +1,6 @@
+-- Validators of target documents, used to revalidate them without downloading
+ALTER TABLE frontier_url
+ADD COLUMN IF NOT EXISTS etag TEXT,
+    ADD COLUMN IF NOT EXISTS last_modified TEXT,
+    ADD COLUMN IF NOT EXISTS content_length BIGINT,
+    ADD COLUMN IF NOT EXISTS last_validated TIMESTAMP WITH TIME ZONE;
@@ -0,0 +1,16 @@
+-- Link set fingerprints of listing and seed pages
+CREATE TABLE IF NOT EXISTS page_fingerprint (
+    id BIGSERIAL PRIMARY KEY,
+    url TEXT NOT NULL,
+    category TEXT NOT NULL,
+    -- Hash of the sorted hrefs found on the page and of its url config
+    fingerprint TEXT NOT NULL,
+    depth INTEGER NOT NULL DEFAULT 0,
+    link_count INTEGER NOT NULL DEFAULT 0,
+    target_urls TEXT [] NOT NULL DEFAULT '{}',
+    seed_urls TEXT [] NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(url, category)
+);
+CREATE INDEX IF NOT EXISTS idx_page_fingerprint_category ON page_fingerprint(category);
+COMMENT ON TABLE page_fingerprint IS 'Link set fingerprints of listing and seed pages, used to skip unchanged pages on recrawl';
@@ -0,0 +1,3 @@
+-- Keyset walks of FrontierCRUD.iter_urls: rows of a category or a state in id order
+CREATE INDEX IF NOT EXISTS idx_frontier_url_category_id ON frontier_url(category, id);
+CREATE INDEX IF NOT EXISTS idx_frontier_url_state_id ON frontier_url(url_state, id);
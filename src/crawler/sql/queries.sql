@@ -73,6 +73,62 @@ SET url_state = CASE
         ELSE :error_message
     END
 WHERE id = :url_id;
+-- name: get_url_validators
+SELECT url,
+    etag,
+    last_modified,
+    content_length
+FROM frontier_url
+WHERE category = :category
+    AND url = ANY(:urls);
+-- name: update_url_validators!
+UPDATE frontier_url
+SET etag = :etag,
+    last_modified = :last_modified,
+    content_length = :content_length,
+    last_validated = CURRENT_TIMESTAMP,
+    url_state = CASE
+        WHEN :changed THEN 'pending'
+        ELSE url_state
+    END
+WHERE url = :url
+    AND category = :category;
+-- name: upsert_page_fingerprint!
+INSERT INTO page_fingerprint (
+        url,
+        category,
+        fingerprint,
+        depth,
+        link_count,
+        target_urls,
+        seed_urls
+    )
+VALUES (
+        :url,
+        :category,
+        :fingerprint,
+        :depth,
+        :link_count,
+        :target_urls,
+        :seed_urls
+    ) ON CONFLICT (url, category) DO
+UPDATE
+SET fingerprint = EXCLUDED.fingerprint,
+    depth = EXCLUDED.depth,
+    link_count = EXCLUDED.link_count,
+    target_urls = EXCLUDED.target_urls,
+    seed_urls = EXCLUDED.seed_urls,
+    updated_at = CURRENT_TIMESTAMP;
+-- name: get_page_fingerprints
+SELECT url,
+    category,
+    fingerprint,
+    depth,
+    link_count,
+    target_urls,
+    seed_urls
+FROM page_fingerprint
+WHERE category = ANY(:categories);
 -- name: insert_config_log^
 INSERT INTO config_url_log (
         url,
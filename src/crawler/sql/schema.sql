@@ -1,3 +1,8 @@
+-- Schema version 1, the baseline of the first release, applied once on an empty
+-- database. Later changes are numbered files in sql/migrations, never this file.
+-- Enum types of the first releases, the state columns are TEXT now
+DROP TYPE IF EXISTS url_state_type CASCADE;
+DROP TYPE IF EXISTS config_state_type CASCADE;
 -- Create frontier_url table if it doesn't exist
 CREATE TABLE IF NOT EXISTS frontier_url (
     id BIGSERIAL PRIMARY KEY,
@@ -5,6 +5,9 @@ from pathlib import Path
 from typing import Dict, Any
 import logfire
 
+# Per-category settings that url configs inherit unless they override them
+INHERITED_URL_SETTINGS = ('readiness', 'block_resources', 'render', 'render_heuristics', 'revalidate')
+
 def load_crawler_config() -> Dict[str, Any]:
     """Load crawler configuration from YAML file"""
     try:
@@ -23,4 +26,23 @@ def load_crawler_config() -> Dict[str, Any]:
         
     except Exception as e:
         logfire.error(f"Failed to load crawler config: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def resolve_url_config(category: Dict[str, Any], url_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of url_config with category-level settings merged in
+
+    Dict settings are merged key by key, so a url can override a single option
+    of its category block.
+    """
+    resolved = dict(url_config)
+    for key in INHERITED_URL_SETTINGS:
+        category_value = category.get(key)
+        if category_value is None:
+            continue
+        url_value = url_config.get(key)
+        if isinstance(category_value, dict):
+            resolved[key] = {**category_value, **(url_value or {})}
+        elif url_value is None:
+            resolved[key] = category_value
+    return resolved
@@ -1,7 +1,8 @@
 # src/crawler/utils/crawl_manager.py
 
-from typing import  List, Dict, Any
-from crawler.utils.url_utils import matches_pattern, is_valid_url
+from typing import  List, Dict, Any, Optional, Tuple
+from crawler.utils.url_utils import pattern_matcher, is_valid_url
+from crawler.utils.link_batch_utils import BATCH_MIN_LINKS, classify_links_batch
 from crawler.items import UrlItem
 import logfire
 
@@ -13,6 +14,9 @@ class CrawlManager:
         self.target_patterns = url_config.get('target_patterns', [])
         self.seed_pattern = url_config.get('seed_pattern')
         self.max_depth = url_config.get('max_depth', 0)
+        # Compiled once per url config, shared by every page of it
+        self.target_matcher = pattern_matcher(self.target_patterns) if self.target_patterns else None
+        self.seed_matcher = pattern_matcher([self.seed_pattern]) if self.seed_pattern else None
         
     # src/crawler/utils/crawl_manager_utils.py
     def process_url(self, url: str, found_links: List[str], current_depth: int = 0) -> List[UrlItem]:
@@ -28,22 +32,21 @@ class CrawlManager:
 
             elif self.type == 1:
                 # Tipo 1: Estrai URL target
-                target_items = self._process_target_links(found_links, current_depth)
+                target_items, _ = self._classify_links(found_links, current_depth, with_seeds=False)
                 items.extend(target_items)
                 target_count = len(target_items)
 
             elif self.type == 2:
                 if current_depth < self.max_depth:
                     # Estrai sia target che seed URL
-                    target_items = self._process_target_links(found_links, current_depth)
-                    seed_items = self._process_seed_links(found_links, current_depth)
+                    target_items, seed_items = self._classify_links(found_links, current_depth, with_seeds=True)
                     items.extend(target_items)
                     items.extend(seed_items)
                     target_count = len(target_items)
                     seed_count = len(seed_items)
                 elif current_depth == self.max_depth:
                     # Estrai solo target URL
-                    target_items = self._process_target_links(found_links, current_depth)
+                    target_items, _ = self._classify_links(found_links, current_depth, with_seeds=False)
                     items.extend(target_items)
                     target_count = len(target_items)
                     # Non estrarre seed URL al livello massimo di profondità
@@ -85,15 +88,31 @@ class CrawlManager:
 
 
 
-    def _process_target_links(self, links: List[str], current_depth: int) -> List[UrlItem]:
-        items = []
+    def _classify_links(self, links: List[str], current_depth: int, with_seeds: bool, batch: Optional[bool] = None) -> Tuple[List[UrlItem], List[UrlItem]]:
+        """Split links into target and seed items in a single pass
+
+        A link matching both the target patterns and the seed pattern is
+        returned in both lists, in link order, as separate passes would.
+        Pages with at least BATCH_MIN_LINKS links are classified in batch
+        with polars, unless `batch` forces one path.
+        """
+        if batch is None:
+            batch = len(links) >= BATCH_MIN_LINKS
+        if batch:
+            return self._classify_links_batch(links, current_depth, with_seeds)
+
+        target_items = []
+        seed_items = []
+        target_matcher = self.target_matcher
+        seed_matcher = self.seed_matcher if with_seeds else None
+
         for link in links:
             if not is_valid_url(link):
                 continue
-                
-            if matches_pattern(link, self.target_patterns):
+
+            if target_matcher and target_matcher.matches(link):
                 logfire.info(f"Found target URL at depth {current_depth}: {link}")
-                items.append(UrlItem(
+                target_items.append(UrlItem(
                     url=link,
                     category=self.category,
                     type=self.type,
@@ -103,16 +122,9 @@ class CrawlManager:
                     target_patterns=self.target_patterns,
                     seed_pattern=self.seed_pattern
                 ))
-        return items
 
-    def _process_seed_links(self, links: List[str], current_depth: int) -> List[UrlItem]:
-        items = []
-        for link in links:
-            if not is_valid_url(link):
-                continue
-                
-            if self.seed_pattern and matches_pattern(link, [self.seed_pattern]):
-                items.append(UrlItem(
+            if seed_matcher and seed_matcher.matches(link):
+                seed_items.append(UrlItem(
                     url=link,
                     category=self.category,
                     type=self.type,
@@ -122,4 +134,41 @@ class CrawlManager:
                     target_patterns=self.target_patterns,
                     seed_pattern=self.seed_pattern
                 ))
-        return items
\ No newline at end of file
+
+        return target_items, seed_items
+
+    def _classify_links_batch(self, links: List[str], current_depth: int, with_seeds: bool) -> Tuple[List[UrlItem], List[UrlItem]]:
+        target_urls, seed_urls = classify_links_batch(
+            links,
+            self.target_matcher,
+            self.seed_matcher if with_seeds else None
+        )
+
+        target_items = []
+        for link in target_urls:
+            logfire.info(f"Found target URL at depth {current_depth}: {link}")
+            target_items.append(UrlItem(
+                url=link,
+                category=self.category,
+                type=self.type,
+                depth=current_depth,
+                is_target=True,
+                max_depth=self.max_depth,
+                target_patterns=self.target_patterns,
+                seed_pattern=self.seed_pattern
+            ))
+
+        seed_items = [
+            UrlItem(
+                url=link,
+                category=self.category,
+                type=self.type,
+                depth=current_depth + 1,
+                is_target=False,
+                max_depth=self.max_depth,
+                target_patterns=self.target_patterns,
+                seed_pattern=self.seed_pattern
+            )
+            for link in seed_urls
+        ]
+        return target_items, seed_items
@@ -0,0 +1,235 @@
+# src/crawler/utils/dedup_utils.py
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import logfire
+
+# Query parameters that identify a visit, not a document
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+    'jsessionid', 'phpsessid', 'sid', 'sessionid', 'session_id', 'aspsessionid', 'cfid', 'cftoken',
+})
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+_PATH_SESSION = re.compile(r';(jsessionid|phpsessid|sid)=[^/?#]*', re.IGNORECASE)
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of a URL, used as dedup key only
+
+    Lowercases scheme and host, drops the default port, the fragment,
+    session ids in the path and tracking/session query parameters, and sorts
+    the remaining query parameters.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    netloc = host
+    if parts.username:
+        netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{host}"
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    path = _PATH_SESSION.sub('', parts.path) or '/'
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query, safe=':/'), ''))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys
+
+    Sized for `capacity` keys at a false positive rate `error_rate`; a false
+    positive makes a new key look already seen, there are no false negatives.
+    """
+
+    kind = 'bloom'
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-6):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> bool:
+        """Add a key, returning False if it was (probably) already present"""
+        added = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+    def header(self) -> dict:
+        return {
+            'kind': self.kind,
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'num_bits': self.num_bits,
+            'num_hashes': self.num_hashes,
+            'count': self.count,
+        }
+
+    def dump(self) -> bytes:
+        return json.dumps(self.header()).encode('utf-8') + b'\n' + bytes(self.bits)
+
+    def merge_dump(self, data: bytes) -> bool:
+        """OR a dumped filter with the same parameters into this one"""
+        header_line, _, payload = data.partition(b'\n')
+        header = json.loads(header_line)
+        if any(header.get(key) != value for key, value in self.header().items() if key != 'count'):
+            return False
+        if len(payload) != len(self.bits):
+            return False
+        merged = int.from_bytes(self.bits, 'little') | int.from_bytes(payload, 'little')
+        self.bits = bytearray(merged.to_bytes(len(self.bits), 'little'))
+        self.count = max(self.count, header.get('count', 0))
+        return True
+
+
+class ExactSet:
+    """Exact dedup on 128-bit hashes of the keys, memory grows with the number of keys"""
+
+    kind = 'exact'
+
+    def __init__(self):
+        self.keys = set()
+
+    @staticmethod
+    def _hash(key: str) -> bytes:
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+    def add(self, key: str) -> bool:
+        hashed = self._hash(key)
+        if hashed in self.keys:
+            return False
+        self.keys.add(hashed)
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return self._hash(key) in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def memory_bytes(self) -> int:
+        # Set slots plus one small bytes object per key
+        return len(self.keys) * (16 + 33 + 16)
+
+    def dump(self) -> bytes:
+        return json.dumps({'kind': self.kind, 'count': len(self.keys)}).encode('utf-8') + b'\n' + b''.join(self.keys)
+
+    def merge_dump(self, data: bytes) -> bool:
+        header_line, _, payload = data.partition(b'\n')
+        if json.loads(header_line).get('kind') != self.kind:
+            return False
+        self.keys.update(payload[i:i + 16] for i in range(0, len(payload), 16))
+        return True
+
+
+class DedupFilter:
+    """Seen-before check on canonical URLs, with optional persistence
+
+    The filter file is gzip-compressed and merged with the one on disk when
+    saved, so several workers sharing the file only add keys to it.
+    """
+
+    def __init__(self, backend, path: Optional[str] = None, stats=None, stats_prefix: str = 'dedup'):
+        self.backend = backend
+        self.path = Path(path) if path else None
+        self.stats = stats
+        self.stats_prefix = stats_prefix
+
+    @staticmethod
+    def create_backend(kind: str, capacity: int, error_rate: float):
+        if kind == 'exact':
+            return ExactSet()
+        if kind != 'bloom':
+            logfire.warning(f"Unknown dedup filter: {kind}, using bloom")
+        return BloomFilter(capacity=capacity, error_rate=error_rate)
+
+    def seen(self, key: str) -> bool:
+        """Record a key, True if it was already seen"""
+        if self.backend.add(key):
+            self._inc_stat('seen')
+            return False
+        self._inc_stat('suppressed')
+        return True
+
+    def load(self):
+        self._set_stat('memory_bytes', self.backend.memory_bytes)
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with gzip.open(self.path, 'rb') as f:
+                merged = self.backend.merge_dump(f.read())
+            if not merged:
+                logfire.warning("Dedup filter file has other parameters, starting empty", path=str(self.path))
+                return
+            self._set_stat('loaded_keys', len(self.backend))
+            logfire.info("Loaded dedup filter", path=str(self.path), keys=len(self.backend))
+        except Exception as e:
+            logfire.warning("Failed to load dedup filter", path=str(self.path), error=str(e))
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            # Union with keys other workers saved meanwhile
+            if self.path.exists():
+                with gzip.open(self.path, 'rb') as f:
+                    self.backend.merge_dump(f.read())
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(self.backend.dump())
+            os.replace(tmp_path, self.path)
+            logfire.info("Saved dedup filter", path=str(self.path), keys=len(self.backend))
+        except Exception as e:
+            logfire.warning("Failed to save dedup filter", path=str(self.path), error=str(e))
+
+    def _inc_stat(self, name: str):
+        if self.stats:
+            self.stats.inc_value(f'{self.stats_prefix}/{name}')
+
+    def _set_stat(self, name: str, value):
+        if self.stats:
+            self.stats.set_value(f'{self.stats_prefix}/{name}', value)
@@ -0,0 +1,105 @@
+# src/crawler/utils/fingerprint_utils.py
+
+import hashlib
+import json
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import logfire
+from crawler.models.page_fingerprint_model import PageFingerprint
+
+
+def link_set_fingerprint(links: Iterable[str], url_config: Dict[str, Any]) -> str:
+    """Hash of the sorted unique hrefs of a page and of the config classifying them
+
+    The patterns are part of the hash, so editing `target_patterns`,
+    `seed_pattern` or `max_depth` invalidates every fingerprint of the url.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([
+        url_config.get('target_patterns'),
+        url_config.get('seed_pattern'),
+        url_config.get('max_depth', 0)
+    ]).encode('utf-8'))
+    for link in sorted(set(links)):
+        digest.update(b'\n')
+        digest.update(link.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PageFingerprintIndex:
+    """Fingerprints of the previous crawl, loaded once from page_fingerprint
+
+    A page whose link set fingerprints the same as last time has the same
+    targets and seeds, so its child seed pages need not be fetched again:
+    their known targets are re-emitted from the index instead. Children
+    without a stored fingerprint (never crawled or failed) are still fetched.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self._pages: Dict[Tuple[str, str], PageFingerprint] = {}
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['PageFingerprintIndex']:
+        if not settings.getbool('INCREMENTAL_CRAWL_ENABLED', False):
+            return None
+        return cls(stats=stats)
+
+    def load(self, categories: Iterable[str]):
+        """Load the stored fingerprints of the given categories"""
+        from crawler.database import db_manager
+        from crawler.crud.page_fingerprint_crud import PageFingerprintCRUD
+
+        categories = sorted(set(categories))
+        if not categories:
+            return
+
+        if not db_manager.pool:
+            db_manager.initialize()
+        conn = db_manager.pool.getconn()
+        try:
+            crud = PageFingerprintCRUD(conn, db_manager.queries)
+            for page in crud.get_fingerprints(categories):
+                self._pages[(page.url, page.category)] = page
+            logfire.info("Loaded page fingerprints", categories=categories, pages=len(self._pages))
+        except Exception as e:
+            logfire.warning("Failed to load page fingerprints, crawling everything", error=str(e))
+        finally:
+            db_manager.pool.putconn(conn)
+
+    def get(self, url: str, category: str) -> Optional[PageFingerprint]:
+        return self._pages.get((url, category))
+
+    def is_unchanged(self, url: str, category: str, fingerprint: str) -> bool:
+        stored = self.get(url, category)
+        unchanged = stored is not None and stored.fingerprint == fingerprint
+        self._inc_stat('incremental/unchanged_pages' if unchanged else 'incremental/changed_pages')
+        return unchanged
+
+    def known_targets(self, url: str, category: str, depth: int, max_depth: int, parent_url: str) -> List[Tuple[str, int, str]]:
+        """(target url, depth, parent_url) of the stored subtree of a seed page
+
+        Follows the depth rules of CrawlManager, where a page at `max_depth` has
+        targets but its seeds are not followed. parent_url is filled as in
+        FrontierSpider._process_found_links, with the parent of the page the
+        target was found on.
+        """
+        targets = []
+        visited = set()
+        stack = [(url, depth, parent_url)]
+        while stack:
+            page_url, page_depth, page_parent = stack.pop()
+            if page_url in visited:
+                continue
+            visited.add(page_url)
+
+            stored = self.get(page_url, category)
+            if stored is None:
+                continue
+            targets.extend((target_url, page_depth, page_parent) for target_url in stored.target_urls)
+            if page_depth < max_depth:
+                stack.extend((seed_url, page_depth + 1, page_url) for seed_url in stored.seed_urls)
+        return targets
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats:
+            self.stats.inc_value(key, count)
@@ -0,0 +1,91 @@
+# src/crawler/utils/known_url_utils.py
+
+import hashlib
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional
+import logfire
+
+
+def url_key(url: str, category: str) -> int:
+    """64-bit key of a (url, category) pair"""
+    digest = hashlib.blake2b(f"{category}\n{url}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class KnownUrlCache:
+    """(url, category) pairs already in frontier_url, as 64-bit hashed keys
+
+    Keys loaded at startup are kept in a sorted array of 8 bytes each and
+    looked up by bisection; keys inserted during the run go to a small set.
+    A 64-bit collision makes a new URL look known, which at a million URLs
+    has a probability of about 3e-8.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self._loaded = array('Q')
+        self._added = set()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['KnownUrlCache']:
+        if not settings.getbool('KNOWN_URL_CACHE_ENABLED', False):
+            return None
+        return cls(stats=stats)
+
+    def load(self, conn, queries, categories: Iterable[str]):
+        """Load the keys of the frontier URLs of the given categories"""
+        from crawler.crud.frontier_crud import FrontierCRUD
+
+        categories = sorted(set(categories))
+        if not categories:
+            return
+
+        try:
+            rows = FrontierCRUD(conn, queries).iter_url_keys(categories)
+            self._loaded = array('Q', sorted(url_key(url, category) for url, category in rows))
+            self._set_stat('known_urls/loaded', len(self._loaded))
+            logfire.info("Loaded known frontier URLs", categories=categories, urls=len(self._loaded))
+        except Exception as e:
+            logfire.warning("Failed to load known frontier URLs, checking every URL", error=str(e))
+        self._set_stat('known_urls/memory_bytes', self.memory_bytes)
+
+    def __contains__(self, key: int) -> bool:
+        if key in self._added:
+            return True
+        index = bisect_left(self._loaded, key)
+        return index < len(self._loaded) and self._loaded[index] == key
+
+    def is_known(self, url: str, category: str) -> bool:
+        """Look a URL up, counting hits and misses"""
+        known = url_key(url, category) in self
+        if known:
+            self.hits += 1
+            self._inc_stat('known_urls/hits')
+        else:
+            self.misses += 1
+            self._inc_stat('known_urls/misses')
+        self._set_stat('known_urls/hit_ratio', round(self.hits / (self.hits + self.misses), 4))
+        return known
+
+    def add(self, url: str, category: str):
+        self._added.add(url_key(url, category))
+        self._set_stat('known_urls/memory_bytes', self.memory_bytes)
+
+    def __len__(self) -> int:
+        return len(self._loaded) + len(self._added)
+
+    @property
+    def memory_bytes(self) -> int:
+        # Array buffer plus set slots and int objects of the keys added in the run
+        return self._loaded.itemsize * len(self._loaded) + len(self._added) * (16 + 36)
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats:
+            self.stats.inc_value(key, count)
+
+    def _set_stat(self, key: str, value):
+        if self.stats:
+            self.stats.set_value(key, value)
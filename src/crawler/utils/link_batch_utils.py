@@ -0,0 +1,102 @@
+# src/crawler/utils/link_batch_utils.py
+
+import re
+from typing import List, Optional, Sequence, Tuple
+import polars as pl
+from crawler.utils.url_utils import PatternMatcher, is_valid_url, _strip_wildcards
+
+# Pages with fewer links are classified by the per-link loop
+BATCH_MIN_LINKS = 500
+
+# Printable ASCII without leading space: urlparse strips nothing from these and
+# Python and Rust regexes agree on case folding and character classes
+_SIMPLE_URL = r'^[!-~][ -~]*$'
+# Same split as urlsplit: a scheme up to the first ':' and the netloc after '//'
+_NETLOC = r'^[A-Za-z][A-Za-z0-9+.\-]*://([^/?#]*)'
+
+_SAFE_ESCAPES = set('.^$*+?()[]{}|\\/-dDwWsS')
+# Constructs Rust regex parses differently from Python re: nested and set
+# operations in classes, possessive quantifiers, inline flags and groups other than (?:
+_UNSAFE_SYNTAX = re.compile(r'\[\[|\[:|&&|--|~~|[*+?}]\+|\(\?(?!:)')
+
+
+def _polars_regex(matcher: PatternMatcher) -> Optional[str]:
+    """Combined regex of a matcher for polars, None if its semantics could differ from re"""
+    if matcher._fallback:
+        return None
+    for pattern in matcher.patterns:
+        if not pattern.isascii() or _UNSAFE_SYNTAX.search(pattern):
+            return None
+        escapes = re.findall(r'\\(.)', pattern)
+        if any(escape not in _SAFE_ESCAPES for escape in escapes):
+            return None
+
+    regex = '(?i)' + '|'.join(f'(?:{_strip_wildcards(pattern)})' for pattern in matcher.patterns)
+    try:
+        pl.Series([''], dtype=pl.String).str.contains(regex)
+    except Exception:
+        return None
+    return regex
+
+
+def _match_expr(matcher: PatternMatcher, regex: str) -> pl.Expr:
+    lowered = pl.col('url').str.to_lowercase()
+    expr = pl.col('url').str.contains(regex)
+    for literal in matcher._literals:
+        expr = expr | lowered.str.contains(literal, literal=True)
+    return expr
+
+
+def classify_links_batch(
+    links: Sequence[str],
+    target_matcher: Optional[PatternMatcher],
+    seed_matcher: Optional[PatternMatcher]
+) -> Tuple[List[str], List[str]]:
+    """Target and seed URLs of a page, with the output of the per-link loop
+
+    The unique links are validated and matched with vectorized string
+    expressions, then mapped back onto the page links, so both lists keep
+    link order and duplicates. Links outside printable ASCII, and every link
+    when a pattern list cannot be run by polars with the same semantics as
+    re, are checked one by one with is_valid_url and PatternMatcher.
+    """
+    if not links:
+        return [], []
+
+    matchers = {'target': target_matcher, 'seed': seed_matcher}
+    regexes = {name: _polars_regex(matcher) if matcher else None for name, matcher in matchers.items()}
+
+    series = pl.Series('url', links, dtype=pl.String)
+    unique = series.unique(maintain_order=True).to_frame()
+
+    netloc = pl.col('url').str.extract(_NETLOC, 1)
+    unique = unique.with_columns(
+        valid=(netloc.str.len_chars() > 0).fill_null(False),
+        simple=(
+            pl.col('url').str.contains(_SIMPLE_URL)
+            # Bracketed hosts are validated by urlsplit, leave them to it
+            & ~netloc.str.contains(r'[\[\]]').fill_null(False)
+        ).fill_null(False),
+    )
+
+    vectorized = unique.filter('simple')
+    fallback_urls = [url for url in unique.filter(~pl.col('simple'))['url'].to_list() if is_valid_url(url)]
+
+    results = {}
+    for name, matcher in matchers.items():
+        if matcher is None:
+            results[name] = []
+            continue
+
+        if regexes[name] is not None:
+            found = vectorized.filter(pl.col('valid') & _match_expr(matcher, regexes[name]))['url'].to_list()
+            remaining = fallback_urls
+        else:
+            found = []
+            remaining = vectorized.filter('valid')['url'].to_list() + fallback_urls
+        found.extend(url for url in remaining if matcher.matches(url))
+
+        matched = pl.Series('url', found, dtype=pl.String)
+        results[name] = series.filter(series.is_in(matched)).to_list() if found else []
+
+    return results['target'], results['seed']
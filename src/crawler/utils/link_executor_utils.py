@@ -0,0 +1,189 @@
+# src/crawler/utils/link_executor_utils.py
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+import logfire
+from crawler.items import UrlItem
+from crawler.utils.crawl_manager_utils import CrawlManager
+from crawler.utils.fingerprint_utils import link_set_fingerprint
+from crawler.utils.logging_utils import setup_logging, write_to_log
+
+
+def join_links(base_url: Optional[str], hrefs: Sequence[str]) -> List[str]:
+    """Absolute URLs of the non-empty hrefs of a page, as response.urljoin resolves them"""
+    if base_url is None:
+        return [href for href in hrefs if href]
+    return [urljoin(base_url, href.strip()) for href in hrefs if href and href.strip()]
+
+
+def classify_chunk(
+    page_url: str,
+    base_url: Optional[str],
+    hrefs: Sequence[str],
+    category: str,
+    url_config: Dict[str, Any],
+    current_depth: int
+) -> Tuple[List[str], List[UrlItem], float]:
+    """Join and classify a slice of the hrefs of a page, returning the elapsed time with the result
+
+    Module-level so that process pool workers can import it.
+    """
+    started = time.perf_counter()
+    found_links = join_links(base_url, hrefs)
+    items = CrawlManager(category, url_config).process_url(page_url, found_links, current_depth)
+    return found_links, items, time.perf_counter() - started
+
+
+@dataclass
+class LinkProcessingResult:
+    """Absolute links, UrlItems and link-set fingerprint of one page"""
+    found_links: List[str]
+    items: List[UrlItem]
+    fingerprint: Optional[str] = None
+
+
+class LinkProcessingExecutor:
+    """Run link joining, classification and the found-links log off the event loop
+
+    `thread` hands each page to a thread pool: classification holds the GIL,
+    but Playwright pages keep being serviced between bytecodes. `process`
+    splits the hrefs in chunks of `chunk_size` classified by worker processes
+    (spawned, never forked from the reactor) and merges them in link order.
+    """
+
+    def __init__(self, mode: str = 'thread', max_workers: int = 2, chunk_size: int = 2000, stats=None):
+        if mode not in ('thread', 'process'):
+            logfire.warning(f"Unknown link executor: {mode}, using thread")
+            mode = 'thread'
+        self.mode = mode
+        self.max_workers = max_workers
+        self.chunk_size = max(1, chunk_size)
+        self.stats = stats
+        self._executor: Optional[Executor] = None
+        self._log_executor: Optional[ThreadPoolExecutor] = None
+        self._queued = 0
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['LinkProcessingExecutor']:
+        mode = settings.get('LINK_EXECUTOR', 'off')
+        if not mode or mode == 'off':
+            return None
+        return cls(
+            mode=mode,
+            max_workers=settings.getint('LINK_EXECUTOR_WORKERS', 2),
+            chunk_size=settings.getint('LINK_EXECUTOR_CHUNK_SIZE', 2000),
+            stats=stats
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=setup_logging
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='links')
+        return self._executor
+
+    def _chunks(self, hrefs: Sequence[str]) -> List[Sequence[str]]:
+        if self.mode != 'process' or len(hrefs) <= self.chunk_size:
+            return [hrefs]
+        return [hrefs[i:i + self.chunk_size] for i in range(0, len(hrefs), self.chunk_size)]
+
+    async def process(
+        self,
+        page_url: str,
+        base_url: Optional[str],
+        hrefs: Sequence[str],
+        category: str,
+        url_config: Dict[str, Any],
+        current_depth: int,
+        fingerprint: bool = False
+    ) -> LinkProcessingResult:
+        """Join and classify the hrefs of a page in the pool
+
+        Items come back in the order CrawlManager.process_url returns them for
+        the whole page: targets first, then seeds, each in link order.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Type 0 pages are a single target, never split them
+        chunks = self._chunks(list(hrefs)) if url_config.get('type') != 0 else [list(hrefs)]
+
+        self._queued += 1
+        self._set_stat('link_executor/queue_depth', self._queued)
+        self._max_stat('link_executor/max_queue_depth', self._queued)
+        started = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(executor, classify_chunk, page_url, base_url, chunk, category, url_config, current_depth)
+                for chunk in chunks
+            ))
+        finally:
+            self._queued -= 1
+            self._set_stat('link_executor/queue_depth', self._queued)
+
+        found_links = [link for chunk_links, _, _ in results for link in chunk_links]
+        chunk_items = [items for _, items, _ in results]
+        items = (
+            [item for items in chunk_items for item in items if item.get('is_target')]
+            + [item for items in chunk_items for item in items if not item.get('is_target')]
+        )
+        off_loop = sum(elapsed for _, _, elapsed in results)
+
+        fingerprint_value = None
+        if fingerprint:
+            fingerprint_started = time.perf_counter()
+            fingerprint_value = await loop.run_in_executor(
+                self._get_log_executor(), link_set_fingerprint, found_links, url_config
+            )
+            off_loop += time.perf_counter() - fingerprint_started
+
+        self._inc_stat('link_executor/pages')
+        self._inc_stat('link_executor/chunks', len(chunks))
+        self._inc_stat('link_executor/links', len(found_links))
+        self._inc_stat('link_executor/off_loop_ms', round(off_loop * 1000, 2))
+        self._inc_stat('link_executor/wait_ms', round((time.perf_counter() - started) * 1000, 2))
+        return LinkProcessingResult(found_links=found_links, items=items, fingerprint=fingerprint_value)
+
+    async def write_log(self, filename: str, content: dict, current_depth: int, page_url: str):
+        """write_to_log in a dedicated thread, file writes are I/O and need no process"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        await loop.run_in_executor(self._get_log_executor(), write_to_log, filename, content, current_depth, page_url)
+        self._inc_stat('link_executor/off_loop_ms', round((time.perf_counter() - started) * 1000, 2))
+
+    def _get_log_executor(self) -> ThreadPoolExecutor:
+        if self._log_executor is None:
+            self._log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='links-log')
+        return self._log_executor
+
+    def record_on_loop(self, elapsed: float):
+        """Time spent on the event loop turning a processed page into outputs"""
+        self._inc_stat('link_executor/on_loop_ms', round(elapsed * 1000, 2))
+
+    def close(self):
+        for executor in (self._executor, self._log_executor):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        self._log_executor = None
+
+    def _inc_stat(self, key: str, count=1):
+        if self.stats:
+            self.stats.inc_value(key, count)
+
+    def _set_stat(self, key: str, value):
+        if self.stats:
+            self.stats.set_value(key, value)
+
+    def _max_stat(self, key: str, value):
+        if self.stats:
+            self.stats.max_value(key, value)
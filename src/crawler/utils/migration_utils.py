@@ -0,0 +1,118 @@
+# src/crawler/utils/migration_utils.py
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+import logfire
+
+# pg_advisory_lock key held while migrating, the same in every process
+MIGRATION_LOCK_ID = 7_205_759_403_792_793_601
+
+# schema.sql is version 1, files in sql/migrations are named 0002_description.sql
+BASELINE_VERSION = 1
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+
+def load_migrations(schema_sql: str, migrations_dir: Path) -> List[Migration]:
+    """The baseline schema followed by the numbered migrations, in version order"""
+    migrations = [Migration(BASELINE_VERSION, 'schema', schema_sql)]
+    if migrations_dir.is_dir():
+        for path in sorted(migrations_dir.glob('*.sql')):
+            match = _MIGRATION_FILE.match(path.name)
+            if not match:
+                raise ValueError(f"Migration file name must look like 0002_description.sql: {path.name}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), path.read_text()))
+
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions) or versions[0] != BASELINE_VERSION:
+        raise ValueError(f"Migration versions must be unique and start at {BASELINE_VERSION}: {versions}")
+    return migrations
+
+
+class MigrationRunner:
+    """Apply the pending migrations of the schema_version table
+
+    The current version is read without locks; when it is the latest,
+    nothing else runs, so starting against a current schema takes no DDL
+    locks. Otherwise the runner takes a session advisory lock, reads the
+    version again (another process may have migrated meanwhile) and applies
+    each pending migration in its own transaction with its schema_version
+    row, so a failed migration leaves the previous version in place.
+    """
+
+    def __init__(self, migrations: List[Migration]):
+        self.migrations = migrations
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version
+
+    @staticmethod
+    def current_version(conn) -> int:
+        """Highest applied version, 0 on a database without schema_version"""
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+            if not cur.fetchone()[0]:
+                return 0
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            return cur.fetchone()[0]
+
+    def pending(self, conn) -> List[Migration]:
+        current = self.current_version(conn)
+        return [migration for migration in self.migrations if migration.version > current]
+
+    def migrate(self, conn, target: Optional[int] = None) -> int:
+        """Bring the schema to `target` (the latest by default), returning the version reached"""
+        target = self.latest_version if target is None else target
+        current = self.current_version(conn)
+        if current >= target:
+            logfire.debug("Database schema is current", version=current)
+            return current
+
+        autocommit = conn.autocommit
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            pending = [migration for migration in self.pending(conn) if migration.version <= target]
+            conn.autocommit = False
+            for migration in pending:
+                self._apply(conn, migration)
+            conn.autocommit = True
+            return self.current_version(conn)
+        finally:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.autocommit = autocommit
+
+    def _apply(self, conn, migration: Migration):
+        try:
+            with conn.cursor() as cur:
+                cur.execute(migration.sql)
+                # The baseline inserts its own version row
+                cur.execute(
+                    "INSERT INTO schema_version (version) VALUES (%s) ON CONFLICT (version) DO NOTHING",
+                    (migration.version,)
+                )
+            conn.commit()
+            logfire.info("Applied database migration", version=migration.version, name=migration.name)
+
+        except Exception as e:
+            conn.rollback()
+            logfire.error(
+                "Database migration failed",
+                version=migration.version,
+                name=migration.name,
+                error=str(e)
+            )
+            raise
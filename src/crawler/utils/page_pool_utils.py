@@ -0,0 +1,177 @@
+# src/crawler/utils/page_pool_utils.py
+
+import asyncio
+from collections import defaultdict, deque
+from typing import Dict, Deque, Optional
+from urllib.parse import urlparse
+import logfire
+
+
+def get_main_domain(url: str) -> str:
+    """Return the pool key of a URL, same as frontier_url.main_domain"""
+    return urlparse(url).netloc
+
+
+class PlaywrightPagePool:
+    """Pool of idle Playwright pages keyed by main domain
+
+    Pages are handed back after parsing instead of being closed, reset to
+    about:blank and reused by the next request to the same domain, so the
+    browser context keeps its cookies, consent state and cache. Pages are
+    recycled after `max_navigations` uses to avoid leaks.
+    """
+
+    def __init__(
+        self,
+        max_idle_per_domain: int = 2,
+        max_idle: int = 8,
+        max_navigations: int = 25,
+        stats=None
+    ):
+        self.max_idle_per_domain = max_idle_per_domain
+        self.max_idle = max_idle
+        self.max_navigations = max_navigations
+        self.stats = stats
+        self._idle: Dict[str, Deque] = defaultdict(deque)
+        self._navigations: Dict[int, int] = {}
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['PlaywrightPagePool']:
+        if not settings.getbool('PAGE_POOL_ENABLED', True):
+            return None
+        return cls(
+            max_idle_per_domain=settings.getint('PAGE_POOL_MAX_IDLE_PER_DOMAIN', 2),
+            max_idle=settings.getint('PAGE_POOL_MAX_IDLE', 8),
+            max_navigations=settings.getint('PAGE_POOL_MAX_NAVIGATIONS', 25),
+            stats=stats
+        )
+
+    @property
+    def idle_count(self) -> int:
+        return sum(len(pages) for pages in self._idle.values())
+
+    def acquire(self, domain: str):
+        """Return an idle page for the domain, or None if a new one must be created"""
+        idle = self._idle.get(domain)
+        while idle:
+            page = idle.popleft()
+            if not page.is_closed():
+                self._inc_stat('page_pool/hit')
+                self._update_idle_stat()
+                return page
+            self._navigations.pop(id(page), None)
+
+        self._inc_stat('page_pool/miss')
+        self._update_idle_stat()
+        return None
+
+    async def release(self, domain: str, page):
+        """Give a page back to the pool, closing it if it is worn out or the pool is full"""
+        if page.is_closed():
+            self._navigations.pop(id(page), None)
+            return
+
+        navigations = self._navigations.get(id(page), 0) + 1
+        if navigations >= self.max_navigations:
+            self._inc_stat('page_pool/recycled')
+            await self._close(page)
+            return
+
+        if len(self._idle[domain]) >= self.max_idle_per_domain or self.idle_count >= self.max_idle:
+            self._inc_stat('page_pool/evicted')
+            await self._close(page)
+            return
+
+        try:
+            await self._reset(page)
+        except Exception as e:
+            logfire.warning("Failed to reset pooled page", domain=domain, error=str(e))
+            await self._close(page)
+            return
+
+        self._navigations[id(page)] = navigations
+        self._idle[domain].append(page)
+        self._inc_stat('page_pool/released')
+        self._update_idle_stat()
+
+    async def _reset(self, page):
+        """Stop scripts and timers of the previous document before reuse"""
+        await page.goto('about:blank')
+
+    async def _close(self, page):
+        self._navigations.pop(id(page), None)
+        try:
+            await page.close()
+        except Exception as e:
+            logfire.debug("Error closing pooled page", error=str(e))
+
+    async def evict_idle(self) -> bool:
+        """Close the oldest idle page of any domain, True if one was closed"""
+        for idle in self._idle.values():
+            while idle:
+                page = idle.popleft()
+                if page.is_closed():
+                    self._navigations.pop(id(page), None)
+                    continue
+                self._inc_stat('page_pool/evicted')
+                await self._close(page)
+                self._update_idle_stat()
+                return True
+        return False
+
+    def clear(self):
+        """Drop all idle pages, their contexts are closed with the browser"""
+        self._idle.clear()
+        self._navigations.clear()
+        self._update_idle_stat()
+
+    def _inc_stat(self, key: str):
+        if self.stats:
+            self.stats.inc_value(key)
+
+    def _update_idle_stat(self):
+        if self.stats:
+            self.stats.set_value('page_pool/idle', self.idle_count)
+
+
+class OpenPageLimiter:
+    """Cap the number of browser pages open at the same time across all contexts
+
+    A permit is taken before a request creates a new page and given back when
+    that page is closed, so idle pooled pages count towards the limit too.
+    """
+
+    def __init__(self, max_open_pages: int = 4, stats=None):
+        self.max_open_pages = max_open_pages
+        self.stats = stats
+        self.open_pages = 0
+        self._semaphore = asyncio.Semaphore(max_open_pages)
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['OpenPageLimiter']:
+        max_open_pages = settings.getint('PLAYWRIGHT_MAX_OPEN_PAGES', 0)
+        if max_open_pages <= 0:
+            return None
+        return cls(max_open_pages=max_open_pages, stats=stats)
+
+    def locked(self) -> bool:
+        return self._semaphore.locked()
+
+    async def acquire(self):
+        await self._semaphore.acquire()
+        self.open_pages += 1
+        self._update_stats()
+
+    def release(self, *args):
+        self._semaphore.release()
+        self.open_pages -= 1
+        self._update_stats()
+
+    def bind(self, page):
+        """Give the permit back when the page closes"""
+        page.once('close', self.release)
+
+    def _update_stats(self):
+        if self.stats:
+            self.stats.set_value('page_limiter/open_pages', self.open_pages)
+            self.stats.max_value('page_limiter/max_open_pages', self.open_pages)
@@ -0,0 +1,149 @@
+# src/crawler/utils/pagination_utils.py
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import logfire
+
+# Defaults for the `pagination` block of a url config
+DEFAULT_PAGINATION = {
+    'param': None,          # query parameter holding the offset or page number
+    'start': None,          # value on the configured url, read from it when omitted
+    'step': 1,
+    'next_selector': None,  # CSS selector of the "next page" link
+    'max_pages': 50,
+    'concurrency': 3,       # listing pages scheduled ahead (param mode), capped by the domain slot
+}
+
+
+def set_query_param(url: str, param: str, value) -> str:
+    """Return url with one query parameter set, other parameters kept in order"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    replaced = False
+    for index, (key, _) in enumerate(query):
+        if key == param:
+            query[index] = (key, str(value))
+            replaced = True
+    if not replaced:
+        query.append((param, str(value)))
+    # Keep characters like ':' of "b_start:int" readable
+    return urlunsplit(parts._replace(query=urlencode(query, safe=':')))
+
+
+@dataclass
+class PaginationState:
+    """Progress of the pagination of one root url"""
+    config: Dict[str, Any]
+    root_url: str
+    start: int = 0
+    scheduled: int = 1                  # pages requested so far, root included
+    seen_urls: Set[str] = field(default_factory=set)
+    page_urls: Set[str] = field(default_factory=set)
+    stopped: bool = False
+
+
+class PaginationTracker:
+    """Generate follow-up listing pages from a url config `pagination` block
+
+    Two styles are supported:
+      - `param`: pages are built by setting a query parameter to
+        start + n * step; up to `concurrency` pages are kept scheduled
+      - `next_selector`: the next page is the href of the selected link,
+        so pages are fetched one after the other
+    Pagination stops on the first page that yields no target or seed URL
+    not already seen on earlier pages, or after `max_pages`.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self._states: Dict[str, PaginationState] = {}
+
+    @staticmethod
+    def config_for(url_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        pagination = url_config.get('pagination')
+        if not pagination:
+            return None
+        config = {**DEFAULT_PAGINATION, **pagination}
+        if not config['param'] and not config['next_selector']:
+            logfire.warning("Pagination needs `param` or `next_selector`, ignoring it", url=url_config.get('url'))
+            return None
+        return config
+
+    def start(self, root_url: str, url_config: Dict[str, Any]) -> List[tuple]:
+        """Register a root url, returning (page number, url) of the extra pages to request with it"""
+        config = self.config_for(url_config)
+        if config is None:
+            return []
+
+        start = config['start']
+        if start is None and config['param']:
+            current = dict(parse_qsl(urlsplit(root_url).query)).get(config['param'])
+            start = int(current) if current and current.lstrip('-').isdigit() else 0
+        state = PaginationState(config=config, root_url=root_url, start=start or 0, page_urls={root_url})
+        self._states[root_url] = state
+
+        if not config['param']:
+            return []
+        return self._schedule(state, config['concurrency'] - 1)
+
+    def page_done(self, root_url: str, page_number: int, found_urls: Iterable[str], next_url: Optional[str] = None) -> List[tuple]:
+        """Record the target and seed URLs of a listing page, returning the pages to request next"""
+        state = self._states.get(root_url)
+        if state is None:
+            return []
+
+        new_urls = set(found_urls) - state.seen_urls
+        state.seen_urls |= new_urls
+        self._inc_stat('pagination/pages')
+
+        if state.stopped:
+            return []
+        if not new_urls:
+            self._stop(state, 'no_new_urls', page_number)
+            return []
+        if state.config['param']:
+            return self._schedule(state, 1)
+        if next_url and next_url not in state.page_urls:
+            return self._schedule(state, 1, next_url=next_url)
+        self._stop(state, 'no_next_link', page_number)
+        return []
+
+    def page_failed(self, root_url: str, page_number: int):
+        state = self._states.get(root_url)
+        if state is not None and not state.stopped:
+            self._stop(state, 'failed', page_number)
+
+    def _schedule(self, state: PaginationState, count: int, next_url: Optional[str] = None) -> List[tuple]:
+        pages = []
+        for _ in range(count):
+            if state.scheduled >= state.config['max_pages']:
+                self._stop(state, 'max_pages', state.scheduled)
+                break
+            page_number = state.scheduled
+            if next_url:
+                url = next_url
+            else:
+                offset = state.start + page_number * state.config['step']
+                url = set_query_param(state.root_url, state.config['param'], offset)
+            state.scheduled += 1
+            state.page_urls.add(url)
+            pages.append((page_number, url))
+            self._inc_stat('pagination/scheduled')
+        return pages
+
+    def _stop(self, state: PaginationState, reason: str, page_number: int):
+        state.stopped = True
+        self._inc_stat(f'pagination/stopped/{reason}')
+        logfire.info(
+            "Pagination finished",
+            url=state.root_url,
+            reason=reason,
+            page=page_number,
+            pages=state.scheduled,
+            urls=len(state.seen_urls)
+        )
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats:
+            self.stats.inc_value(key, count)
@@ -1,15 +1,142 @@
 import logfire
+import time
 import traceback
-from typing import List, Optional
+from typing import List, Optional, Dict
+from urllib.parse import urljoin
 from playwright.async_api import Page
 from scrapy_playwright.page import PageMethod
 
 
 # src/crawler/utils/playwright_utils.py
 
+# Collects every anchor of a frame in a single evaluation and returns a compact
+# array of [resolved_href, source] rows instead of one handle per anchor.
+LINK_EXTRACTION_SCRIPT = """({scope, source}) => {
+    const containers = scope ? document.querySelectorAll(scope) : [document];
+    const base = document.baseURI;
+    const rows = [];
+    for (const container of containers) {
+        for (const anchor of container.querySelectorAll('a')) {
+            const raw = anchor.getAttribute('href');
+            if (!raw) continue;
+            let href;
+            try {
+                href = new URL(raw, base).href;
+            } catch (e) {
+                href = raw;
+            }
+            rows.push([href, anchor.closest('.modal') ? 'modal' : source]);
+        }
+    }
+    return rows;
+}"""
+
+LINK_EXTRACTION_MODES = ('evaluate', 'per_anchor')
+
+# Resolves once the anchor set and DOM mutations have been stable for the quiet
+# window, or when the hard maximum is reached, in a single awaited evaluation.
+READINESS_SCRIPT = """({quietMs, maxMs, pollMs, watchAttributes}) => new Promise((resolve) => {
+    const start = performance.now();
+    let lastChange = start;
+    let mutations = 0;
+    const anchors = document.getElementsByTagName('a');
+    const signature = () => anchors.length + '|' + (anchors.length ? anchors[anchors.length - 1].getAttribute('href') : '');
+    let lastSignature = signature();
+    const observer = new MutationObserver((records) => {
+        mutations += records.length;
+        lastChange = performance.now();
+    });
+    observer.observe(document.documentElement || document, {
+        childList: true,
+        subtree: true,
+        characterData: true,
+        attributes: watchAttributes
+    });
+    const timer = setInterval(() => {
+        const now = performance.now();
+        const current = signature();
+        if (current !== lastSignature) {
+            lastSignature = current;
+            lastChange = now;
+        }
+        const stable = now - lastChange >= quietMs;
+        if (stable || now - start >= maxMs) {
+            clearInterval(timer);
+            observer.disconnect();
+            resolve({waited_ms: Math.round(now - start), stable: stable, anchors: anchors.length, mutations: mutations});
+        }
+    }, pollMs);
+})"""
+
+# Reads the anchors of every Bootstrap modal referenced by a toggle button straight
+# from the DOM. Modals whose content is missing or still loading are reported as
+# lazy, by button index, so that only those need a click-through.
+MODAL_HARVEST_SCRIPT = """(buttonSelector) => {
+    const rows = [];
+    const lazy = [];
+    let resolved = 0;
+    const buttons = document.querySelectorAll(buttonSelector);
+    buttons.forEach((button, index) => {
+        const target = button.getAttribute('data-bs-target') || button.getAttribute('href');
+        let modal = null;
+        try {
+            modal = target && target.startsWith('#') ? document.querySelector(target) : null;
+        } catch (e) {
+            modal = null;
+        }
+        const remote = button.hasAttribute('data-bs-remote') || button.hasAttribute('data-remote');
+        const body = modal ? (modal.querySelector('.modal-body') || modal) : null;
+        const loading = body && body.querySelector('.spinner-border, .spinner-grow');
+        if (!modal || remote || loading || !body.textContent.trim()) {
+            lazy.push(index);
+            return;
+        }
+        resolved += 1;
+        for (const anchor of modal.querySelectorAll('a')) {
+            const raw = anchor.getAttribute('href');
+            if (!raw) continue;
+            let href;
+            try {
+                href = new URL(raw, document.baseURI).href;
+            } catch (e) {
+                href = raw;
+            }
+            rows.push([href, 'modal']);
+        }
+    });
+    return {rows: rows, lazy: lazy, resolved: resolved, total: buttons.length};
+}"""
+
+MODAL_BUTTON_SELECTOR = 'button[data-bs-toggle="modal"]'
+
+# Defaults for the `readiness` block of crawler_config.yaml.
+# mode "quiescence" waits for DOM stability, "legacy" keeps the fixed networkidle + sleep waits.
+DEFAULT_READINESS = {
+    'mode': 'quiescence',
+    'quiet_window_ms': 750,
+    'max_wait_ms': 10000,
+    'poll_interval_ms': 100,
+    'watch_attributes': False,
+}
+
+
 class PlaywrightPageManager:
-    def __init__(self, page):
+    def __init__(
+        self,
+        page,
+        stats=None,
+        readiness: Optional[Dict] = None,
+        consent_cache=None,
+        domain: Optional[str] = None,
+        include_frames: bool = False
+    ):
         self.page = page
+        self.stats = stats
+        self.consent_cache = consent_cache
+        self.domain = domain
+        self.include_frames = include_frames
+        self.readiness = {**DEFAULT_READINESS, **(readiness or {})}
+        self.ready_wait_ms = 0
 
     @staticmethod
     def get_default_page_methods():
@@ -29,14 +156,18 @@ class PlaywrightPageManager:
             # Wait for DOM content
             await self.page.wait_for_load_state('domcontentloaded')
             logfire.debug("DOM content loaded", url=self.page.url)
-            
-            # Wait for network idle
-            await self.page.wait_for_load_state('networkidle', timeout=30000)
-            logfire.debug("Network idle", url=self.page.url)
-            
-            # Additional wait for dynamic content
-            await self.page.wait_for_timeout(5000)
-            logfire.debug("Additional wait completed", url=self.page.url)
+
+            if self.readiness['mode'] == 'legacy':
+                # Wait for network idle
+                await self.page.wait_for_load_state('networkidle', timeout=30000)
+                logfire.debug("Network idle", url=self.page.url)
+
+                # Additional wait for dynamic content
+                await self.page.wait_for_timeout(5000)
+                logfire.debug("Additional wait completed", url=self.page.url)
+                return
+
+            await self._wait_for_quiescence()
             
         except Exception as e:
             logfire.error(
@@ -47,15 +178,52 @@ class PlaywrightPageManager:
             )
             raise
 
+    async def _wait_for_quiescence(self) -> Dict:
+        """Wait until anchors and DOM mutations are stable for the quiet window"""
+        max_wait_ms = self.readiness['max_wait_ms']
+        try:
+            result = await self.page.evaluate(READINESS_SCRIPT, {
+                'quietMs': self.readiness['quiet_window_ms'],
+                'maxMs': max_wait_ms,
+                'pollMs': self.readiness['poll_interval_ms'],
+                'watchAttributes': self.readiness['watch_attributes'],
+            })
+        except Exception as e:
+            # A navigation during the wait destroys the execution context
+            logfire.debug("Quiescence wait interrupted", url=self.page.url, error=str(e))
+            await self.page.wait_for_load_state('domcontentloaded')
+            result = {'waited_ms': max_wait_ms, 'stable': False, 'anchors': None, 'mutations': None}
+
+        if self.stats and not result['stable']:
+            self.stats.inc_value('page_readiness/max_wait_reached')
+
+        logfire.debug("DOM quiescent", url=self.page.url, **result)
+        return result
+
+    async def _wait_for_banner_gone(self, timeout: int = 2000) -> bool:
+        """Return True as soon as the cookie banner is detached, False on timeout"""
+        if self.readiness['mode'] == 'legacy':
+            await self.page.wait_for_timeout(timeout)
+            return not await self.page.query_selector('#chefcookie-root')
+        try:
+            await self.page.wait_for_selector('#chefcookie-root', state='detached', timeout=timeout)
+            return True
+        except Exception:
+            return False
+
     async def _handle_cookie_consent(self):
         """Enhanced cookie consent handling with detailed logging"""
         try:
-            await self.page.wait_for_timeout(2000)  # Wait for cookie banner to appear
+            consent_stored = bool(self.consent_cache and self.domain and self.consent_cache.get(self.domain))
+            if self.readiness['mode'] == 'legacy' and not consent_stored:
+                await self.page.wait_for_timeout(2000)  # Wait for cookie banner to appear
             
             # Check for cookie banner
             cookie_banner = await self.page.query_selector('#chefcookie-root')
             
             if not cookie_banner:
+                if consent_stored and self.stats:
+                    self.stats.inc_value('consent/skipped')
                 return
                 
             # Try to click using JavaScript first
@@ -64,11 +232,9 @@ class PlaywrightPageManager:
                     const button = document.querySelector('[data-cc-accept-all]');
                     if (button) button.click();
                 }""")
-                await self.page.wait_for_timeout(2000)
-                
                 # Check if banner is gone
-                banner_exists = await self.page.query_selector('#chefcookie-root')
-                if not banner_exists:
+                if await self._wait_for_banner_gone():
+                    await self._consent_accepted()
                     return
                 else:
                     logfire.debug("Cookie banner still present after JavaScript click")
@@ -139,11 +305,9 @@ class PlaywrightPageManager:
                         for method_name, click_method in methods:
                             try:
                                 await click_method()
-                                await self.page.wait_for_timeout(2000)
-                                
-                                banner_exists = await self.page.query_selector('#chefcookie-root')
-                                if not banner_exists:
-                                  
+
+                                if await self._wait_for_banner_gone():
+                                    await self._consent_accepted()
                                     return
                                 else:
                                     logfire.debug(f"Cookie banner still present after {method_name} click")
@@ -179,11 +343,22 @@ class PlaywrightPageManager:
                 traceback=traceback.format_exc()
             )
 
+    async def _consent_accepted(self):
+        """Persist the storage state so later contexts of the domain skip the banner"""
+        if self.stats:
+            self.stats.inc_value('consent/accepted')
+        if self.consent_cache and self.domain:
+            await self.consent_cache.save(self.domain, self.page.context)
+
     async def initialize_page(self):
         """Initialize page with common settings and handlers"""
         try:
             await self.page.set_viewport_size({"width": 1920, "height": 1080})
-            
+
+            # Whole readiness phase, legacy waits and consent banners included,
+            # so both modes are measured the same way
+            started = time.perf_counter()
+
             # Wait for page ready
             await self._wait_for_page_ready()
             
@@ -192,6 +367,19 @@ class PlaywrightPageManager:
             
             # Handle dynamic elements
             await self._handle_dynamic_elements()
+
+            self.ready_wait_ms = round((time.perf_counter() - started) * 1000)
+
+            if self.stats:
+                self.stats.inc_value('page_readiness/pages')
+                self.stats.inc_value('page_readiness/wait_ms', self.ready_wait_ms)
+                self.stats.max_value('page_readiness/max_wait_ms', self.ready_wait_ms)
+            logfire.info(
+                "Page ready",
+                url=self.page.url,
+                readiness_mode=self.readiness['mode'],
+                ready_wait_ms=self.ready_wait_ms
+            )
             
         except Exception as e:
             logfire.error(
@@ -206,9 +394,11 @@ class PlaywrightPageManager:
     async def _handle_dynamic_elements(self):
         """Handle dynamic page elements"""
         try:
+            legacy = self.readiness['mode'] == 'legacy'
 
             # Wait for any animations
-            await self.page.wait_for_timeout(1000)
+            if legacy:
+                await self.page.wait_for_timeout(1000)
             
             # Scroll to bottom and back
             await self.page.evaluate("""
@@ -216,8 +406,12 @@ class PlaywrightPageManager:
                 window.scrollTo(0, 0);
             """)
             
-            # Wait for network idle
-            await self.page.wait_for_load_state('networkidle')
+            if legacy:
+                # Wait for network idle
+                await self.page.wait_for_load_state('networkidle')
+            else:
+                # Give lazy content triggered by the scroll a chance to settle
+                await self._wait_for_quiescence()
 
         except Exception as e:
             logfire.warning(
@@ -226,11 +420,153 @@ class PlaywrightPageManager:
                 traceback=traceback.format_exc()
             )
 
-    async def cleanup(self):
-        """Cleanup resources"""
+    async def extract_links(self, mode: str = 'evaluate', scope: Optional[str] = None) -> List[Dict[str, str]]:
+        """Extract resolved links as dicts with url and source (main, modal or frame)
+
+        Both modes read the same frames: the main frame, plus the child frames
+        when `include_frames` is set.
+
+        Args:
+            mode: 'evaluate' for a single in-page evaluation per frame,
+                'per_anchor' for one get_attribute round trip per anchor
+            scope: Optional CSS selector restricting extraction to matching containers
+        """
+        if mode == 'evaluate':
+            try:
+                return await self._extract_links_evaluate(scope)
+            except Exception as e:
+                logfire.warning(
+                    "In-page link extraction failed, falling back to per-anchor",
+                    url=self.page.url,
+                    error=str(e)
+                )
+                if self.stats:
+                    self.stats.inc_value('link_extraction/fallbacks')
+        elif mode != 'per_anchor':
+            logfire.warning(f"Unknown link extraction mode: {mode}, using per_anchor")
+
+        return await self._extract_links_per_anchor(scope)
+
+    async def harvest_modal_links(self, mode: str = 'evaluate') -> List[Dict[str, str]]:
+        """Collect links of Bootstrap modals, clicking only the ones loaded lazily
+
+        Args:
+            mode: link extraction mode used inside clicked modals
+        """
+        try:
+            harvest = await self.page.evaluate(MODAL_HARVEST_SCRIPT, MODAL_BUTTON_SELECTOR)
+        except Exception as e:
+            logfire.warning("Static modal harvesting failed, clicking every modal", url=self.page.url, error=str(e))
+            buttons = await self.page.query_selector_all(MODAL_BUTTON_SELECTOR)
+            harvest = {'rows': [], 'lazy': list(range(len(buttons))), 'resolved': 0, 'total': len(buttons)}
+
+        links = [{'url': href, 'source': origin} for href, origin in harvest['rows']]
+        self._inc_stat('modals/static', harvest['resolved'])
+
+        if harvest['lazy']:
+            buttons = await self.page.query_selector_all(MODAL_BUTTON_SELECTOR)
+            for index in harvest['lazy']:
+                if index >= len(buttons):
+                    break
+                modal_links = await self._click_modal(buttons[index], mode)
+                if modal_links is None:
+                    self._inc_stat('modals/failed')
+                    continue
+                self._inc_stat('modals/clicked')
+                links.extend(modal_links)
+
+        logfire.debug(
+            "Modals harvested",
+            url=self.page.url,
+            total=harvest['total'],
+            static=harvest['resolved'],
+            lazy=len(harvest['lazy'])
+        )
+        return links
+
+    async def _click_modal(self, button, mode: str) -> Optional[List[Dict[str, str]]]:
+        """Open a modal, extract its links and close it; None on failure"""
+        try:
+            await button.scroll_into_view_if_needed()
+            await button.click(timeout=5000)
+            await self.page.wait_for_selector('.modal.show', timeout=5000)
+
+            modal_links = await self.extract_links(mode=mode, scope='.modal.show')
+
+            close_button = await self.page.query_selector('.modal.show button[data-bs-dismiss="modal"]')
+            if close_button:
+                await close_button.click()
+            await self.page.wait_for_selector('.modal.show', state='hidden', timeout=5000)
+            return modal_links
+        except Exception as e:
+            logfire.warning(f"Error processing modal: {e}")
+            return None
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats and count:
+            self.stats.inc_value(key, count)
+
+    def _frames(self) -> List[tuple]:
+        """(frame, source, is_main) of the frames links are extracted from"""
+        main_frame = self.page.main_frame
+        frames = [(main_frame, 'main', True)]
+        if self.include_frames:
+            frames.extend(
+                (frame, f"frame:{frame.name or frame.url}", False)
+                for frame in self.page.frames
+                if frame != main_frame and not frame.is_detached()
+            )
+        return frames
+
+    async def _extract_links_evaluate(self, scope: Optional[str] = None) -> List[Dict[str, str]]:
+        """Extract links with one evaluation per frame"""
+        links = []
+        for frame, source, is_main in self._frames():
+            try:
+                rows = await frame.evaluate(
+                    LINK_EXTRACTION_SCRIPT,
+                    {'scope': scope, 'source': source}
+                )
+            except Exception as e:
+                # Only the main frame is essential, child frames can detach mid-evaluation
+                if is_main:
+                    raise
+                logfire.debug("Skipping frame during link extraction", frame=source, error=str(e))
+                continue
+
+            links.extend({'url': href, 'source': origin} for href, origin in rows)
+
+        return links
+
+    async def _extract_links_per_anchor(self, scope: Optional[str] = None) -> List[Dict[str, str]]:
+        """Extract links with one round trip per anchor"""
+        selector = f"{scope} a" if scope else 'a'
+        scope_source = 'modal' if scope and 'modal' in scope else None
+
+        links = []
+        for frame, source, is_main in self._frames():
+            try:
+                frame_links = []
+                for anchor in await frame.query_selector_all(selector):
+                    href = await anchor.get_attribute('href')
+                    if href:
+                        frame_links.append({'url': urljoin(frame.url, href), 'source': scope_source or source})
+            except Exception as e:
+                if is_main:
+                    raise
+                logfire.debug("Skipping frame during link extraction", frame=source, error=str(e))
+                continue
+
+            links.extend(frame_links)
+        return links
+
+    async def cleanup(self, pool=None, domain: Optional[str] = None):
+        """Cleanup resources, handing the page back to the pool when one is given"""
         try:
-           
-            await self.page.close()
+            if pool and domain:
+                await pool.release(domain, self.page)
+            else:
+                await self.page.close()
            
         except Exception as e:
             logfire.error("Error during cleanup", 
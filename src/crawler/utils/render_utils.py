@@ -0,0 +1,151 @@
+# src/crawler/utils/render_utils.py
+
+from typing import Dict, Any, List, Optional
+from crawler.utils.url_utils import matches_pattern, is_valid_url
+import logfire
+
+RENDER_MODES = ('auto', 'always', 'never')
+
+# Defaults for the `render_heuristics` block of crawler_config.yaml
+DEFAULT_RENDER_HEURISTICS = {
+    'min_matches': 1,
+    'modal_markers': ['[data-bs-toggle="modal"]'],
+    'js_only_domains': [],
+}
+
+# Reasons that are a property of the site's markup: one page is enough to
+# send the whole domain to Playwright
+DOMAIN_REASONS = ('lazy_modal', 'non_html')
+
+
+class RenderDecider:
+    """Decide whether a page needs a browser or plain HTTP is enough
+
+    In `auto` mode pages are first fetched with Scrapy's HTTP downloader and
+    escalated to Playwright when a heuristic fires: too few matching links,
+    modals whose content is not in the raw HTML, or a JS-only domain. The
+    outcome is cached per domain: a lazy modal or a non-HTML response sends
+    the domain's later pages straight to Playwright, other reasons (few
+    matches, HTTP errors) only once `domain_escalations` pages escalated and
+    they are at least half of the pages seen on the domain.
+    """
+
+    def __init__(self, default_mode: str = 'auto', stats=None, domain_escalations: int = 3):
+        self.default_mode = default_mode
+        self.stats = stats
+        self.domain_escalations = domain_escalations
+        self._domain_decisions: Dict[str, str] = {}
+        self._domain_pages: Dict[str, int] = {}
+        self._domain_escalated: Dict[str, int] = {}
+
+    def render_mode(self, url_config: Dict[str, Any]) -> str:
+        mode = url_config.get('render', self.default_mode)
+        if mode not in RENDER_MODES:
+            logfire.warning(f"Unknown render mode: {mode}, using auto")
+            return 'auto'
+        return mode
+
+    def use_playwright(self, url_config: Dict[str, Any], domain: str) -> bool:
+        """Whether a new request must be rendered with Playwright right away"""
+        mode = self.render_mode(url_config)
+        if mode != 'auto':
+            return mode == 'always'
+
+        heuristics = self._heuristics(url_config)
+        if domain in heuristics['js_only_domains']:
+            return True
+        return self._domain_decisions.get(domain) == 'playwright'
+
+    def escalation_reason(
+        self,
+        response,
+        found_links: List[str],
+        url_config: Dict[str, Any],
+        current_depth: int
+    ) -> Optional[str]:
+        """Return why an HTTP-fetched page must be re-rendered, or None if it is usable"""
+        heuristics = self._heuristics(url_config)
+
+        if not hasattr(response, 'css'):
+            return 'non_html'
+
+        for marker in heuristics['modal_markers']:
+            if self._has_lazy_modal(response, marker):
+                return 'lazy_modal'
+
+        matches = self._count_matches(found_links, url_config, current_depth)
+        if matches < heuristics['min_matches']:
+            return 'too_few_matches'
+        return None
+
+    def record(self, domain: str, reason: Optional[str], page_only: bool = False):
+        """Update the domain's decision and stats with the outcome of one page
+
+        `page_only` escalations (a page that may legitimately have no matches,
+        like a deep seed or the last page of a listing) re-render that page
+        without counting against the domain.
+        """
+        if not reason:
+            self._domain_decisions.setdefault(domain, 'http')
+            self._domain_pages[domain] = self._domain_pages.get(domain, 0) + 1
+            self._inc_stat('hybrid_fetch/http_pages')
+            return
+
+        self._inc_stat('hybrid_fetch/escalated')
+        self._inc_stat(f'hybrid_fetch/escalated/{reason}')
+        logfire.info("Escalating to Playwright", domain=domain, reason=reason, page_only=page_only)
+        if page_only:
+            return
+
+        pages = self._domain_pages[domain] = self._domain_pages.get(domain, 0) + 1
+        escalated = self._domain_escalated[domain] = self._domain_escalated.get(domain, 0) + 1
+        if self._domain_decisions.get(domain) == 'playwright':
+            return
+        if reason in DOMAIN_REASONS or (escalated >= self.domain_escalations and escalated * 2 >= pages):
+            self._domain_decisions[domain] = 'playwright'
+            self._inc_stat('hybrid_fetch/domains_escalated')
+            logfire.info("Rendering domain with Playwright", domain=domain, reason=reason, escalated=escalated, pages=pages)
+
+    @staticmethod
+    def _has_lazy_modal(response, marker: str) -> bool:
+        """Whether a modal toggle points to content missing from the raw HTML
+
+        Modals whose body is already in the markup are harvested from it, only
+        remote or empty ones need a browser to be clicked open.
+        """
+        for toggle in response.css(marker):
+            target = toggle.attrib.get('data-bs-target') or toggle.attrib.get('href') or ''
+            if 'data-bs-remote' in toggle.attrib or 'data-remote' in toggle.attrib:
+                return True
+            if not target.startswith('#') or len(target) < 2:
+                return True
+            modal = response.xpath('//*[@id=$id]', id=target[1:])
+            if not modal:
+                return True
+            body = modal.css('.modal-body') or modal
+            if body.css('.spinner-border, .spinner-grow') or not ''.join(body.css('::text').getall()).strip():
+                return True
+        return False
+
+    def _heuristics(self, url_config: Dict[str, Any]) -> Dict[str, Any]:
+        return {**DEFAULT_RENDER_HEURISTICS, **(url_config.get('render_heuristics') or {})}
+
+    def _count_matches(self, links: List[str], url_config: Dict[str, Any], current_depth: int) -> int:
+        """Count links that would become target or seed items"""
+        target_patterns = url_config.get('target_patterns', [])
+        seed_pattern = url_config.get('seed_pattern')
+        expand_seeds = url_config.get('type') == 2 and current_depth < url_config.get('max_depth', 0)
+
+        matches = 0
+        for link in links:
+            if not is_valid_url(link):
+                continue
+            if matches_pattern(link, target_patterns):
+                matches += 1
+            elif expand_seeds and seed_pattern and matches_pattern(link, [seed_pattern]):
+                matches += 1
+        return matches
+
+    def _inc_stat(self, key: str):
+        if self.stats:
+            self.stats.inc_value(key)
@@ -0,0 +1,156 @@
+# src/crawler/utils/revalidation_utils.py
+
+from typing import Dict, Any, Iterable, Optional
+import logfire
+
+REVALIDATION_MODES = ('head', 'conditional', 'off')
+
+# Status codes parse_direct must receive instead of the HttpError middleware
+REVALIDATION_STATUSES = [304, 405, 501]
+
+
+def validators_from_response(response) -> Dict[str, Any]:
+    """ETag, Last-Modified and Content-Length of a response"""
+    headers = response.headers
+    content_length = headers.get('Content-Length')
+    if content_length is not None:
+        try:
+            content_length = int(content_length)
+        except ValueError:
+            content_length = None
+    if content_length is None and response.request.method != 'HEAD' and response.status == 200:
+        content_length = len(response.body)
+
+    return {
+        'etag': _header(headers, 'ETag'),
+        'last_modified': _header(headers, 'Last-Modified'),
+        'content_length': content_length,
+    }
+
+
+def _header(headers, name: str) -> Optional[str]:
+    value = headers.get(name)
+    return value.decode('latin-1') if value is not None else None
+
+
+class TargetRevalidator:
+    """Cheap revalidation of type 0 targets from the validators stored in frontier_url
+
+    `head` mode sends a HEAD request and compares ETag, Last-Modified and
+    Content-Length with the stored ones; servers without HEAD support get a
+    conditional GET instead. `conditional` mode always sends a GET with
+    If-None-Match / If-Modified-Since and relies on 304 Not Modified.
+    Unchanged targets produce no item, new or changed ones are stored with
+    their validators and set back to pending.
+    """
+
+    def __init__(self, mode: str = 'head', stats=None):
+        self.mode = mode
+        self.stats = stats
+        self._known: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['TargetRevalidator']:
+        mode = settings.get('REVALIDATION_MODE', 'off')
+        if mode == 'off':
+            return None
+        if mode not in REVALIDATION_MODES:
+            logfire.warning(f"Unknown revalidation mode: {mode}, using head")
+            mode = 'head'
+        return cls(mode=mode, stats=stats)
+
+    def load(self, targets: Iterable[tuple]):
+        """Load stored validators of (url, category) pairs from frontier_url"""
+        from crawler.database import db_manager
+        from crawler.crud.frontier_crud import FrontierCRUD
+
+        by_category: Dict[str, list] = {}
+        for url, category in targets:
+            by_category.setdefault(category, []).append(url)
+        if not by_category:
+            return
+
+        if not db_manager.pool:
+            db_manager.initialize()
+        conn = db_manager.pool.getconn()
+        try:
+            crud = FrontierCRUD(conn, db_manager.queries)
+            for category, urls in by_category.items():
+                for row in crud.get_url_validators(urls, category):
+                    self._known[row['url']] = row
+        except Exception as e:
+            logfire.warning("Failed to load target validators, fetching all targets", error=str(e))
+        finally:
+            db_manager.pool.putconn(conn)
+
+    def url_mode(self, url_config: Dict[str, Any]) -> str:
+        mode = url_config.get('revalidate', self.mode)
+        return mode if mode in REVALIDATION_MODES else self.mode
+
+    def stored(self, url: str) -> Optional[Dict[str, Any]]:
+        return self._known.get(url)
+
+    def request_kwargs(self, url: str, url_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Method and headers of the revalidation request of a target"""
+        mode = self.url_mode(url_config)
+        if mode == 'off':
+            return {}
+
+        self._inc_stat('revalidation/requests')
+        if mode == 'head':
+            return {'method': 'HEAD', 'meta': {'handle_httpstatus_list': REVALIDATION_STATUSES}}
+        return self.conditional_kwargs(url)
+
+    def conditional_kwargs(self, url: str) -> Dict[str, Any]:
+        stored = self.stored(url) or {}
+        headers = {}
+        if stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored.get('last_modified'):
+            headers['If-Modified-Since'] = stored['last_modified']
+        return {'headers': headers, 'meta': {'handle_httpstatus_list': REVALIDATION_STATUSES}}
+
+    def needs_get_fallback(self, response) -> bool:
+        """Whether a HEAD request was refused and must be retried as conditional GET"""
+        if response.request.method == 'HEAD' and response.status in (405, 501):
+            self._inc_stat('revalidation/head_unsupported')
+            return True
+        return False
+
+    def classify(self, url: str, response) -> tuple:
+        """Return ('new' | 'changed' | 'unchanged', fresh validators) of a revalidated target"""
+        stored = self.stored(url) or self.stored(response.request.url)
+        if response.status == 304:
+            result = 'unchanged'
+            fresh = {key: (stored or {}).get(key) for key in ('etag', 'last_modified', 'content_length')}
+        else:
+            fresh = validators_from_response(response)
+            if stored is None:
+                result = 'new'
+            elif self._same_document(stored, fresh):
+                result = 'unchanged'
+            else:
+                result = 'changed'
+
+        self._inc_stat(f'revalidation/{result}')
+        if result == 'unchanged' and stored and stored.get('content_length'):
+            self._inc_stat('revalidation/bytes_saved', stored['content_length'])
+        return result, fresh
+
+    @staticmethod
+    def _same_document(stored: Dict[str, Any], fresh: Dict[str, Any]) -> bool:
+        """Strongest available validator wins, no validator at all means changed"""
+        if stored.get('etag') and fresh.get('etag'):
+            return stored['etag'] == fresh['etag']
+        if stored.get('last_modified') and fresh.get('last_modified'):
+            return (
+                stored['last_modified'] == fresh['last_modified']
+                and (stored.get('content_length') is None
+                     or fresh.get('content_length') is None
+                     or stored['content_length'] == fresh['content_length'])
+            )
+        return False
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats:
+            self.stats.inc_value(key, count)
@@ -0,0 +1,129 @@
+# src/crawler/utils/snapshot_utils.py
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urljoin
+from parsel import Selector
+import logfire
+
+
+def extract_links_from_html(html: str, base_url: str) -> List[str]:
+    """Absolute hrefs of all anchors of a stored document, in document order"""
+    hrefs = Selector(text=html).css('a::attr(href)').getall()
+    return [urljoin(base_url, href.strip()) for href in hrefs if href and href.strip()]
+
+
+class SnapshotStore:
+    """Local store of the final HTML of crawled pages
+
+    Documents are gzip-compressed and content-addressed, so a page that did
+    not change between runs is stored once:
+
+        <root>/objects/ab/abcdef....html.gz
+        <root>/runs/<run_id>.jsonl    one line per page: url, sha256 and crawl state
+        <root>/runs/<run_id>.<part>.jsonl    the same, per worker of a sharded run
+
+    The run manifests let `src/tools/reprocess.py` replay a crawl against the
+    current configuration without a browser.
+    """
+
+    def __init__(self, root_dir: str = '.cache/snapshots', compress_level: int = 6, stats=None):
+        self.root_dir = Path(root_dir)
+        self.compress_level = compress_level
+        self.stats = stats
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['SnapshotStore']:
+        if not settings.getbool('SNAPSHOT_ENABLED', False):
+            return None
+        return cls(
+            root_dir=settings.get('SNAPSHOT_DIR', '.cache/snapshots'),
+            compress_level=settings.getint('SNAPSHOT_COMPRESS_LEVEL', 6),
+            stats=stats
+        )
+
+    def object_path(self, digest: str) -> Path:
+        return self.root_dir / 'objects' / digest[:2] / f"{digest}.html.gz"
+
+    def manifest_path(self, run_id: str, part: Optional[str] = None) -> Path:
+        name = f"{run_id}.{part}" if part else run_id
+        return self.root_dir / 'runs' / f"{name}.jsonl"
+
+    def manifests(self, run_id: str) -> List[Path]:
+        """Manifest files of a run, one per worker of a sharded run"""
+        runs_dir = self.root_dir / 'runs'
+        paths = [self.manifest_path(run_id)] + sorted(runs_dir.glob(f"{run_id}.*.jsonl"))
+        return [path for path in paths if path.exists()]
+
+    def save(self, run_id: str, url: str, html: str, meta: Dict[str, Any], part: Optional[str] = None) -> Optional[str]:
+        """Store a document for a run (in the manifest of `part`, if given) and return its digest"""
+        try:
+            data = html.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+
+            path = self.object_path(digest)
+            if path.exists():
+                self._inc_stat('snapshot/deduplicated')
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=self.compress_level))
+                os.replace(tmp_path, path)
+                self._inc_stat('snapshot/stored_bytes', path.stat().st_size)
+
+            entry = {
+                'url': url,
+                'sha256': digest,
+                'saved_at': datetime.now().isoformat(timespec='seconds'),
+                **meta
+            }
+            manifest = self.manifest_path(run_id, part)
+            manifest.parent.mkdir(parents=True, exist_ok=True)
+            # Single short append per line, a restarted worker continues its own file
+            with open(manifest, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+            self._inc_stat('snapshot/saved')
+            self._inc_stat('snapshot/html_bytes', len(data))
+            return digest
+
+        except Exception as e:
+            logfire.warning("Failed to save snapshot", url=url, error=str(e))
+            self._inc_stat('snapshot/failed')
+            return None
+
+    def load(self, digest: str) -> str:
+        with open(self.object_path(digest), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+    def run_ids(self) -> List[str]:
+        """Stored runs, oldest first"""
+        runs_dir = self.root_dir / 'runs'
+        if not runs_dir.exists():
+            return []
+        return sorted({path.name.split('.')[0] for path in runs_dir.glob('*.jsonl')})
+
+    def entries(self, run_id: str) -> Iterator[Dict[str, Any]]:
+        """Manifest entries of all the parts of a run, the last snapshot of each URL wins"""
+        manifests = self.manifests(run_id)
+        if not manifests:
+            raise FileNotFoundError(f"No manifest for run {run_id} in {self.root_dir / 'runs'}")
+
+        latest = {}
+        for manifest in manifests:
+            with open(manifest, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        latest[entry['url']] = entry
+        yield from latest.values()
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats:
+            self.stats.inc_value(key, count)
@@ -0,0 +1,64 @@
+# src/crawler/utils/storage_state_utils.py
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional
+import logfire
+
+
+class StorageStateCache:
+    """Local cache of browser storage state (cookies, localStorage) per domain
+
+    Once cookie consent has been accepted on a domain its storage state is
+    saved here, and new browser contexts for that domain start from it until
+    the file is older than the TTL.
+    """
+
+    def __init__(self, cache_dir: str = '.cache/storage_state', ttl_seconds: int = 86400, stats=None):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.stats = stats
+
+    @classmethod
+    def from_settings(cls, settings, stats=None) -> Optional['StorageStateCache']:
+        if not settings.getbool('CONSENT_STATE_ENABLED', True):
+            return None
+        return cls(
+            cache_dir=settings.get('CONSENT_STATE_DIR', '.cache/storage_state'),
+            ttl_seconds=settings.getint('CONSENT_STATE_TTL', 86400),
+            stats=stats
+        )
+
+    def path_for(self, domain: str) -> Path:
+        safe_name = re.sub(r'[^A-Za-z0-9.-]', '_', domain)
+        return self.cache_dir / f"{safe_name}.json"
+
+    def get(self, domain: str) -> Optional[str]:
+        """Return the storage state file of the domain if present and not expired"""
+        path = self.path_for(domain)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        if age > self.ttl_seconds:
+            logfire.debug("Storage state expired", domain=domain, age_seconds=int(age))
+            path.unlink(missing_ok=True)
+            return None
+        return str(path)
+
+    async def save(self, domain: str, context) -> None:
+        """Persist the storage state of a browser context for the domain"""
+        path = self.path_for(domain)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            await context.storage_state(path=str(tmp_path))
+            os.replace(tmp_path, path)
+            if self.stats:
+                self.stats.inc_value('consent/state_saved')
+            logfire.info("Saved storage state", domain=domain, path=str(path))
+        except Exception as e:
+            logfire.warning("Failed to save storage state", domain=domain, error=str(e))
@@ -1,6 +1,7 @@
 
 import re
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Sequence
 from urllib.parse import urlparse
 def is_valid_url(url: str) -> bool:
     """Check if URL is valid"""
@@ -15,17 +16,94 @@ def matches_pattern(url: str, patterns: List[str]) -> bool:
     """Check if URL matches any of the given patterns with improved PDF detection"""
     if not patterns:
         return False
-        
+    return pattern_matcher(patterns).matches(url)
+
+
+def _matches_pattern_uncompiled(url: str, patterns: List[str]) -> bool:
+    """Reference implementation of matches_pattern, one re.search per pattern"""
+    if not patterns:
+        return False
+
     # First do a simple check for PDF in URL (case insensitive)
     if any(pattern.lower() in url.lower() for pattern in patterns if isinstance(pattern, str)):
         return True
-        
+
     # Then try regex patterns
     return any(re.search(pattern, url, re.IGNORECASE) for pattern in patterns)
 
+
+def _strip_wildcards(pattern: str) -> str:
+    """Drop a leading and trailing `.*`, which cannot change whether re.search finds a match"""
+    stripped = pattern
+    if stripped.startswith('.*') and not stripped[2:3] in ('?', '+', '*', '{'):
+        stripped = stripped[2:]
+    if stripped.endswith('.*'):
+        backslashes = len(stripped[:-2]) - len(stripped[:-2].rstrip('\\'))
+        if backslashes % 2 == 0:
+            stripped = stripped[:-2]
+    return stripped
+
+
+class PatternMatcher:
+    """Compiled form of a pattern list with the exact semantics of matches_pattern
+
+    - the URL is lowercased once and every pattern is first tried as a
+      case-insensitive literal substring
+    - the regex check runs a single alternation of all patterns, without
+      the leading and trailing `.*` that only slow a search down
+    A pattern list that cannot be combined safely (invalid or non-string
+    patterns, numbered groups, inline global flags) falls back to the
+    uncompiled implementation, errors included.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._literals = []
+        self._regex = None
+        self._fallback = not self.patterns
+
+        if not self._fallback:
+            try:
+                self._literals = [pattern.lower() for pattern in self.patterns]
+                compiled = [re.compile(pattern, re.IGNORECASE) for pattern in self.patterns]
+                # Group numbers would shift inside the alternation and break backreferences
+                if any(regex.groups for regex in compiled):
+                    raise re.error("patterns with groups are not combined")
+                self._regex = re.compile(
+                    '|'.join(f'(?:{_strip_wildcards(pattern)})' for pattern in self.patterns),
+                    re.IGNORECASE
+                )
+            except (AttributeError, TypeError, re.error):
+                self._fallback = True
+
+    def matches(self, url: str) -> bool:
+        if self._fallback:
+            return _matches_pattern_uncompiled(url, self.patterns)
+
+        url_lower = url.lower()
+        for literal in self._literals:
+            if literal in url_lower:
+                return True
+        return self._regex.search(url) is not None
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(patterns: tuple) -> PatternMatcher:
+    return PatternMatcher(patterns)
+
+
+def pattern_matcher(patterns: Sequence[str]) -> PatternMatcher:
+    """PatternMatcher of a pattern list, compiled once per distinct list"""
+    try:
+        return _cached_matcher(tuple(patterns))
+    except TypeError:
+        # Unhashable patterns are not cached
+        return PatternMatcher(patterns)
+
+
 def get_url_type_config(url: str, category_config: dict) -> Optional[dict]:
     """Get URL type configuration for given URL"""
     for url_config in category_config.get('urls', []):
         if url == url_config['url']:
             return url_config
-    return None
\ No newline at end of file
+    return None
@@ -1,8 +1,12 @@
 import os
 import sys
+import json
+import time
+from datetime import datetime
 from pathlib import Path
 import asyncio
 import argparse
+import multiprocessing
 from scrapy.utils.reactor import install_reactor
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
@@ -10,6 +14,19 @@ from scrapy.utils.log import configure_logging
 import logfire
 from dotenv import load_dotenv
 
+# Stats summed across workers in the final summary
+SUMMARY_STATS = [
+    'item_scraped_count',
+    'response_received_count',
+    'downloader/request_count',
+    'log_count/ERROR',
+    'hybrid_fetch/http_pages',
+    'hybrid_fetch/escalated',
+    'link_extraction/links',
+    'page_pool/hit',
+    'page_pool/miss',
+]
+
 def setup_environment():
     """Setup environment variables and paths"""
     project_root = Path(__file__).resolve().parent.parent
@@ -21,7 +38,7 @@ def setup_environment():
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Run the frontier spider')
-    parser.add_argument('--url_seed_root_id', 
+    parser.add_argument('--url_seed_root_id',
                        type=int,
                        help='Specific url_seed_root_id to process from config',
                        required=False)
@@ -29,39 +46,183 @@ def parse_arguments():
                        choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG'],
                        default='INFO',
                        help='Set logging level (default: INFO)')
+    parser.add_argument('--workers',
+                       type=int,
+                       default=1,
+                       help='Number of crawler processes, each with its own browser (default: 1)')
+    parser.add_argument('--shard_by',
+                       choices=['root', 'category'],
+                       default='root',
+                       help='Split url_seed_root_ids across workers one by one or by category (default: root)')
+    parser.add_argument('--max_restarts',
+                       type=int,
+                       default=2,
+                       help='Restarts allowed per crashed worker (default: 2)')
     return parser.parse_args()
 
+def build_shards(config: dict, workers: int, shard_by: str = 'root', url_seed_root_id=None) -> list:
+    """Split the configured url_seed_root_ids into at most `workers` non-empty shards"""
+    groups = []
+    for category in config.get('categories', []):
+        root_ids = [
+            url_config['url_seed_root_id']
+            for url_config in category.get('urls', [])
+            if url_seed_root_id is None or url_config.get('url_seed_root_id') == url_seed_root_id
+        ]
+        if not root_ids:
+            continue
+        if shard_by == 'category':
+            groups.append(root_ids)
+        else:
+            groups.extend([root_id] for root_id in root_ids)
+
+    shards = [[] for _ in range(min(workers, len(groups)))]
+    # Largest groups first, each to the currently smallest shard
+    for group in sorted(groups, key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return [sorted(shard) for shard in shards]
+
+def run_crawler(log_level: str, url_seed_root_ids=None, create_schema: bool = True, run_id: str = None, worker: int = None) -> dict:
+    """Run one crawler process and return its final stats"""
+    # Set logging level from command line argument
+    os.environ['LEVEL_DEEP_LOGGING'] = log_level
+
+    install_reactor('twisted.internet.asyncioreactor.AsyncioSelectorReactor')
+
+    from crawler.utils.logging_utils import setup_logging
+    setup_logging()
+    from crawler.database import db_manager
+
+    db_manager.initialize(create_schema=create_schema)
+    configure_logging(install_root_handler=False)
+
+    settings = get_project_settings()
+    process = CrawlerProcess(settings)
+
+    from crawler.spiders.frontier_spider import FrontierSpider
+
+    logfire.info("Starting crawler process",
+                url_seed_root_ids=url_seed_root_ids if url_seed_root_ids is not None else "all",
+                log_level=log_level)
+    crawler = process.create_crawler(FrontierSpider)
+    process.crawl(
+        crawler,
+        url_seed_root_ids=','.join(map(str, url_seed_root_ids)) if url_seed_root_ids is not None else None,
+        run_id=run_id,
+        worker=worker
+    )
+    process.start()
+    return crawler.stats.get_stats()
+
+def run_worker(shard_index: int, url_seed_root_ids: list, log_level: str, run_id: str, result_queue):
+    """Entry point of a worker process crawling one shard"""
+    setup_environment()
+    stats = run_crawler(log_level, url_seed_root_ids=url_seed_root_ids, create_schema=False,
+                        run_id=run_id, worker=shard_index)
+    result_queue.put((shard_index, json.loads(json.dumps(stats, default=str))))
+
+def supervise_workers(shards: list, log_level: str, max_restarts: int, run_id: str) -> dict:
+    """Start one process per shard, restart crashed ones and collect their stats"""
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    workers = {}
+    restarts = {index: 0 for index in range(len(shards))}
+    results = {}
+    failed = set()
+
+    def start(index):
+        process = context.Process(
+            target=run_worker,
+            args=(index, shards[index], log_level, run_id, result_queue),
+            name=f"crawler-worker-{index}"
+        )
+        process.start()
+        workers[index] = process
+        logfire.info("Started worker", worker=index, pid=process.pid, url_seed_root_ids=shards[index])
+
+    for index in range(len(shards)):
+        start(index)
+
+    while workers:
+        while not result_queue.empty():
+            index, stats = result_queue.get()
+            results[index] = stats
+
+        for index, process in list(workers.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del workers[index]
+            if process.exitcode == 0:
+                continue
+            if restarts[index] < max_restarts:
+                restarts[index] += 1
+                logfire.warning("Worker crashed, restarting", worker=index,
+                                exitcode=process.exitcode, restart=restarts[index])
+                start(index)
+            else:
+                logfire.error("Worker failed", worker=index, exitcode=process.exitcode)
+                failed.add(index)
+        time.sleep(1)
+
+    while not result_queue.empty():
+        index, stats = result_queue.get()
+        results[index] = stats
+
+    return {'results': results, 'restarts': restarts, 'failed': failed}
+
+def print_summary(shards: list, outcome: dict):
+    """Print per-worker status and stats merged across workers"""
+    merged = {key: 0 for key in SUMMARY_STATS}
+    print("\n" + "=" * 50)
+    print("CRAWL SUMMARY")
+    print("=" * 50)
+    for index, shard in enumerate(shards):
+        stats = outcome['results'].get(index, {})
+        status = 'failed' if index in outcome['failed'] else stats.get('finish_reason', 'unknown')
+        print(f"Worker {index}: roots={shard} status={status} "
+              f"restarts={outcome['restarts'][index]} items={stats.get('item_scraped_count', 0)}")
+        for key in SUMMARY_STATS:
+            value = stats.get(key)
+            if isinstance(value, (int, float)):
+                merged[key] += value
+    print("-" * 50)
+    for key, value in merged.items():
+        print(f"{key}: {value}")
+    print("=" * 50)
+
 def main():
     try:
         args = parse_arguments()
         setup_environment()
-        
-        # Set logging level from command line argument
-        os.environ['LEVEL_DEEP_LOGGING'] = args.log_level
-        
-        install_reactor('twisted.internet.asyncioreactor.AsyncioSelectorReactor')
-        
-        from crawler.utils.logging_utils import setup_logging
-        setup_logging()
+
+        if args.workers <= 1:
+            url_seed_root_ids = [args.url_seed_root_id] if args.url_seed_root_id is not None else None
+            run_crawler(args.log_level, url_seed_root_ids=url_seed_root_ids)
+            return
+
+        from crawler.utils.config_utils import load_crawler_config
+        shards = build_shards(load_crawler_config(), args.workers, args.shard_by, args.url_seed_root_id)
+        if not shards:
+            logfire.warning("No url_seed_root_id to crawl")
+            return
+
+        # Create the schema once, before the workers race for it
         from crawler.database import db_manager
-        
         db_manager.initialize()
-        configure_logging(install_root_handler=False)
-        
-        settings = get_project_settings()
-        process = CrawlerProcess(settings)
-        
-        from crawler.spiders.frontier_spider import FrontierSpider
-        
-        logfire.info("Starting crawler process", 
-                    url_seed_root_id=args.url_seed_root_id if args.url_seed_root_id is not None else "all",
-                    log_level=args.log_level)
-        process.crawl(FrontierSpider, url_seed_root_id=args.url_seed_root_id)
-        process.start()
-        
+        db_manager.close()
+
+        # One run id for the whole crawl, so its snapshots are reprocessed together
+        run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        logfire.info("Starting sharded crawl", run_id=run_id, workers=len(shards))
+        outcome = supervise_workers(shards, args.log_level, args.max_restarts, run_id)
+        print_summary(shards, outcome)
+        if outcome['failed']:
+            sys.exit(1)
+
     except Exception as e:
         logfire.error(f"Failed to run crawler: {e}")
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
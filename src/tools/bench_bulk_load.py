@@ -0,0 +1,98 @@
+# src/tools/bench_bulk_load.py
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import logfire
+from crawler.database import db_manager
+from crawler.crud.frontier_crud import FrontierCRUD
+from crawler.models.frontier_model import FrontierUrl, UrlType
+
+BENCH_CATEGORY = '__bench_bulk_load__'
+
+
+def generate_rows(count: int, offset: int = 0, category: str = BENCH_CATEGORY):
+    """Frontier rows as dicts, produced lazily"""
+    for n in range(offset, offset + count):
+        yield {
+            'url': f"https://bench{n % 50}.example.org/bandi/{n}/documento-{n}.pdf",
+            'category': category,
+            'url_type': UrlType.SEED_TARGET.value,
+            'depth': 1,
+            'max_depth': 2,
+            'target_patterns': ['.pdf', r'download.*pdf'],
+            'seed_pattern': '/bandi/',
+            'is_target': True,
+            'parent_url': f"https://bench{n % 50}.example.org/bandi/{n // 100}"
+        }
+
+
+def as_models(rows):
+    return [FrontierUrl(**row) for row in rows]
+
+
+def delete_bench_rows(conn):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM frontier_url WHERE category = %s", (BENCH_CATEGORY,))
+    conn.commit()
+
+
+def timed(label: str, rows: int, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} rows={rows:<8} time={elapsed:.2f}s throughput={rows / elapsed:,.0f} rows/s result={result}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark COPY bulk loading against multi-row INSERTs into frontier_url')
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows per load (default: 100000)')
+    parser.add_argument('--insert_rows', type=int, default=20_000, help='Rows for the execute_values baseline (default: 20000)')
+    parser.add_argument('--page_size', type=int, default=500, help='execute_values page size (default: 500)')
+    args = parser.parse_args()
+
+    logfire.configure(send_to_logfire=False, console=False)
+
+    db_manager.initialize(create_schema=False)
+    conn = db_manager.pool.getconn()
+    crud = FrontierCRUD(conn, db_manager.queries)
+    try:
+        delete_bench_rows(conn)
+
+        # Baseline: the pipeline's multi-row INSERT, models built up front
+        timed(
+            'execute_values INSERT',
+            args.insert_rows,
+            lambda: crud.bulk_insert_urls(as_models(generate_rows(args.insert_rows)), page_size=args.page_size)
+        )
+        delete_bench_rows(conn)
+
+        # COPY from a generator, empty table then the same rows again (all duplicates)
+        result = timed('COPY bulk_load (new rows)', args.rows, lambda: crud.bulk_load(generate_rows(args.rows)))
+        assert result['inserted'] == args.rows, result
+        result = timed('COPY bulk_load (all duplicates)', args.rows, lambda: crud.bulk_load(generate_rows(args.rows)))
+        assert result['duplicates'] == args.rows, result
+
+        # Half new, half already there, with repeats inside the load
+        half = args.rows // 2
+        mixed = (row for offset in (half, half) for row in generate_rows(args.rows, offset=offset))
+        result = timed('COPY bulk_load (mixed, repeated)', 2 * args.rows, lambda: crud.bulk_load(mixed))
+        assert result['inserted'] == half, result
+
+        # Pydantic models instead of dicts
+        delete_bench_rows(conn)
+        timed('COPY bulk_load (FrontierUrl models)', args.insert_rows, lambda: crud.bulk_load(as_models(generate_rows(args.insert_rows))))
+    finally:
+        delete_bench_rows(conn)
+        db_manager.pool.putconn(conn)
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# src/tools/bench_crud_statements.py
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import logfire
+from crawler.database import db_manager
+from crawler.crud.basic_crud import BaseCRUD, clear_statements
+
+BENCH_TABLE = 'bench_crud_statements'
+
+
+def run_operations(crud: BaseCRUD, rows: int):
+    """Single-row insert, exists, select, update and delete of `rows` rows"""
+    for n in range(rows):
+        crud.insert_one(BENCH_TABLE, {'url': f"https://bench.example.org/{n}", 'category': 'bench', 'depth': n % 5})
+    for n in range(rows):
+        crud.exists(BENCH_TABLE, {'url': f"https://bench.example.org/{n}", 'category': 'bench'})
+    for n in range(rows):
+        crud.select(BENCH_TABLE, ['id', 'url'], where={'category': 'bench', 'depth': n % 5}, order_by='id', limit=10, offset=n % 50)
+    for n in range(rows):
+        crud.update(BENCH_TABLE, {'url': f"https://bench.example.org/{n}"}, {'depth': n % 7})
+    for n in range(rows):
+        crud.delete(BENCH_TABLE, {'url': f"https://bench.example.org/{n}"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cached and prepared BaseCRUD statements against plain SQL')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per operation (default: 2000)')
+    parser.add_argument('--prepare_threshold', type=int, default=5, help='Calls before a statement is prepared (default: 5)')
+    args = parser.parse_args()
+
+    logfire.configure(send_to_logfire=False, console=False)
+
+    db_manager.initialize(create_schema=False)
+    conn = db_manager.pool.getconn()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {BENCH_TABLE} (
+                    id SERIAL PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    depth INTEGER
+                )
+            """)
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {BENCH_TABLE}_url ON {BENCH_TABLE} (url)")
+
+        for label, threshold in (('plain SQL', 0), ('prepared', args.prepare_threshold)):
+            # Each run starts cold: statements are rebuilt, counted from zero
+            # and prepared only after their own `threshold` calls
+            clear_statements()
+            crud = BaseCRUD(conn, db_manager.queries)
+            crud.prepare_threshold = threshold
+            started = time.perf_counter()
+            run_operations(crud, args.rows)
+            elapsed = time.perf_counter() - started
+            operations = 5 * args.rows
+            print(f"{label:<10} operations={operations:<8} time={elapsed:.2f}s per_op={elapsed / operations * 1e6:,.0f}us")
+            for row in BaseCRUD.statement_stats():
+                print(f"  {row['statement']:<30} calls={row['calls']:<8} prepared={row['prepared_calls']:<8} "
+                      f"total={row['total_ms']:,.1f}ms avg={row['avg_ms']:.3f}ms max={row['max_ms']:.3f}ms")
+            print()
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+            cur.execute("DEALLOCATE ALL")
+        db_manager.pool.putconn(conn)
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
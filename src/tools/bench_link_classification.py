@@ -0,0 +1,116 @@
+# src/tools/bench_link_classification.py
+
+import sys
+import random
+import argparse
+import timeit
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import logfire
+from crawler.utils.config_utils import load_crawler_config
+from crawler.utils.crawl_manager_utils import CrawlManager
+from crawler.utils.link_batch_utils import _polars_regex, classify_links_batch
+from crawler.utils.url_utils import is_valid_url
+
+# Pattern lists next to the configured ones: the first two run in polars,
+# the others are left to the per-link loop
+EXTRA_PATTERNS = [
+    ([".pdf", r"download.*pdf"], "/s/abis1/"),
+    ([r"\d+\.docx?$", "bando"], r"/news/\d+"),
+    ([r"(\d+)-\1\.pdf"], None),        # backreference
+    ([r"(?i)\.PDF$"], None),           # inline global flag
+    ([r"[[:digit:]]+\.pdf"], None),    # POSIX class in Rust, a plain set in re
+]
+
+
+def generate_links(count: int, seed: int = 42):
+    random.seed(seed)
+    hosts = ['https://bandi.unibo.it', 'https://pubblicazioni.unito.it', 'HTTP://Example.org']
+    paths = [
+        '/s/abis1/bando-{n}', '/agevolazioni/borse?b_start:int={n}', '/docs/file-{n}.PDF',
+        '/download.php?id={n}&type=pdf', '/news/{n}', '/static/{n}.css', '/{n}-{n}.pdf', '/{n}.docx',
+        '/città/{n}', '/ſtatic/{n}', '/Bando {n}.pdf', '/tab\t{n}.pdf',
+    ]
+    odd = ['mailto:info@unibo.it', '#top', ' https://bandi.unibo.it/lead-space.pdf', 'http://[::1/broken.pdf', 'http://[::1]:8080/local.pdf',
+           'https:///no-host.pdf', '//bandi.unibo.it/relative.pdf', 'javascript:void(0)', '']
+    links = []
+    for _ in range(count):
+        if random.random() < 0.05:
+            links.append(random.choice(odd))
+        else:
+            links.append(random.choice(hosts) + random.choice(paths).format(n=random.randint(0, count // 4)))
+    return links
+
+
+def loop_urls(manager: CrawlManager, links):
+    """URL lists of the per-link loop, without building items"""
+    targets = [link for link in links if is_valid_url(link) and manager.target_matcher.matches(link)]
+    seeds = [link for link in links if manager.seed_matcher and is_valid_url(link) and manager.seed_matcher.matches(link)]
+    return targets, seeds
+
+
+def batch_urls(manager: CrawlManager, links):
+    return classify_links_batch(links, manager.target_matcher, manager.seed_matcher)
+
+
+def loop_classify(manager: CrawlManager, links, current_depth: int):
+    targets, seeds = manager._classify_links(links, current_depth, with_seeds=True, batch=False)
+    return [(item['url'], item['depth'], item['is_target']) for item in targets + seeds]
+
+
+def batch_classify(manager: CrawlManager, links, current_depth: int):
+    targets, seeds = manager._classify_links(links, current_depth, with_seeds=True, batch=True)
+    return [(item['url'], item['depth'], item['is_target']) for item in targets + seeds]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark polars batch link classification against the per-link loop')
+    parser.add_argument('--links', type=int, nargs='+', default=[100, 1000, 10000], help='Links per page')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions (default: 5)')
+    args = parser.parse_args()
+
+    # Per-target log lines would dominate the timings
+    logfire.configure(send_to_logfire=False, console=False)
+    # re warns about the POSIX class pattern, which is the point of it
+    warnings.simplefilter('ignore', FutureWarning)
+
+    url_configs = [
+        (category['name'], url_config)
+        for category in load_crawler_config().get('categories', [])
+        for url_config in category.get('urls', [])
+    ]
+    url_configs += [
+        ('extra', {'url': f'extra-{index}', 'target_patterns': targets, 'seed_pattern': seed})
+        for index, (targets, seed) in enumerate(EXTRA_PATTERNS)
+    ]
+
+    for count in args.links:
+        links = generate_links(count)
+        for category, url_config in url_configs:
+            manager = CrawlManager(category, {**url_config, 'type': 2, 'max_depth': 1})
+
+            # Same results first
+            expected = loop_classify(manager, links, 0)
+            assert batch_classify(manager, links, 0) == expected, url_config['url']
+            assert batch_urls(manager, links) == loop_urls(manager, links), url_config['url']
+
+            vectorized = _polars_regex(manager.target_matcher) is not None
+            for label, loop, batch in (
+                ('urls', lambda: loop_urls(manager, links), lambda: batch_urls(manager, links)),
+                ('items', lambda: loop_classify(manager, links, 0), lambda: batch_classify(manager, links, 0)),
+            ):
+                loop_time = min(timeit.repeat(loop, number=1, repeat=args.repeat))
+                batch_time = min(timeit.repeat(batch, number=1, repeat=args.repeat))
+                print(
+                    f"{category:<8} {url_config['url'][:32]:<32} {label:<5} links={count:<6} matches={len(expected):<6} "
+                    f"polars={'yes' if vectorized else 'no':<3} loop={loop_time * 1000:.2f}ms "
+                    f"batch={batch_time * 1000:.2f}ms speedup={loop_time / batch_time:.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
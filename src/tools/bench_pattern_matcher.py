@@ -0,0 +1,122 @@
+# src/tools/bench_pattern_matcher.py
+
+import sys
+import random
+import argparse
+import timeit
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import logfire
+from crawler.utils.config_utils import load_crawler_config
+from crawler.items import UrlItem
+from crawler.utils.crawl_manager_utils import CrawlManager
+from crawler.utils.url_utils import matches_pattern, _matches_pattern_uncompiled, is_valid_url
+
+# Patterns exercising the fallback paths next to the configured ones
+EDGE_PATTERNS = [
+    [r"(\d+)-\1\.pdf"],             # backreference, not combined
+    [r"(?i)\.PDF$"],                # inline global flag, not combined
+    [".pdf", r"download.*pdf"],
+    [""],
+]
+
+
+def reference_classify(manager: CrawlManager, links, current_depth: int):
+    """Target and seed items as the two separate passes before the compiled matcher"""
+    items = []
+    for link in links:
+        if is_valid_url(link) and _matches_pattern_uncompiled(link, manager.target_patterns):
+            logfire.info(f"Found target URL at depth {current_depth}: {link}")
+            items.append(UrlItem(url=link, category=manager.category, type=manager.type, depth=current_depth,
+                                 is_target=True, max_depth=manager.max_depth,
+                                 target_patterns=manager.target_patterns, seed_pattern=manager.seed_pattern))
+    for link in links:
+        if is_valid_url(link) and manager.seed_pattern and _matches_pattern_uncompiled(link, [manager.seed_pattern]):
+            items.append(UrlItem(url=link, category=manager.category, type=manager.type, depth=current_depth + 1,
+                                 is_target=False, max_depth=manager.max_depth,
+                                 target_patterns=manager.target_patterns, seed_pattern=manager.seed_pattern))
+    return [(item['url'], item['depth'], item['is_target']) for item in items]
+
+
+def compiled_classify(manager: CrawlManager, links, current_depth: int):
+    targets, seeds = manager._classify_links(links, current_depth, with_seeds=True)
+    return [(item['url'], item['depth'], item['is_target']) for item in targets + seeds]
+
+
+def reference_match(manager: CrawlManager, links):
+    """Pattern checks only, without building items"""
+    return [
+        (_matches_pattern_uncompiled(link, manager.target_patterns),
+         bool(manager.seed_pattern) and _matches_pattern_uncompiled(link, [manager.seed_pattern]))
+        for link in links
+    ]
+
+
+def compiled_match(manager: CrawlManager, links):
+    target_matcher, seed_matcher = manager.target_matcher, manager.seed_matcher
+    return [
+        (bool(target_matcher) and target_matcher.matches(link),
+         bool(seed_matcher) and seed_matcher.matches(link))
+        for link in links
+    ]
+
+
+def generate_links(count: int, seed: int = 42):
+    random.seed(seed)
+    hosts = ['https://bandi.unibo.it', 'https://pubblicazioni.unito.it', 'http://example.org']
+    paths = [
+        '/s/abis1/bando-{n}', '/agevolazioni/borse?b_start:int={n}', '/docs/file-{n}.PDF',
+        '/download.php?id={n}&type=pdf', '/news/{n}', '/static/{n}.css', '/{n}-{n}.pdf',
+        '/città/{n}', '/ſtatic/{n}', 'mailto:info{n}@unibo.it', '#top{n}',
+    ]
+    return [
+        (random.choice(hosts) if not path.startswith(('mailto', '#')) else '') + path.format(n=random.randint(0, 999))
+        for path in (random.choice(paths) for _ in range(count))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the compiled pattern matcher against the per-pattern loop')
+    parser.add_argument('--links', type=int, default=2000, help='Links per page (default: 2000)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed repetitions (default: 20)')
+    args = parser.parse_args()
+
+    # Per-target log lines would dominate the timings
+    logfire.configure(send_to_logfire=False, console=False)
+
+    links = generate_links(args.links)
+    url_configs = [
+        (category['name'], url_config)
+        for category in load_crawler_config().get('categories', [])
+        for url_config in category.get('urls', [])
+    ]
+
+    # Same results first
+    for patterns in EDGE_PATTERNS + [url_config.get('target_patterns') or [] for _, url_config in url_configs]:
+        for link in links:
+            assert matches_pattern(link, patterns) == _matches_pattern_uncompiled(link, patterns), (link, patterns)
+
+    for category, url_config in url_configs:
+        manager = CrawlManager(category, {**url_config, 'type': 2, 'max_depth': 1})
+        expected = reference_classify(manager, links, 0)
+        assert compiled_classify(manager, links, 0) == expected, url_config['url']
+        assert compiled_match(manager, links) == reference_match(manager, links), url_config['url']
+
+        for label, reference, compiled in (
+            ('match', lambda: reference_match(manager, links), lambda: compiled_match(manager, links)),
+            ('classify', lambda: reference_classify(manager, links, 0), lambda: compiled_classify(manager, links, 0)),
+        ):
+            reference_time = min(timeit.repeat(reference, number=1, repeat=args.repeat))
+            compiled_time = min(timeit.repeat(compiled, number=1, repeat=args.repeat))
+            print(
+                f"{category:<10} root={url_config.get('url_seed_root_id')} {label:<8} links={len(links)} "
+                f"matches={len(expected)} loop={reference_time * 1000:.2f}ms "
+                f"compiled={compiled_time * 1000:.2f}ms speedup={reference_time / compiled_time:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
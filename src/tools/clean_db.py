@@ -6,7 +6,7 @@ from dotenv import load_dotenv
 import logfire
 
 def clean_database():
-    """Clean all records from frontier_url and config_url_log tables"""
+    """Clean all records from frontier_url, config_url_log and page_fingerprint tables"""
     # Load environment variables
     load_dotenv()
     
@@ -26,10 +26,16 @@ def clean_database():
         cur = conn.cursor()
         
         # Delete records from tables
-        tables = ['frontier_url', 'config_url_log']
+        tables = ['frontier_url', 'config_url_log', 'page_fingerprint']
         
         for table in tables:
             try:
+                # Tables added by migrations are missing on databases not migrated yet
+                cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+                if not cur.fetchone()[0]:
+                    logfire.info(f"Table {table} does not exist, skipping it")
+                    continue
+
                 # Get count before deletion
                 cur.execute(f"SELECT COUNT(*) FROM {table}")
                 count_before = cur.fetchone()[0]
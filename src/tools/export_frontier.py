@@ -0,0 +1,75 @@
+# src/tools/export_frontier.py
+
+import sys
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import logfire
+from crawler.database import db_manager
+from crawler.crud.frontier_crud import FrontierCRUD
+
+DEFAULT_COLUMNS = ['id', 'url', 'category', 'url_type', 'depth', 'is_target', 'url_state', 'parent_url']
+
+
+def export(crud: FrontierCRUD, out, args) -> int:
+    rows = crud.iter_urls(
+        category=args.category or None,
+        url_state=args.state or None,
+        columns=args.columns,
+        as_dict=False,
+        page_size=args.page_size,
+        itersize=args.itersize,
+        after_id=args.after_id
+    )
+    columns = args.columns if 'id' in args.columns else ['id'] + args.columns
+
+    count = 0
+    if args.format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            out.write(json.dumps(dict(zip(columns, row)), default=str) + '\n')
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream frontier URLs to CSV or JSON lines in constant memory')
+    parser.add_argument('--category', nargs='*', help='Categories to export (default: all)')
+    parser.add_argument('--state', nargs='*', help='URL states to export, e.g. pending failed (default: all)')
+    parser.add_argument('--columns', nargs='+', default=DEFAULT_COLUMNS, help='Columns to export, id is always included')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl', help='Output format (default: jsonl)')
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument('--after_id', type=int, default=0, help='Resume after this frontier id (default: 0)')
+    parser.add_argument('--page_size', type=int, default=50000, help='Rows per keyset page (default: 50000)')
+    parser.add_argument('--itersize', type=int, default=2000, help='Rows per fetch (default: 2000)')
+    args = parser.parse_args()
+
+    logfire.configure(send_to_logfire=False, console=False)
+
+    db_manager.initialize(create_schema=False)
+    conn = db_manager.pool.getconn()
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        count = export(FrontierCRUD(conn, db_manager.queries), out, args)
+        print(f"Exported {count} rows in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        db_manager.pool.putconn(conn)
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# src/tools/migrate.py
+
+import sys
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import logfire
+from crawler.database import db_manager
+from crawler.utils.migration_utils import MigrationRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or apply the pending database schema migrations')
+    parser.add_argument('--status', action='store_true', help='Only print the current version and the pending migrations')
+    parser.add_argument('--target', type=int, help='Migrate up to this version (default: latest)')
+    args = parser.parse_args()
+
+    logfire.configure(send_to_logfire=False, console=False)
+
+    db_manager.initialize(create_schema=False)
+    runner = MigrationRunner(db_manager.migrations)
+    try:
+        with db_manager.connection() as conn:
+            current = runner.current_version(conn)
+            pending = runner.pending(conn)
+        print(f"Schema version {current}, latest {runner.latest_version}")
+        for migration in pending:
+            print(f"  pending {migration.version:04d}_{migration.name}")
+
+        if not args.status and pending:
+            version = db_manager.migrate(target=args.target)
+            print(f"Migrated to version {version}")
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
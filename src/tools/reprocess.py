@@ -0,0 +1,182 @@
+# src/tools/reprocess.py
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from dotenv import load_dotenv
+import logfire
+from crawler.items import ConfigUrlLogItem, UrlItem
+from crawler.utils.config_utils import load_crawler_config, resolve_url_config
+from crawler.utils.crawl_manager_utils import CrawlManager
+from crawler.utils.snapshot_utils import SnapshotStore, extract_links_from_html
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Re-extract links from stored snapshots with the current crawler_config.yaml'
+    )
+    parser.add_argument('--run_id',
+                       help='Snapshot run to reprocess, all worker manifests included (default: latest)')
+    parser.add_argument('--url_seed_root_id',
+                       type=int,
+                       help='Only reprocess pages of this url_seed_root_id')
+    parser.add_argument('--snapshot_dir',
+                       default='.cache/snapshots',
+                       help='Snapshot store directory (default: .cache/snapshots)')
+    parser.add_argument('--dry_run',
+                       action='store_true',
+                       help='Print the counts without writing to the database')
+    return parser.parse_args()
+
+
+def find_url_configs(config: dict) -> dict:
+    """Resolved url configs of the current config keyed by url_seed_root_id"""
+    url_configs = {}
+    for category in config.get('categories', []):
+        for url_config in category.get('urls', []):
+            url_configs[url_config.get('url_seed_root_id')] = (
+                category['name'],
+                resolve_url_config(category, url_config)
+            )
+    return url_configs
+
+
+def page_items(entry: dict, html: str, category: str, url_config: dict):
+    """Items of one stored page, as FrontierSpider._process_found_links builds them"""
+    url = entry['url']
+    depth = entry.get('depth', 0)
+    found_links = extract_links_from_html(html, url)
+
+    items = CrawlManager(category, url_config).process_url(url, found_links, depth)
+    for item in items:
+        if isinstance(item, UrlItem):
+            item['parent_url'] = entry.get('parent_url')
+            item['max_depth'] = url_config.get('max_depth', 0)
+            item['target_patterns'] = url_config.get('target_patterns')
+            item['seed_pattern'] = url_config.get('seed_pattern')
+    return found_links, items
+
+
+def reprocess(run_id: str = None, url_seed_root_id: int = None, snapshot_dir: str = '.cache/snapshots', dry_run: bool = False) -> dict:
+    """Run CrawlManager over the snapshots of a run and store the results through the pipeline"""
+    store = SnapshotStore(snapshot_dir)
+    run_ids = store.run_ids()
+    if run_id is None:
+        if not run_ids:
+            raise FileNotFoundError(f"No snapshot runs in {snapshot_dir}")
+        run_id = run_ids[-1]
+
+    url_configs = find_url_configs(load_crawler_config())
+    entries = [
+        entry for entry in store.entries(run_id)
+        if url_seed_root_id is None or entry.get('url_seed_root_id') == url_seed_root_id
+    ]
+    stored_urls = {entry['url'] for entry in entries}
+
+    pipeline = None
+    if not dry_run:
+        from crawler.pipelines import DatabasePipeline
+        pipeline = DatabasePipeline()
+
+    summary = {
+        'run_id': run_id,
+        'manifests': len(store.manifests(run_id)),
+        'pages': 0,
+        'skipped_pages': 0,
+        'links': 0,
+        'target_urls': 0,
+        'seed_urls': 0,
+        'seed_urls_without_snapshot': 0,
+    }
+    started = time.perf_counter()
+
+    try:
+        for entry in entries:
+            if entry.get('url_seed_root_id') not in url_configs:
+                logfire.warning("No url config for snapshot", url=entry['url'],
+                                url_seed_root_id=entry.get('url_seed_root_id'))
+                summary['skipped_pages'] += 1
+                continue
+
+            category, url_config = url_configs[entry['url_seed_root_id']]
+            depth = entry.get('depth', 0)
+            try:
+                html = store.load(entry['sha256'])
+            except FileNotFoundError:
+                logfire.warning("Snapshot object missing", url=entry['url'], sha256=entry['sha256'])
+                summary['skipped_pages'] += 1
+                continue
+
+            found_links, items = page_items(entry, html, category, url_config)
+            url_items = [item for item in items if isinstance(item, UrlItem)]
+            target_count = sum(1 for item in url_items if item['is_target'])
+            seed_items = [item for item in url_items if not item['is_target']]
+
+            summary['pages'] += 1
+            summary['links'] += len(found_links)
+            summary['target_urls'] += target_count
+            summary['seed_urls'] += len(seed_items)
+            if depth < url_config.get('max_depth', 0):
+                # Seeds matched only by the new config were never crawled
+                summary['seed_urls_without_snapshot'] += sum(
+                    1 for item in seed_items if item['url'] not in stored_urls
+                )
+
+            if pipeline is None:
+                continue
+
+            if depth == 0:
+                pipeline.process_item(ConfigUrlLogItem(
+                    url=entry['url'],
+                    category=category,
+                    type=url_config['type'],
+                    status='running',
+                    max_depth=url_config.get('max_depth', 0),
+                    target_patterns=url_config.get('target_patterns'),
+                    seed_pattern=url_config.get('seed_pattern')
+                ), None)
+
+            for item in url_items:
+                pipeline.process_item(item, None)
+
+            if depth == 0:
+                pipeline.process_item(ConfigUrlLogItem(
+                    url=entry['url'],
+                    category=category,
+                    type=url_config['type'],
+                    status='completed',
+                    target_count=target_count,
+                    seed_count=len(seed_items)
+                ), None)
+    finally:
+        if pipeline is not None:
+            pipeline.close_spider(None)
+
+    summary['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+if __name__ == "__main__":
+    os.chdir(PROJECT_ROOT)
+    load_dotenv()
+    args = parse_arguments()
+    try:
+        summary = reprocess(
+            run_id=args.run_id,
+            url_seed_root_id=args.url_seed_root_id,
+            snapshot_dir=args.snapshot_dir,
+            dry_run=args.dry_run
+        )
+        logfire.info("Reprocessing completed", **summary)
+        for key, value in summary.items():
+            print(f"{key}: {value}")
+    except Exception as e:
+        logfire.error(f"Reprocessing failed: {str(e)}")
+        exit(1)